@@ -0,0 +1,117 @@
+"""Benchmarks of pytest-shared-session-scope.
+
+Run them with `task bench` (or `pytest benchmarks -n 0`). Results are printed at the end of the
+run, and written as JSON with `--bench-json PATH`. Pass the JSON of an earlier run with
+`--bench-baseline PATH` to fail the run if a result got worse by more than `--bench-tolerance`.
+"""
+
+from collections.abc import Callable
+import json
+import time
+from typing import Any
+
+import pytest
+
+pytest_plugins = ["pytester"]
+
+results_key = pytest.StashKey[list[dict[str, Any]]]()
+regressions_key = pytest.StashKey[list[tuple[dict[str, Any], dict[str, Any]]]]()
+
+# Units where a higher value is better, for everything else lower is better
+HIGHER_IS_BETTER = {"B/s"}
+
+
+def pytest_addoption(parser: pytest.Parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-json", default=None, help="Write the benchmark results as JSON to this path.")
+    group.addoption(
+        "--bench-baseline", default=None, help="Compare the results to the JSON results of an earlier run."
+    )
+    group.addoption(
+        "--bench-tolerance",
+        type=float,
+        default=0.25,
+        help="Relative change from the baseline that counts as a regression (default 0.25).",
+    )
+
+
+def pytest_configure(config: pytest.Config):
+    config.stash[results_key] = []
+
+
+class Bench:
+    """Measures and records timings for one benchmark test."""
+
+    def __init__(self, results: list[dict[str, Any]], group: str):
+        self.results = results
+        self.group = group
+
+    def record(self, name: str, value: float, unit: str = "s", **params: Any):
+        result = {"group": self.group, "name": name, "value": value, "unit": unit, "params": params}
+        self.results.append(result)
+
+    def measure(self, name: str, func: Callable[[], Any], repeat: int = 5, **params: Any) -> float:
+        """Record the fastest of `repeat` calls of `func`."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        self.record(name, best, **params)
+        return best
+
+
+@pytest.fixture
+def bench(request: pytest.FixtureRequest) -> Bench:
+    return Bench(request.config.stash[results_key], request.node.module.__name__)
+
+
+def _result_key(result: dict[str, Any]) -> tuple:
+    return result["group"], result["name"], result["unit"], tuple(sorted(result["params"].items()))
+
+
+def _is_regression(result: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> bool:
+    if result["unit"] in HIGHER_IS_BETTER:
+        return result["value"] < baseline["value"] * (1 - tolerance)
+    return result["value"] > baseline["value"] * (1 + tolerance)
+
+
+def pytest_sessionfinish(session: pytest.Session):
+    path = session.config.getoption("bench_baseline")
+    if not path:
+        return
+    with open(path) as f:
+        baseline = {_result_key(result): result for result in json.load(f)}
+    tolerance = session.config.getoption("bench_tolerance")
+    regressions = []
+    for result in session.config.stash[results_key]:
+        base = baseline.get(_result_key(result))
+        if base is not None and _is_regression(result, base, tolerance):
+            regressions.append((result, base))
+    session.config.stash[regressions_key] = regressions
+    if regressions:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config):
+    results = config.stash[results_key]
+    if not results:
+        return
+    terminalreporter.section("benchmark results")
+    for result in results:
+        params = " ".join(f"{k}={v}" for k, v in result["params"].items())
+        value = f"{result['value']:.6g}{result['unit']}"
+        terminalreporter.write_line(f"{result['group']:<24} {result['name']:<28} {value:>16} {params}")
+    path = config.getoption("bench_json")
+    if path:
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    regressions = config.stash.get(regressions_key, [])
+    if regressions:
+        terminalreporter.section("benchmark regressions", red=True)
+        for result, base in regressions:
+            params = " ".join(f"{k}={v}" for k, v in result["params"].items())
+            change = f"{base['value']:.6g}{base['unit']} -> {result['value']:.6g}{result['unit']}"
+            terminalreporter.write_line(f"{result['group']:<24} {result['name']:<28} {change} {params}")
@@ -0,0 +1,60 @@
+"""Measure the cost of importing the plugin and of collecting a suite with many shared fixtures.
+
+Collection runs a generated suite with `--collect-only`, once with plain `pytest.fixture(scope="session")`
+fixtures and once with shared fixtures, and records the difference in wall time as the overhead.
+"""
+
+import subprocess
+import sys
+import time
+
+import pytest
+
+N_FIXTURES = [100, 1000]
+
+IMPORT_SCRIPT = """
+import time
+import pytest
+start = time.perf_counter()
+import pytest_shared_session_scope.plugin
+print(time.perf_counter() - start)
+"""
+
+
+def test_import_time(bench):
+    timings = [
+        float(subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], capture_output=True, check=True).stdout)
+        for _ in range(5)
+    ]
+    bench.record("import", min(timings))
+
+
+def _conftest(fixtures: int, shared: bool) -> str:
+    if shared:
+        header = "from pytest_shared_session_scope import shared_session_scope_json\n"
+        decorator = "@shared_session_scope_json()"
+    else:
+        header = "import pytest\n"
+        decorator = '@pytest.fixture(scope="session")'
+    definitions = [f"\n\n{decorator}\ndef fixture_{i}():\n    return {i}\n" for i in range(fixtures)]
+    return header + "".join(definitions)
+
+
+def _collect(pytester: pytest.Pytester, fixtures: int, shared: bool) -> float:
+    pytester.makeconftest(_conftest(fixtures, shared))
+    tests = [f"\n\ndef test_{i}(fixture_{i}):\n    pass\n" for i in range(fixtures)]
+    pytester.makepyfile(test_suite="".join(tests))
+    start = time.perf_counter()
+    result = pytester.runpytest_subprocess("--collect-only", "-q", "-p", "no:cacheprovider")
+    wall = time.perf_counter() - start
+    assert result.ret == 0
+    return wall
+
+
+@pytest.mark.parametrize("fixtures", N_FIXTURES)
+def test_collection_time(bench, pytester: pytest.Pytester, fixtures: int):
+    plain = min(_collect(pytester, fixtures, shared=False) for _ in range(3))
+    shared = min(_collect(pytester, fixtures, shared=True) for _ in range(3))
+    bench.record("collect plain", plain, fixtures=fixtures)
+    bench.record("collect shared", shared, fixtures=fixtures)
+    bench.record("overhead", shared - plain, fixtures=fixtures)
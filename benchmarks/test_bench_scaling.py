@@ -0,0 +1,87 @@
+"""Measure how the sharing machinery scales with workers, fixtures, tests per fixture and payload size.
+
+Every configuration runs a generated suite twice, once with plain `pytest.fixture(scope="session")`
+fixtures and once with shared fixtures, and records the difference in wall time as the overhead.
+The lock wait and teardown times come from the `--shared-scope-report-json` report.
+"""
+
+import json
+import time
+
+import pytest
+
+DEFAULT = {"workers": 2, "fixtures": 4, "tests": 50, "payload": 1024}
+DIMENSIONS = {
+    "workers": [1, 2, 4],
+    "fixtures": [1, 4, 16],
+    "tests": [10, 50, 250],
+    "payload": [1024, 1024 * 1024, 16 * 1024 * 1024],
+}
+
+
+def _configurations() -> list[dict[str, int]]:
+    """Vary one dimension at a time around the default configuration."""
+    configurations = [DEFAULT]
+    for dimension, values in DIMENSIONS.items():
+        for value in values:
+            configuration = {**DEFAULT, dimension: value}
+            if configuration not in configurations:
+                configurations.append(configuration)
+    return configurations
+
+
+CONFIGURATIONS = _configurations()
+
+
+def _conftest(fixtures: int, payload: int, shared: bool) -> str:
+    if shared:
+        header = "from pytest_shared_session_scope import shared_session_scope_json\n"
+        decorator = "@shared_session_scope_json()"
+    else:
+        header = "import pytest\n"
+        decorator = '@pytest.fixture(scope="session")'
+    definitions = [
+        f"\n\n{decorator}\ndef fixture_{i}():\n    return 'x' * {payload}\n" for i in range(fixtures)
+    ]
+    return header + "".join(definitions)
+
+
+def _test_module(fixtures: int, tests: int, payload: int) -> str:
+    definitions = [
+        f"\n\n@pytest.mark.parametrize('i', range({tests}))\n"
+        f"def test_fixture_{i}(fixture_{i}, i):\n    assert len(fixture_{i}) == {payload}\n"
+        for i in range(fixtures)
+    ]
+    return "import pytest\n" + "".join(definitions)
+
+
+def _run(
+    pytester: pytest.Pytester, configuration: dict[str, int], shared: bool, args: tuple[str, ...] = ()
+) -> float:
+    pytester.makeconftest(_conftest(configuration["fixtures"], configuration["payload"], shared))
+    pytester.makepyfile(
+        test_suite=_test_module(configuration["fixtures"], configuration["tests"], configuration["payload"])
+    )
+    start = time.perf_counter()
+    result = pytester.runpytest("-n", str(configuration["workers"]), "-p", "no:cacheprovider", *args)
+    wall = time.perf_counter() - start
+    result.assert_outcomes(passed=configuration["fixtures"] * configuration["tests"])
+    return wall
+
+
+@pytest.mark.parametrize(
+    "configuration", CONFIGURATIONS, ids=["-".join(f"{k}={v}" for k, v in c.items()) for c in CONFIGURATIONS]
+)
+def test_scaling(bench, pytester: pytest.Pytester, configuration: dict[str, int]):
+    report_path = pytester.path / "report.json"
+    plain = _run(pytester, configuration, shared=False)
+    shared = _run(pytester, configuration, shared=True, args=("--shared-scope-report-json", str(report_path)))
+    setups = json.loads(report_path.read_text())["setups"]
+
+    bench.record("wall plain", plain, **configuration)
+    bench.record("wall shared", shared, **configuration)
+    bench.record("overhead", shared - plain, **configuration)
+    bench.record("lock wait", sum(s["lock_wait"] or 0 for s in setups), **configuration)
+    bench.record("teardown", sum(s["teardown"] for s in setups), **configuration)
+    bench.record("read", sum(s["read"] for s in setups), **configuration)
+    bench.record("write", sum(s["write"] for s in setups), **configuration)
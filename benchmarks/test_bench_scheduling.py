@@ -0,0 +1,84 @@
+"""Compare the wall time of a suite with expensive shared fixtures under the xdist scheduling modes."""
+
+import time
+
+import pytest
+
+N_WORKERS = 4
+N_FIXTURES = 4
+N_MODULES = 4
+TESTS_PER_MODULE = 12
+SETUP_SECONDS = 1.0
+TEST_SECONDS = 0.05
+
+CONFTEST_HEADER = """
+import time
+from pathlib import Path
+
+from pytest_shared_session_scope import shared_session_scope_json
+
+EVENTS = Path(__file__).parent / "events"
+
+
+def _record_cleanup(name):
+    EVENTS.mkdir(exist_ok=True)
+    (EVENTS / f"{name}-cleanup-{time.time_ns()}").touch()
+"""
+
+# Fixtures are written out one by one, as fixtures created by the same factory function would share a store
+FIXTURE = """
+
+@shared_session_scope_json(cleanup=_record_cleanup)
+def fixture_{i}():
+    time.sleep({setup_seconds})
+    return "fixture_{i}"
+"""
+
+
+def _conftest() -> str:
+    fixtures = [FIXTURE.format(i=i, setup_seconds=SETUP_SECONDS) for i in range(N_FIXTURES)]
+    return CONFTEST_HEADER + "".join(fixtures)
+
+
+def _test_module(module: int, layout: str) -> str:
+    tests = []
+    for i in range(TESTS_PER_MODULE):
+        if layout == "by-module":
+            # All tests in a module use the same fixture. With `load` all workers start in the first module.
+            fixture = f"fixture_{module % N_FIXTURES}"
+        else:
+            # Every module uses every fixture in the same order. With `loadscope` all workers start with the
+            # first fixture.
+            fixture = f"fixture_{i * N_FIXTURES // TESTS_PER_MODULE}"
+        tests.append(
+            f"def test_{i}({fixture}):\n    assert {fixture} == '{fixture}'\n    time.sleep({TEST_SECONDS})\n"
+        )
+    return "import time\n\n\n" + "\n\n".join(tests)
+
+
+MODES = {
+    "load": ["--dist", "load"],
+    "loadscope": ["--dist", "loadscope"],
+    "shared-scope-dist": ["--shared-scope-dist"],
+}
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("layout", ["by-module", "mixed"])
+def test_scheduling(bench, pytester: pytest.Pytester, layout: str, mode: str):
+    pytester.makeconftest(_conftest())
+    pytester.makepyfile(**{f"test_module_{i}": _test_module(i, layout) for i in range(N_MODULES)})
+
+    start = time.time_ns()
+    result = pytester.runpytest("-n", str(N_WORKERS), *MODES[mode])
+    wall = (time.time_ns() - start) / 1e9
+    result.assert_outcomes(passed=N_MODULES * TESTS_PER_MODULE)
+
+    cleanups = [
+        int(path.name.rsplit("-", 1)[1])
+        for path in (pytester.path / "events").iterdir()
+        if "-cleanup-" in path.name
+    ]
+    params = {"layout": layout, "mode": mode, "workers": N_WORKERS}
+    bench.record("wall", wall, **params)
+    bench.record("mean cleanup after start", (sum(cleanups) / len(cleanups) - start) / 1e9, **params)
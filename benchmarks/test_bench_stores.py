@@ -0,0 +1,111 @@
+"""Compare the built-in stores on typical payloads, their raw throughput and reading part of a value."""
+
+import array
+from collections.abc import Callable
+import os
+import tracemalloc
+from typing import Any
+
+import pytest
+
+from pytest_shared_session_scope.store import (
+    FileStore,
+    JsonStore,
+    LazyJsonStore,
+    MmapStore,
+    PickleStore,
+    RedisStore,
+    SharedMemoryStore,
+    SqliteStore,
+)
+from pytest_shared_session_scope.types import SupportsDelete
+
+STORES = {
+    "json": JsonStore(),
+    "pickle": PickleStore(),
+    "pickle-zlib": PickleStore(compression="zlib"),
+}
+
+
+def dict_heavy():
+    return [{"id": i, "name": f"item-{i}", "tags": ["a", "b", "c"], "score": i / 3} for i in range(50_000)]
+
+
+def array_heavy():
+    try:
+        import numpy as np
+    except ImportError:
+        return array.array("d", range(2_000_000))
+    return np.arange(2_000_000, dtype="float64")
+
+
+PAYLOADS = {"dict-heavy": dict_heavy, "array-heavy": array_heavy}
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+@pytest.mark.parametrize("store_name", STORES)
+def test_store_roundtrip(bench, tmp_path_factory, request, store_name: str, payload: str):
+    store = STORES[store_name]
+    fixture_values = {"tmp_path_factory": tmp_path_factory}
+    identifier = request.node.name
+    data = PAYLOADS[payload]()
+    if isinstance(store, JsonStore) and payload == "array-heavy":
+        data = data.tolist()  # json can not store arrays
+
+    params = {"store": store_name, "payload": payload}
+    bench.measure("write", lambda: store.write(identifier, data, fixture_values), **params)
+    bench.measure("read", lambda: store.read(identifier, fixture_values), **params)
+    path = store._get_path(identifier, tmp_path_factory)
+    bench.record("size", path.stat().st_size, unit="B", **params)
+
+
+# Store and a function turning the raw payload into something the store can write. Add new stores here.
+THROUGHPUT_STORES: dict[str, tuple[Any, Callable[[bytes], Any]]] = {
+    "file": (FileStore(), lambda payload: payload.decode("ascii")),
+    "json": (JsonStore(), lambda payload: payload.decode("ascii")),
+    "mmap": (MmapStore(), lambda payload: payload),
+    "pickle": (PickleStore(), lambda payload: bytearray(payload)),
+    "shared_memory": (SharedMemoryStore(), lambda payload: payload),
+    "sqlite": (SqliteStore(), lambda payload: payload),
+}
+# Network stores need a server, for example `BENCH_REDIS_URL=redis://localhost:6379/0`
+if os.environ.get("BENCH_REDIS_URL"):
+    THROUGHPUT_STORES["redis"] = (RedisStore(os.environ["BENCH_REDIS_URL"]), lambda payload: payload)
+
+
+@pytest.mark.parametrize("size", [1024, 1024 * 1024, 64 * 1024 * 1024])
+@pytest.mark.parametrize("store_name", THROUGHPUT_STORES)
+def test_store_throughput(bench, tmp_path_factory, pytestconfig, request, store_name: str, size: int):
+    store, convert = THROUGHPUT_STORES[store_name]
+    fixture_values = {"tmp_path_factory": tmp_path_factory, "pytestconfig": pytestconfig}
+    identifier = request.node.name
+    data = convert(b"x" * size)
+
+    params = {"store": store_name, "size": size}
+    write = bench.measure("write", lambda: store.write(identifier, data, fixture_values), **params)
+    read = bench.measure("read", lambda: store.read(identifier, fixture_values), **params)
+    bench.record("write throughput", size / write, unit="B/s", **params)
+    bench.record("read throughput", size / read, unit="B/s", **params)
+    if isinstance(store, SupportsDelete):
+        store.delete(identifier, fixture_values)
+
+
+@pytest.mark.parametrize("store_name", ["json", "lazy_json"])
+def test_store_partial_read(bench, tmp_path_factory, request, store_name: str):
+    # A worker whose tests only use a few keys of a large mapping
+    store = JsonStore() if store_name == "json" else LazyJsonStore()
+    fixture_values = {"tmp_path_factory": tmp_path_factory}
+    identifier = request.node.name
+    records = dict_heavy()[:10]
+    store.write(identifier, {f"key-{i}": records for i in range(5_000)}, fixture_values)
+
+    def read_few_keys():
+        value = store.read(identifier, fixture_values)
+        return [value[f"key-{i}"] for i in range(10)]
+
+    bench.measure("read 10 of 5000 keys", read_few_keys, store=store_name)
+    tracemalloc.start()
+    read_few_keys()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    bench.record("peak memory", peak, unit="B", store=store_name)
@@ -0,0 +1,85 @@
+"""Measure how long a worker waiting for a value takes to wake up once the worker computing it is done."""
+
+from collections.abc import Callable
+import statistics
+import threading
+import time
+from typing import Any
+
+from filelock import FileLock
+import pytest
+
+from pytest_shared_session_scope.store import FileStore, SqliteStore
+
+N_WAKEUPS = 20
+
+
+def _wait_file(store: FileStore, identifier: str, fixture_values: dict[str, Any]):
+    store.wait_for(identifier, fixture_values)
+
+
+def _wait_filelock(store: FileStore, identifier: str, fixture_values: dict[str, Any]):
+    # Waiting the way the file stores did before they woke up waiters: polling the lock file
+    with FileLock(str(store._lock_path(identifier, fixture_values)) + ".poll"):
+        pass
+
+
+def _wait_lock(store: Any, identifier: str, fixture_values: dict[str, Any]):
+    # Stores without `wait_for` wake up waiters by handing the lock over to them one by one
+    with store.lock(identifier, fixture_values):
+        pass
+
+
+def _hold_lock(store: Any, identifier: str, fixture_values: dict[str, Any]):
+    return store.lock(identifier, fixture_values)
+
+
+def _hold_filelock(store: FileStore, identifier: str, fixture_values: dict[str, Any]):
+    return FileLock(str(store._lock_path(identifier, fixture_values)) + ".poll")
+
+
+# Store, how the computing worker holds the lock and how waiting workers wait for it. Add new stores here.
+WAKEUPS: dict[str, tuple[Any, Callable, Callable]] = {
+    "file-flock": (FileStore(), _hold_lock, _wait_file),
+    "file-filelock-poll": (FileStore(), _hold_filelock, _wait_filelock),
+    "sqlite-poll": (SqliteStore(), _hold_lock, _wait_lock),
+}
+
+
+@pytest.mark.parametrize("waiters", [1, 4])
+@pytest.mark.parametrize("name", WAKEUPS)
+def test_wakeup_latency(bench, tmp_path_factory, request, name: str, waiters: int):
+    store, hold, wait = WAKEUPS[name]
+    fixture_values = {"tmp_path_factory": tmp_path_factory}
+    identifier = request.node.name
+    latencies = []
+    for _ in range(N_WAKEUPS):
+        locked = threading.Event()
+        released_at = 0.0
+        woken_at: list[float] = []
+
+        def holder():
+            nonlocal released_at
+            with hold(store, identifier, fixture_values):
+                locked.set()
+                time.sleep(0.02)  # Let the waiters start waiting
+                released_at = time.perf_counter()
+
+        def waiter():
+            wait(store, identifier, fixture_values)
+            woken_at.append(time.perf_counter())
+
+        threads = [threading.Thread(target=holder)]
+        threads[0].start()
+        locked.wait()
+        threads += [threading.Thread(target=waiter) for _ in range(waiters)]
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # The last waiter to wake up is the one holding back the slowest test
+        latencies.append(max(woken_at) - released_at)
+
+    params = {"store": name, "waiters": waiters}
+    bench.record("wakeup_p50", statistics.median(latencies), **params)
+    bench.record("wakeup_max", max(latencies), **params)
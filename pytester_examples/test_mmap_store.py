@@ -0,0 +1,29 @@
+import array
+
+from pytest_shared_session_scope import shared_session_scope_fixture
+from pytest_shared_session_scope.store import MmapStore
+from pytest_shared_session_scope.types import SetupToken
+
+
+def parse(data) -> array.array:
+    numbers = array.array("q")
+    numbers.frombytes(memoryview(data).cast("B"))
+    return numbers
+
+
+@shared_session_scope_fixture(MmapStore(), parse=parse)
+def numbers():
+    data = yield
+    if data is SetupToken.FIRST:
+        data = array.array("q", range(100_000))
+    yield data
+
+
+def test_numbers_1(numbers):
+    assert numbers == array.array("q", range(100_000))
+
+def test_numbers_2(numbers):
+    assert numbers == array.array("q", range(100_000))
+
+def test_numbers_3(numbers):
+    assert numbers == array.array("q", range(100_000))
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from pytest_shared_session_scope import shared_session_scope_pickle
+from pytest_shared_session_scope.types import SetupToken
+
+
+@shared_session_scope_pickle(compression="zlib", compression_threshold=0)
+def my_fixture():
+    data = yield
+    if data is SetupToken.FIRST:
+        data = {"ids": {1, 2, 3}, "created": datetime(2024, 1, 1)}
+    yield data
+
+
+def test_pickle_1(my_fixture):
+    assert my_fixture == {"ids": {1, 2, 3}, "created": datetime(2024, 1, 1)}
+
+def test_pickle_2(my_fixture):
+    assert my_fixture == {"ids": {1, 2, 3}, "created": datetime(2024, 1, 1)}
+
+def test_pickle_3(my_fixture):
+    assert my_fixture == {"ids": {1, 2, 3}, "created": datetime(2024, 1, 1)}
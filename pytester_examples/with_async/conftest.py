@@ -0,0 +1,87 @@
+"""Test that async fixtures are computed once and cleaned up by the last worker."""
+
+import asyncio
+import os
+from pathlib import Path
+import uuid
+
+import pytest
+
+from pytest_shared_session_scope import (
+    CleanupToken,
+    SetupToken,
+    shared_session_scope_fixture,
+    shared_session_scope_json,
+)
+from pytest_shared_session_scope.store import BrokerStore, JsonStore
+
+
+def _worker_id() -> str:
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def _record(results_dir: Path, event: str):
+    (results_dir / f"{event}-{_worker_id()}-{uuid.uuid4()}").touch()
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+async def cleanup(data):
+    await asyncio.sleep(0)
+    _record(Path(data["results_dir"]), "returncleanup")
+
+
+@shared_session_scope_json(cleanup=cleanup)
+async def returning(results_dir):
+    await asyncio.sleep(0.1)
+    _record(results_dir, "returnsetup")
+    return {"value": 123, "results_dir": str(results_dir)}
+
+
+@shared_session_scope_fixture(BrokerStore())
+async def yielding(results_dir):
+    data = yield
+    if data is SetupToken.FIRST:
+        await asyncio.sleep(0.1)
+        _record(results_dir, "yieldsetup")
+        data = 456
+    token = yield data
+    if token is CleanupToken.LAST:
+        await asyncio.sleep(0)
+        _record(results_dir, "yieldcleanup")
+
+
+class LoopCheckingStore(JsonStore):
+    """Records whether its async methods are called on the event loop."""
+
+    @property
+    def fixtures(self) -> list[str]:
+        return [*super().fixtures, "results_dir"]
+
+    def _check_loop(self, fixture_values):
+        try:
+            asyncio.get_running_loop()
+            _record(fixture_values["results_dir"], "storeonloop")
+        except RuntimeError:
+            _record(fixture_values["results_dir"], "storeoffloop")
+
+    async def aread(self, identifier, fixture_values):
+        self._check_loop(fixture_values)
+        return await super().aread(identifier, fixture_values)
+
+    async def awrite(self, identifier, data, fixture_values):
+        self._check_loop(fixture_values)
+        await super().awrite(identifier, data, fixture_values)
+
+    def alock(self, identifier, fixture_values):
+        self._check_loop(fixture_values)
+        return super().alock(identifier, fixture_values)
+
+
+@shared_session_scope_fixture(LoopCheckingStore())
+async def awaited():
+    await asyncio.sleep(0.1)
+    return 789
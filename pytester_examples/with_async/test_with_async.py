@@ -0,0 +1,33 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_with_async_1(returning, yielding, awaited):
+    assert returning["value"] == 123
+    assert yielding == 456
+    assert awaited == 789
+
+
+async def test_with_async_2(returning, yielding, awaited):
+    assert returning["value"] == 123
+    assert yielding == 456
+    assert awaited == 789
+
+
+async def test_with_async_3(returning, yielding, awaited):
+    assert returning["value"] == 123
+    assert yielding == 456
+    assert awaited == 789
+
+
+async def test_with_async_4(returning, yielding, awaited):
+    assert returning["value"] == 123
+    assert yielding == 456
+    assert awaited == 789
+
+
+async def test_with_async_5(returning, yielding, awaited):
+    assert returning["value"] == 123
+    assert yielding == 456
+    assert awaited == 789
@@ -0,0 +1,25 @@
+"""Test that the broker store shares data, locks and cleanup through the controller."""
+
+import json
+
+from pytest_shared_session_scope import shared_session_scope_fixture
+from pytest_shared_session_scope.store import BrokerStore
+from pytest_shared_session_scope.types import CleanupToken, SetupToken
+
+
+@shared_session_scope_fixture(BrokerStore(), metadata_storage=BrokerStore())
+def my_fixture(worker_id: str, results_dir):
+    setup_token = yield
+    if setup_token is SetupToken.FIRST:
+        data = {"value": 123}
+    else:
+        data = setup_token
+    cleanup_token = yield data
+    (results_dir / f"{worker_id}.json").write_text(
+        json.dumps(
+            {
+                "is_cleanup_token": cleanup_token is CleanupToken.LAST,
+                "is_setup_token": setup_token is SetupToken.FIRST,
+            }
+        )
+    )
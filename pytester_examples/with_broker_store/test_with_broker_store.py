@@ -0,0 +1,14 @@
+def test_with_broker_store_1(my_fixture):
+    assert my_fixture == {"value": 123}
+
+def test_with_broker_store_2(my_fixture):
+    assert my_fixture == {"value": 123}
+
+def test_with_broker_store_3(my_fixture):
+    assert my_fixture == {"value": 123}
+
+def test_with_broker_store_4(my_fixture):
+    assert my_fixture == {"value": 123}
+
+def test_with_broker_store_5(my_fixture):
+    assert my_fixture == {"value": 123}
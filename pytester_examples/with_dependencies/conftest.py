@@ -0,0 +1,21 @@
+"""Test that a shared fixture is invalidated together with the shared fixtures it depends on."""
+
+import os
+import uuid
+
+from pytest_shared_session_scope import shared_session_scope_json
+from pytest_shared_session_scope.cache import PersistentCache
+
+UPSTREAM_VERSION = os.environ.get("UPSTREAM_VERSION", "1")
+
+
+@shared_session_scope_json(cache=PersistentCache(version=UPSTREAM_VERSION))
+def database(results_dir):
+    (results_dir / f"database-{uuid.uuid4()}").touch()
+    return {"version": UPSTREAM_VERSION}
+
+
+@shared_session_scope_json(cache=PersistentCache())
+def seeded(database, results_dir):
+    (results_dir / f"seeded-{uuid.uuid4()}").touch()
+    return {"seeded_from": database["version"]}
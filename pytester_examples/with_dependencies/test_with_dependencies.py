@@ -0,0 +1,10 @@
+def test_with_dependencies_1(seeded, database):
+    assert seeded["seeded_from"] == database["version"]
+
+
+def test_with_dependencies_2(seeded, database):
+    assert seeded["seeded_from"] == database["version"]
+
+
+def test_with_dependencies_3(seeded):
+    assert seeded["seeded_from"]
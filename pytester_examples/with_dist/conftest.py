@@ -0,0 +1,40 @@
+"""Test that the tests are grouped by the shared fixtures they use with `--shared-scope-dist`."""
+
+import os
+import time
+import uuid
+
+import pytest
+
+from pytest_shared_session_scope import shared_session_scope_json
+
+
+def _worker_id() -> str:
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def _setup(results_dir, name: str):
+    time.sleep(0.3)
+    (results_dir / f"setup-{name}-{_worker_id()}-{uuid.uuid4()}").touch()
+    return name
+
+
+@shared_session_scope_json()
+def a(results_dir):
+    return _setup(results_dir, "a")
+
+
+@shared_session_scope_json()
+def b(results_dir):
+    return _setup(results_dir, "b")
+
+
+@shared_session_scope_json()
+def c(results_dir):
+    return _setup(results_dir, "c")
+
+
+@pytest.fixture
+def record(request, results_dir):
+    yield
+    (results_dir / f"test-{request.node.name}-{_worker_id()}-{uuid.uuid4()}").touch()
@@ -0,0 +1,26 @@
+def test_a_00(a, record):
+    assert a == "a"
+
+
+def test_b_01(b, record):
+    assert b == "b"
+
+
+def test_c_02(c, record):
+    assert c == "c"
+
+
+def test_a_03(a, record):
+    assert a == "a"
+
+
+def test_b_04(b, record):
+    assert b == "b"
+
+
+def test_c_05(c, record):
+    assert c == "c"
+
+
+def test_without_shared_fixture_0(record):
+    pass
@@ -0,0 +1,26 @@
+def test_b_10(b, record):
+    assert b == "b"
+
+
+def test_c_11(c, record):
+    assert c == "c"
+
+
+def test_a_12(a, record):
+    assert a == "a"
+
+
+def test_b_13(b, record):
+    assert b == "b"
+
+
+def test_c_14(c, record):
+    assert c == "c"
+
+
+def test_a_15(a, record):
+    assert a == "a"
+
+
+def test_without_shared_fixture_1(record):
+    pass
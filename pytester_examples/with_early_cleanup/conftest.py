@@ -0,0 +1,26 @@
+"""Test that the last cleanup runs as soon as the last test using the fixture has finished."""
+
+import json
+import time
+
+from pytest_shared_session_scope import shared_session_scope_json
+from pytest_shared_session_scope.types import CleanupToken, SetupToken
+
+
+@shared_session_scope_json(early_cleanup=True)
+def my_fixture(worker_id: str, results_dir):
+    setup_token = yield
+    if setup_token is SetupToken.FIRST:
+        data = 123
+    else:
+        data = setup_token
+    cleanup_token = yield data
+    (results_dir / f"{worker_id}-{time.time_ns()}.json").write_text(
+        json.dumps(
+            {
+                "time": time.time(),
+                "is_cleanup_token": cleanup_token is CleanupToken.LAST,
+                "is_setup_token": setup_token is SetupToken.FIRST,
+            }
+        )
+    )
@@ -0,0 +1,16 @@
+import json
+import time
+
+import pytest
+
+
+@pytest.mark.parametrize("i", range(4))
+def test_uses_fixture(my_fixture, i):
+    assert my_fixture == 123
+
+
+@pytest.mark.parametrize("i", range(6))
+def test_later(results_dir, i):
+    # Leaves the workers busy long after the last test using the fixture has finished
+    time.sleep(0.3)
+    (results_dir / f"later-{i}.json").write_text(json.dumps({"time": time.time()}))
@@ -0,0 +1,30 @@
+"""Test that tests using a shared fixture through another fixture are counted."""
+
+import json
+
+import pytest
+from pytest_shared_session_scope import shared_session_scope_json
+from pytest_shared_session_scope.types import CleanupToken, SetupToken
+
+
+@shared_session_scope_json(name="shared")
+def my_fixture(worker_id: str, results_dir):
+    setup_token = yield
+    if setup_token is SetupToken.FIRST:
+        data = 123
+    else:
+        data = setup_token
+    cleanup_token = yield data
+    (results_dir / f"{worker_id}.json").write_text(
+        json.dumps(
+            {
+                "is_cleanup_token": cleanup_token is CleanupToken.LAST,
+                "is_setup_token": setup_token is SetupToken.FIRST,
+            }
+        )
+    )
+
+
+@pytest.fixture
+def uses_shared(shared):
+    return shared + 1
@@ -0,0 +1,14 @@
+def test_direct_1(shared):
+    assert shared == 123
+
+def test_indirect_1(uses_shared):
+    assert uses_shared == 124
+
+def test_indirect_2(uses_shared):
+    assert uses_shared == 124
+
+def test_indirect_3(uses_shared):
+    assert uses_shared == 124
+
+def test_indirect_4(uses_shared):
+    assert uses_shared == 124
@@ -0,0 +1,26 @@
+"""Test that the lazy store shares a mapping and workers only decode the keys they access."""
+
+import json
+
+from pytest_shared_session_scope import shared_session_scope_fixture
+from pytest_shared_session_scope.store import LazyJsonStore
+from pytest_shared_session_scope.types import CleanupToken, SetupToken
+
+
+@shared_session_scope_fixture(LazyJsonStore())
+def my_fixture(worker_id: str, results_dir):
+    setup_token = yield
+    if setup_token is SetupToken.FIRST:
+        data = {f"key-{i}": {"values": list(range(i))} for i in range(100)}
+    else:
+        data = setup_token
+    cleanup_token = yield data
+    (results_dir / f"{worker_id}.json").write_text(
+        json.dumps(
+            {
+                "is_cleanup_token": cleanup_token is CleanupToken.LAST,
+                "is_setup_token": setup_token is SetupToken.FIRST,
+                "type": type(data).__name__,
+            }
+        )
+    )
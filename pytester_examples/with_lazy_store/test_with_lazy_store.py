@@ -0,0 +1,23 @@
+def test_with_lazy_store_1(my_fixture):
+    assert len(my_fixture) == 100
+    assert my_fixture["key-1"] == {"values": list(range(1))}
+
+
+def test_with_lazy_store_2(my_fixture):
+    assert len(my_fixture) == 100
+    assert my_fixture["key-2"] == {"values": list(range(2))}
+
+
+def test_with_lazy_store_3(my_fixture):
+    assert len(my_fixture) == 100
+    assert my_fixture["key-3"] == {"values": list(range(3))}
+
+
+def test_with_lazy_store_4(my_fixture):
+    assert len(my_fixture) == 100
+    assert my_fixture["key-4"] == {"values": list(range(4))}
+
+
+def test_with_lazy_store_5(my_fixture):
+    assert len(my_fixture) == 100
+    assert my_fixture["key-5"] == {"values": list(range(5))}
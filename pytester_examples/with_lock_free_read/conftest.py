@@ -0,0 +1,29 @@
+"""Test that workers read an already published value without taking the lock."""
+
+from contextlib import contextmanager
+import os
+
+from pytest_shared_session_scope import shared_session_scope_fixture
+from pytest_shared_session_scope.store import JsonStore
+from pytest_shared_session_scope.types import SetupToken
+
+
+class LockRecordingStore(JsonStore):
+    @property
+    def fixtures(self) -> list[str]:
+        return [*super().fixtures, "results_dir"]
+
+    @contextmanager
+    def lock(self, identifier, fixture_values):
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+        (fixture_values["results_dir"] / f"lock-{worker_id}").touch()
+        with super().lock(identifier, fixture_values):
+            yield
+
+
+@shared_session_scope_fixture(LockRecordingStore())
+def my_fixture():
+    data = yield
+    if data is SetupToken.FIRST:
+        data = 123
+    yield data
@@ -0,0 +1,21 @@
+import time
+
+
+def _wait_for(root, pattern: str):
+    deadline = time.monotonic() + 30
+    while not list(root.glob(pattern)) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_compute(my_fixture, tmp_path_factory):
+    assert my_fixture == 123
+    # The other test requests the fixture dynamically, so it is not counted as using it, and the value
+    # would be retired when this test finishes
+    _wait_for(tmp_path_factory.getbasetemp().parent, "read")
+
+
+def test_read_after_publish(request, tmp_path_factory):
+    root = tmp_path_factory.getbasetemp().parent
+    _wait_for(root, "*my_fixture_published.json")
+    assert request.getfixturevalue("my_fixture") == 123
+    (root / "read").touch()
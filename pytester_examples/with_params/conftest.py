@@ -0,0 +1,50 @@
+"""Test that parametrized shared fixtures are computed and cleaned up per parameter."""
+
+import json
+
+from pytest_shared_session_scope import shared_session_scope_json
+from pytest_shared_session_scope.types import CleanupToken, SetupToken
+
+
+def _record(results_dir, name: str, setup_token, cleanup_token):
+    (results_dir / f"{name}.json").write_text(
+        json.dumps(
+            {
+                "is_cleanup_token": cleanup_token is CleanupToken.LAST,
+                "is_setup_token": setup_token is SetupToken.FIRST,
+            }
+        )
+    )
+
+
+@shared_session_scope_json(params=[1, 2, 3])
+def my_fixture(request, worker_id: str, results_dir):
+    setup_token = yield
+    data = request.param * 10 if setup_token is SetupToken.FIRST else setup_token
+    cleanup_token = yield data
+    _record(results_dir, f"direct-{request.param}-{worker_id}", setup_token, cleanup_token)
+
+
+@shared_session_scope_json()
+def indirect(request, worker_id: str, results_dir):
+    setup_token = yield
+    data = request.param.upper() if setup_token is SetupToken.FIRST else setup_token
+    cleanup_token = yield data
+    _record(results_dir, f"indirect-{request.param}-{worker_id}", setup_token, cleanup_token)
+
+
+@shared_session_scope_json()
+def indirect_dict(request, worker_id: str, results_dir):
+    setup_token = yield
+    data = request.param["name"].upper() if setup_token is SetupToken.FIRST else setup_token
+    cleanup_token = yield data
+    _record(results_dir, f"dict-{request.param['name']}-{worker_id}", setup_token, cleanup_token)
+
+
+@shared_session_scope_json()
+def indirect_collection(request, worker_id: str, results_dir):
+    setup_token = yield
+    name = type(request.param).__name__
+    data = name if setup_token is SetupToken.FIRST else setup_token
+    cleanup_token = yield data
+    _record(results_dir, f"collection-{name}-{worker_id}", setup_token, cleanup_token)
@@ -0,0 +1,42 @@
+import pytest
+
+
+def test_params_1(my_fixture):
+    assert my_fixture in (10, 20, 30)
+
+def test_params_2(my_fixture):
+    assert my_fixture in (10, 20, 30)
+
+
+@pytest.mark.parametrize("indirect", ["a", "b"], indirect=True)
+def test_indirect_1(indirect):
+    assert indirect in ("A", "B")
+
+
+@pytest.mark.parametrize("indirect", ["a", "b"], indirect=True)
+def test_indirect_2(indirect):
+    assert indirect in ("A", "B")
+
+
+@pytest.mark.parametrize("indirect_dict", [{"name": "a"}, {"name": "b"}], indirect=True)
+def test_indirect_dict_1(indirect_dict, request):
+    assert indirect_dict == request.node.callspec.params["indirect_dict"]["name"].upper()
+
+
+@pytest.mark.parametrize("indirect_dict", [{"name": "a"}, {"name": "b"}], indirect=True)
+def test_indirect_dict_2(indirect_dict, request):
+    assert indirect_dict == request.node.callspec.params["indirect_dict"]["name"].upper()
+
+
+# The order of the members of a set differs between workers, and a tuple and a list must not share a value
+COLLECTIONS = [frozenset({"a", "b", "c", "d", "e"}), ("a", ("b",)), ["a", ["b"]]]
+
+
+@pytest.mark.parametrize("indirect_collection", COLLECTIONS, indirect=True)
+def test_indirect_collection_1(indirect_collection, request):
+    assert indirect_collection == type(request.node.callspec.params["indirect_collection"]).__name__
+
+
+@pytest.mark.parametrize("indirect_collection", COLLECTIONS, indirect=True)
+def test_indirect_collection_2(indirect_collection, request):
+    assert indirect_collection == type(request.node.callspec.params["indirect_collection"]).__name__
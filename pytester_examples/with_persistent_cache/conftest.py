@@ -0,0 +1,22 @@
+"""Test that values are reused across runs with a persistent cache."""
+
+import uuid
+
+from pytest_shared_session_scope import shared_session_scope_json
+from pytest_shared_session_scope.cache import PersistentCache
+from pytest_shared_session_scope.types import SetupToken
+
+
+@shared_session_scope_json(cache=PersistentCache(version="1"))
+def my_fixture(results_dir):
+    data = yield
+    if data is SetupToken.FIRST:
+        (results_dir / f"yield-{uuid.uuid4()}").touch()
+        data = 123
+    yield data
+
+
+@shared_session_scope_json(cache=PersistentCache(version="1"))
+def my_return_fixture(results_dir):
+    (results_dir / f"return-{uuid.uuid4()}").touch()
+    return 456
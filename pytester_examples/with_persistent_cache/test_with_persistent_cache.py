@@ -0,0 +1,11 @@
+def test_with_persistent_cache_1(my_fixture, my_return_fixture):
+    assert my_fixture == 123
+    assert my_return_fixture == 456
+
+def test_with_persistent_cache_2(my_fixture, my_return_fixture):
+    assert my_fixture == 123
+    assert my_return_fixture == 456
+
+def test_with_persistent_cache_3(my_fixture, my_return_fixture):
+    assert my_fixture == 123
+    assert my_return_fixture == 456
@@ -0,0 +1,43 @@
+"""Test that pool instances are built once, handed out to the workers and cleaned up by their last holder."""
+
+import json
+import uuid
+
+from pytest_shared_session_scope import shared_session_scope_pool
+from pytest_shared_session_scope.store import JsonStore
+from pytest_shared_session_scope.types import CleanupToken, SetupToken
+
+
+def _record(results_dir, event: str, **data):
+    (results_dir / f"{event}-{uuid.uuid4()}.json").write_text(json.dumps(data))
+
+
+@shared_session_scope_pool(JsonStore(), size=2)
+def round_robin(pool_index: int, worker_id: str, results_dir):
+    data = yield
+    if data is SetupToken.FIRST:
+        _record(results_dir, "build", fixture="round_robin", index=pool_index)
+        data = {"index": pool_index, "built_by": worker_id}
+    token = yield data
+    _record(results_dir, "release", fixture="round_robin", index=pool_index, last=token is CleanupToken.LAST)
+
+
+@shared_session_scope_pool(JsonStore(), size=2, strategy="least_loaded")
+def least_loaded(pool_index: int, worker_id: str, results_dir):
+    data = yield
+    if data is SetupToken.FIRST:
+        _record(results_dir, "build", fixture="least_loaded", index=pool_index)
+        data = {"index": pool_index, "built_by": worker_id}
+    token = yield data
+    _record(results_dir, "release", fixture="least_loaded", index=pool_index, last=token is CleanupToken.LAST)
+
+
+@shared_session_scope_pool(JsonStore(), size=1)
+def fragile(worker_id: str, results_dir):
+    data = yield
+    if data is SetupToken.FIRST:
+        data = worker_id
+    elif data != worker_id:
+        raise RuntimeError("Only the worker that built the instance can use it")
+    token = yield data
+    _record(results_dir, "release", fixture="fragile", index=0, last=token is CleanupToken.LAST)
@@ -0,0 +1,18 @@
+import json
+import time
+import uuid
+
+import pytest
+
+
+@pytest.mark.parametrize("i", range(12))
+def test_pool(round_robin, least_loaded, worker_id, results_dir, i):
+    for fixture, data in [("round_robin", round_robin), ("least_loaded", least_loaded)]:
+        data = {"fixture": fixture, "worker": worker_id, **data}
+        (results_dir / f"test-{uuid.uuid4()}.json").write_text(json.dumps(data))
+    time.sleep(0.05)  # Let all workers get tests
+
+
+@pytest.mark.parametrize("i", range(6))
+def test_fragile(fragile, i):
+    time.sleep(0.05)  # Let all workers get tests
@@ -0,0 +1,32 @@
+"""Test that prewarmed fixtures are computed once, spread over the workers."""
+
+import os
+from pathlib import Path
+import time
+
+from pytest_shared_session_scope import shared_session_scope_json
+
+
+def _worker_id() -> str:
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def _setup(results_dir, name: str):
+    time.sleep(0.5)
+    (results_dir / f"setup-{name}-{_worker_id()}-{time.time_ns()}").touch()
+    return {"name": name, "results_dir": str(results_dir)}
+
+
+def _cleanup(data):
+    (Path(data["results_dir"]) / f"cleanup-{data['name']}-{_worker_id()}-{time.time_ns()}").touch()
+
+
+@shared_session_scope_json(prewarm=True, cleanup=_cleanup)
+def a(results_dir):
+    return _setup(results_dir, "a")
+
+
+@shared_session_scope_json(cleanup=_cleanup)
+def b(results_dir):
+    return _setup(results_dir, "b")
+
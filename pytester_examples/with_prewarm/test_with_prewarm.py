@@ -0,0 +1,37 @@
+import os
+import time
+
+
+def test_with_prewarm_0(results_dir):
+    # Uses no shared fixtures, so only prewarmed fixtures are computed before it runs
+    (results_dir / f"start-test-{os.environ.get('PYTEST_XDIST_WORKER')}-{time.time_ns()}").touch()
+
+
+def test_with_prewarm_1(b, a):
+    assert a["name"] == "a"
+    assert b["name"] == "b"
+
+
+def test_with_prewarm_2(b, a):
+    assert a["name"] == "a"
+    assert b["name"] == "b"
+
+
+def test_with_prewarm_3(b, a):
+    assert a["name"] == "a"
+    assert b["name"] == "b"
+
+
+def test_with_prewarm_4(b, a):
+    assert a["name"] == "a"
+    assert b["name"] == "b"
+
+
+def test_with_prewarm_5(b, a):
+    assert a["name"] == "a"
+    assert b["name"] == "b"
+
+
+def test_with_prewarm_6(b, a):
+    assert a["name"] == "a"
+    assert b["name"] == "b"
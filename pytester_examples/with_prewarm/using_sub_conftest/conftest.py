@@ -0,0 +1,18 @@
+import os
+from pathlib import Path
+import time
+
+from pytest_shared_session_scope import shared_session_scope_json
+
+
+def _cleanup(data):
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+    (Path(data["results_dir"]) / f"cleanup-c-{worker_id}-{time.time_ns()}").touch()
+
+
+@shared_session_scope_json(prewarm=True, cleanup=_cleanup)
+def c(results_dir):
+    # Only visible to the tests in this directory
+    time.sleep(0.5)
+    (results_dir / f"setup-c-{os.environ.get('PYTEST_XDIST_WORKER', 'master')}-{time.time_ns()}").touch()
+    return {"name": "c", "results_dir": str(results_dir)}
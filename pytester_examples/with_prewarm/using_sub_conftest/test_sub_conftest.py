@@ -0,0 +1,2 @@
+def test_with_prewarm_sub_conftest(c):
+    assert c["name"] == "c"
@@ -0,0 +1,44 @@
+"""Test that a worker does not prewarm fixtures whose tests have all finished in other workers."""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from pytest_shared_session_scope import shared_session_scope_json
+from pytest_shared_session_scope.types import CleanupToken, SetupToken
+
+
+def _record(event: str, name: str, worker_id: str, results_dir: Path):
+    (results_dir / f"{event}-{name}-{worker_id}").touch()
+
+
+@shared_session_scope_json(prewarm=True, early_cleanup=True)
+def a(worker_id: str, results_dir):
+    setup_token = yield
+    if setup_token is SetupToken.FIRST:
+        _record("setup", "a", worker_id, results_dir)
+    cleanup_token = yield 123 if setup_token is SetupToken.FIRST else setup_token
+    if cleanup_token is CleanupToken.LAST:
+        _record("cleanup", "a", worker_id, results_dir)
+
+
+@shared_session_scope_json(prewarm=True, early_cleanup=True)
+def b(worker_id: str, results_dir):
+    setup_token = yield
+    if setup_token is SetupToken.FIRST:
+        _record("setup", "b", worker_id, results_dir)
+    cleanup_token = yield 123 if setup_token is SetupToken.FIRST else setup_token
+    if cleanup_token is CleanupToken.LAST:
+        _record("cleanup", "b", worker_id, results_dir)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item: pytest.Item):
+    # Runs before the fixtures of the first test of the late worker, including the one prewarming
+    if item.name == "test_late":
+        # xdist gives each worker a base temp directory inside the one of the run
+        results_dir = Path(item.config.getoption("basetemp")).parent / ".results"
+        deadline = time.time() + 30
+        while len(list(results_dir.glob("cleanup-*"))) < 2 and time.time() < deadline:
+            time.sleep(0.05)
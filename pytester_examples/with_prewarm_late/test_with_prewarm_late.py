@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.mark.xdist_group("early")
+def test_early(a, b):
+    assert a == b == 123
+
+
+@pytest.mark.xdist_group("late")
+def test_late():
+    pass
@@ -0,0 +1,32 @@
+"""Test that the last cleanup waits for workers that only prewarmed the fixture."""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from pytest_shared_session_scope import shared_session_scope_json
+from pytest_shared_session_scope.types import CleanupToken, SetupToken
+
+
+@shared_session_scope_json(prewarm=True)
+def my_fixture(worker_id: str, results_dir):
+    data = yield
+    cleanup_token = yield 123 if data is SetupToken.FIRST else data
+    (results_dir / f"{worker_id}-{time.time_ns()}.json").write_text(
+        json.dumps({"time": time.time(), "is_cleanup_token": cleanup_token is CleanupToken.LAST})
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item: pytest.Item):
+    # The only fixture is prewarmed by gw0. Without waiting for it, the other worker could run all tests
+    # using it before gw0 starts, and gw0 would then not prewarm it.
+    if item.name == "test_with_prewarm_release" and os.environ.get("PYTEST_XDIST_WORKER") != "gw0":
+        # xdist gives each worker a base temp directory inside the one of the run
+        root = Path(item.config.getoption("basetemp")).parent
+        deadline = time.time() + 30
+        while not list(root.glob("*my_fixture_published.json")) and time.time() < deadline:
+            time.sleep(0.01)
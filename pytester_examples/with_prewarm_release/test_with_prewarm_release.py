@@ -0,0 +1,10 @@
+import time
+
+
+def test_slow():
+    # Keeps the worker it runs in busy, while the other worker runs the only test using the fixture
+    time.sleep(2)
+
+
+def test_with_prewarm_release(my_fixture):
+    assert my_fixture == 123
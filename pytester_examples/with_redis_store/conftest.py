@@ -0,0 +1,29 @@
+"""Test that the Redis store shares data, locks and cleanup through the server."""
+
+import json
+import os
+
+from pytest_shared_session_scope import shared_session_scope_fixture
+from pytest_shared_session_scope.store import RedisStore
+from pytest_shared_session_scope.types import CleanupToken, SetupToken
+
+
+STORE = RedisStore(os.environ["REDIS_URL"])
+
+
+@shared_session_scope_fixture(STORE, serialize=json.dumps, deserialize=json.loads, metadata_storage=STORE)
+def my_fixture(worker_id: str, results_dir):
+    setup_token = yield
+    if setup_token is SetupToken.FIRST:
+        data = {"value": 123}
+    else:
+        data = setup_token
+    cleanup_token = yield data
+    (results_dir / f"{worker_id}.json").write_text(
+        json.dumps(
+            {
+                "is_cleanup_token": cleanup_token is CleanupToken.LAST,
+                "is_setup_token": setup_token is SetupToken.FIRST,
+            }
+        )
+    )
@@ -0,0 +1,21 @@
+"""Test that the tests of a fixture set up more than once in a worker are counted once."""
+
+import json
+import uuid
+
+from pytest_shared_session_scope import shared_session_scope_json
+from pytest_shared_session_scope.types import CleanupToken
+
+
+def pytest_collection_modifyitems(items):
+    # Run the tests with parameter "a" before and after the ones with "b", so pytest sets up "a" twice
+    items.sort(key=lambda item: item.name.endswith("[a]") and item.name.startswith("test_2"))
+
+
+@shared_session_scope_json(params=["a", "b"])
+def my_fixture(request, results_dir):
+    yield
+    cleanup_token = yield request.param
+    (results_dir / f"{request.param}-{uuid.uuid4()}.json").write_text(
+        json.dumps({"is_cleanup_token": cleanup_token is CleanupToken.LAST})
+    )
@@ -0,0 +1,6 @@
+def test_1(my_fixture):
+    assert my_fixture in ("a", "b")
+
+
+def test_2(my_fixture):
+    assert my_fixture in ("a", "b")
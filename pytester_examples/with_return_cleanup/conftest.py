@@ -0,0 +1,21 @@
+"""Test that fixtures that return are computed once and cleaned up by the last worker."""
+
+import os
+from pathlib import Path
+import uuid
+
+from pytest_shared_session_scope import shared_session_scope_json
+
+
+def _worker_id() -> str:
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def cleanup(data):
+    (Path(data["results_dir"]) / f"cleanup-{_worker_id()}-{uuid.uuid4()}").touch()
+
+
+@shared_session_scope_json(cleanup=cleanup)
+def my_fixture(results_dir):
+    (results_dir / f"setup-{_worker_id()}-{uuid.uuid4()}").touch()
+    return {"value": 123, "results_dir": str(results_dir)}
@@ -0,0 +1,14 @@
+def test_with_return_cleanup_1(my_fixture):
+    assert my_fixture["value"] == 123
+
+def test_with_return_cleanup_2(my_fixture):
+    assert my_fixture["value"] == 123
+
+def test_with_return_cleanup_3(my_fixture):
+    assert my_fixture["value"] == 123
+
+def test_with_return_cleanup_4(my_fixture):
+    assert my_fixture["value"] == 123
+
+def test_with_return_cleanup_5(my_fixture):
+    assert my_fixture["value"] == 123
@@ -0,0 +1,26 @@
+"""Test that a failed setup is not repeated by every worker, unless retries are allowed."""
+
+import time
+import uuid
+
+from pytest_shared_session_scope import shared_session_scope_json
+
+
+def _attempts(results_dir, name: str) -> int:
+    (results_dir / f"{name}-{uuid.uuid4()}").touch()
+    return len(list(results_dir.glob(f"{name}-*")))
+
+
+@shared_session_scope_json()
+def failing(results_dir):
+    _attempts(results_dir, "failing")
+    time.sleep(0.5)  # Let the other workers wait for the setup
+    raise RuntimeError("broken fixture")
+
+
+@shared_session_scope_json(setup_retries=1, retry_backoff=0.01)
+def flaky(results_dir):
+    if _attempts(results_dir, "flaky") == 1:
+        time.sleep(0.5)
+        raise RuntimeError("flaky fixture")
+    return 123
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.mark.parametrize("i", range(6))
+def test_failing(failing, i):
+    pass
+
+
+@pytest.mark.parametrize("i", range(6))
+def test_flaky(flaky, i):
+    assert flaky == 123
@@ -0,0 +1,25 @@
+"""Test that the shared memory store shares buffers between workers and removes them when done."""
+
+import json
+
+from pytest_shared_session_scope import shared_session_scope_fixture
+from pytest_shared_session_scope.store import SharedMemoryStore
+from pytest_shared_session_scope.types import CleanupToken, SetupToken
+
+
+@shared_session_scope_fixture(SharedMemoryStore())
+def my_fixture(worker_id: str, results_dir):
+    setup_token = yield
+    if setup_token is SetupToken.FIRST:
+        data = b"x" * 10_000
+    else:
+        data = setup_token
+    cleanup_token = yield data
+    (results_dir / f"{worker_id}.json").write_text(
+        json.dumps(
+            {
+                "is_cleanup_token": cleanup_token is CleanupToken.LAST,
+                "is_setup_token": setup_token is SetupToken.FIRST,
+            }
+        )
+    )
@@ -0,0 +1,18 @@
+def test_with_shared_memory_store_1(my_fixture):
+    assert my_fixture == b"x" * 10_000
+
+
+def test_with_shared_memory_store_2(my_fixture):
+    assert my_fixture == b"x" * 10_000
+
+
+def test_with_shared_memory_store_3(my_fixture):
+    assert my_fixture == b"x" * 10_000
+
+
+def test_with_shared_memory_store_4(my_fixture):
+    assert my_fixture == b"x" * 10_000
+
+
+def test_with_shared_memory_store_5(my_fixture):
+    assert my_fixture == b"x" * 10_000
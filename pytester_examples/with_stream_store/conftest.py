@@ -0,0 +1,30 @@
+"""Test that a streaming store writes records as they are produced and every worker iterates all of them."""
+
+import json
+
+from pytest_shared_session_scope import shared_session_scope_fixture
+from pytest_shared_session_scope.store import JsonLinesStore
+from pytest_shared_session_scope.types import CleanupToken, SetupToken
+
+
+def records():
+    for i in range(10_000):
+        yield {"id": i, "name": f"record-{i}"}
+
+
+@shared_session_scope_fixture(JsonLinesStore(chunk_size=100))
+def my_fixture(worker_id: str, results_dir):
+    setup_token = yield
+    if setup_token is SetupToken.FIRST:
+        data = records()
+    else:
+        data = setup_token
+    cleanup_token = yield data
+    (results_dir / f"{worker_id}.json").write_text(
+        json.dumps(
+            {
+                "is_cleanup_token": cleanup_token is CleanupToken.LAST,
+                "is_setup_token": setup_token is SetupToken.FIRST,
+            }
+        )
+    )
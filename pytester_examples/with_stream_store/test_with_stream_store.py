@@ -0,0 +1,28 @@
+def test_with_stream_store_1(my_fixture):
+    # The value can be iterated more than once
+    assert sum(record["id"] for record in my_fixture) == sum(range(10_000))
+    assert next(iter(my_fixture)) == {"id": 0, "name": "record-0"}
+
+
+def test_with_stream_store_2(my_fixture):
+    # The value can be iterated more than once
+    assert sum(record["id"] for record in my_fixture) == sum(range(10_000))
+    assert next(iter(my_fixture)) == {"id": 0, "name": "record-0"}
+
+
+def test_with_stream_store_3(my_fixture):
+    # The value can be iterated more than once
+    assert sum(record["id"] for record in my_fixture) == sum(range(10_000))
+    assert next(iter(my_fixture)) == {"id": 0, "name": "record-0"}
+
+
+def test_with_stream_store_4(my_fixture):
+    # The value can be iterated more than once
+    assert sum(record["id"] for record in my_fixture) == sum(range(10_000))
+    assert next(iter(my_fixture)) == {"id": 0, "name": "record-0"}
+
+
+def test_with_stream_store_5(my_fixture):
+    # The value can be iterated more than once
+    assert sum(record["id"] for record in my_fixture) == sum(range(10_000))
+    assert next(iter(my_fixture)) == {"id": 0, "name": "record-0"}
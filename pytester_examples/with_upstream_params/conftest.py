@@ -0,0 +1,26 @@
+"""Test that a shared fixture depending on a parametrized shared fixture is shared per parameter."""
+
+import json
+
+from pytest_shared_session_scope import shared_session_scope_json
+from pytest_shared_session_scope.types import CleanupToken, SetupToken
+
+
+@shared_session_scope_json(params=["a", "b"])
+def db(request):
+    return request.param
+
+
+@shared_session_scope_json()
+def seeded(db, worker_id: str, results_dir):
+    setup_token = yield
+    data = f"{db}-seeded" if setup_token is SetupToken.FIRST else setup_token
+    cleanup_token = yield data
+    (results_dir / f"seeded-{db}-{worker_id}.json").write_text(
+        json.dumps(
+            {
+                "is_cleanup_token": cleanup_token is CleanupToken.LAST,
+                "is_setup_token": setup_token is SetupToken.FIRST,
+            }
+        )
+    )
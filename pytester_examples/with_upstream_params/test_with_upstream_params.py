@@ -0,0 +1,14 @@
+def test_upstream_params_1(seeded, db):
+    assert seeded == f"{db}-seeded"
+
+
+def test_upstream_params_2(seeded, db):
+    assert seeded == f"{db}-seeded"
+
+
+def test_upstream_params_3(seeded, db):
+    assert seeded == f"{db}-seeded"
+
+
+def test_upstream_params_4(seeded, db):
+    assert seeded == f"{db}-seeded"
@@ -2,12 +2,16 @@
 
 from pytest_shared_session_scope.types import (
     Store as Store,
+    AsyncStore as AsyncStore,
     CleanupToken as CleanupToken,
     SetupToken as SetupToken,
+    SharedFixtureSetupError as SharedFixtureSetupError,
     StoreValueNotExists as StoreValueNotExists,
 )
 
 from pytest_shared_session_scope.fixtures import (
     shared_session_scope_fixture as shared_session_scope_fixture,
     shared_session_scope_json as shared_session_scope_json,
+    shared_session_scope_pickle as shared_session_scope_pickle,
+    shared_session_scope_pool as shared_session_scope_pool,
 )
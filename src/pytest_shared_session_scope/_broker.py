@@ -0,0 +1,180 @@
+"""Coordination of shared fixtures through the pytest-xdist controller.
+
+The controller keeps values, locks and counters in memory. Each worker gets its own
+execnet channel to the controller through `workerinput` when the node is configured,
+so nothing touches the filesystem and it works for any kind of xdist gateway. Workers
+only get a channel when something in the controller uses the broker.
+"""
+
+from collections import deque
+import itertools
+import queue
+import threading
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+if TYPE_CHECKING:
+    from execnet import Channel
+
+CHANNEL_KEY = "pytest_shared_session_scope_channel"
+
+# Identifier the workers write the index of tests by shared fixture to, for the scheduler
+INDEX_KEY = "pytest_shared_session_scope_index"
+
+# Whether a `BrokerStore` was created in this process
+_store_created = False
+
+
+def use_broker():
+    """Make the controller give the workers a channel to the broker, when a `BrokerStore` is created."""
+    global _store_created
+    _store_created = True
+
+
+def broker_used() -> bool:
+    """Whether a `BrokerStore` was created in this process."""
+    return _store_created
+
+
+class Broker:
+    """Answers requests from the workers. Lives in the xdist controller."""
+
+    def __init__(self):
+        # Callbacks for each worker channel run in that channels receiver thread
+        self._mutex = threading.Lock()
+        self._values: dict[str, Any] = {}
+        self._counters: dict[str, int] = {}
+        self._lock_owners: dict[str, "Channel"] = {}
+        self._lock_waiters: dict[str, deque[tuple["Channel", int]]] = {}
+        # Workers waiting for a lock to be released, without acquiring it
+        self._release_waiters: dict[str, list[tuple["Channel", int]]] = {}
+
+    def get(self, identifier: str, default: Any = None) -> Any:
+        """Read a value written by a worker from the controller itself."""
+        with self._mutex:
+            return self._values.get(identifier, default)
+
+    def connect(self, gateway) -> "Channel":
+        """Create a channel to a worker gateway and start answering requests on it."""
+        channel = gateway.newchannel()
+        channel.setcallback(lambda message: self._handle(channel, message), endmarker=None)
+        return channel
+
+    def _handle(self, channel: "Channel", message):
+        with self._mutex:
+            if message is None:  # The worker went away, release whatever it held
+                self._disconnect(channel)
+                return
+            request_id, op, identifier, payload = message
+            if op == "read":
+                if identifier in self._values:
+                    channel.send((request_id, True, self._values[identifier]))
+                else:
+                    channel.send((request_id, False, None))
+            elif op == "write":
+                self._values[identifier] = payload
+                channel.send((request_id, True, None))
+            elif op == "increment":
+                channel.send((request_id, True, self._increment(identifier, payload)))
+            elif op == "release_value":
+                finished, total = payload
+                released = self._increment(identifier + "_released", 1)
+                finished_tests = self._increment(identifier + "_metadata", finished)
+                setups = self._counters.get(identifier + "_setups", 0)
+                channel.send((request_id, True, finished_tests >= total and released >= setups))
+            elif op == "acquire":
+                if identifier in self._lock_owners:
+                    self._lock_waiters.setdefault(identifier, deque()).append((channel, request_id))
+                else:
+                    self._lock_owners[identifier] = channel
+                    channel.send((request_id, True, None))
+            elif op == "release":
+                self._release(identifier)
+            elif op == "wait":
+                if identifier in self._lock_owners:
+                    self._release_waiters.setdefault(identifier, []).append((channel, request_id))
+                else:
+                    channel.send((request_id, True, None))
+            else:
+                channel.send((request_id, False, f"Unknown operation {op!r}"))
+
+    def _increment(self, identifier: str, amount: int) -> int:
+        self._counters[identifier] = self._counters.get(identifier, 0) + amount
+        return self._counters[identifier]
+
+    def _release(self, identifier: str):
+        del self._lock_owners[identifier]
+        for channel, request_id in self._release_waiters.pop(identifier, []):
+            if not channel.isclosed():
+                channel.send((request_id, True, None))
+        waiters = self._lock_waiters.get(identifier)
+        while waiters:
+            channel, request_id = waiters.popleft()
+            if not channel.isclosed():
+                self._lock_owners[identifier] = channel
+                channel.send((request_id, True, None))
+                return
+
+    def _disconnect(self, channel: "Channel"):
+        for waiters in [*self._lock_waiters.values(), *self._release_waiters.values()]:
+            for waiter in [w for w in waiters if w[0] is channel]:
+                waiters.remove(waiter)
+        for identifier in [i for i, owner in self._lock_owners.items() if owner is channel]:
+            self._release(identifier)
+
+
+class BrokerClient:
+    """Sends requests to the `Broker`. Lives in a worker."""
+
+    def __init__(self, channel: "Channel"):
+        self._channel = channel
+        self._send_lock = threading.Lock()
+        self._request_ids = itertools.count()
+        self._pending: dict[int, queue.SimpleQueue] = {}
+        channel.setcallback(self._receive)
+
+    def _receive(self, message):
+        request_id, found, value = message
+        self._pending.pop(request_id).put((found, value))
+
+    def request(self, op: str, identifier: str, payload: Any = None) -> tuple[bool, Any]:
+        """Send a request and block until the controller answers it."""
+        reply: queue.SimpleQueue = queue.SimpleQueue()
+        request_id = next(self._request_ids)
+        self._pending[request_id] = reply
+        with self._send_lock:
+            self._channel.send((request_id, op, identifier, payload))
+        return reply.get()
+
+    def send(self, op: str, identifier: str, payload: Any = None):
+        """Send a request that the controller does not answer."""
+        with self._send_lock:
+            self._channel.send((-1, op, identifier, payload))
+
+
+_broker_key = pytest.StashKey[Broker]()
+_client_key = pytest.StashKey[BrokerClient]()
+
+
+def get_broker(config: pytest.Config) -> Broker:
+    """Get the broker of the controller."""
+    if _broker_key not in config.stash:
+        config.stash[_broker_key] = Broker()
+    return config.stash[_broker_key]
+
+
+def get_client(config: pytest.Config) -> BrokerClient:
+    """Get the client for the broker in the controller."""
+    if _client_key not in config.stash:
+        workerinput = getattr(config, "workerinput", {})
+        if CHANNEL_KEY not in workerinput:
+            msg = (
+                "No channel to the xdist controller was found. "
+                "The pytest-shared-session-scope plugin needs to be active in the controller, and "
+                "`BrokerStore` must be created in a conftest.py or plugin that the controller loads, "
+                "like the conftest.py in the rootdir."
+            )
+            raise RuntimeError(msg)
+        config.stash[_client_key] = BrokerClient(workerinput[CHANNEL_KEY])
+    return config.stash[_client_key]
@@ -0,0 +1,159 @@
+"""Timings of the phases of shared fixtures, reported with `--shared-scope-report`."""
+
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass
+import json
+import math
+import time
+from typing import Any, AsyncIterator, Iterator, Literal
+
+import pytest
+
+REPORT_OPTION = "shared_scope_report"
+REPORT_JSON_OPTION = "shared_scope_report_json"
+
+# Key in the xdist `workeroutput` the workers send their metrics to the controller with
+WORKEROUTPUT_KEY = "pytest_shared_session_scope_metrics"
+
+Phase = Literal["lock_wait", "compute", "write", "read", "teardown"]
+
+
+@dataclass
+class SetupMetrics:
+    """Timings in seconds of one setup and teardown of a shared fixture in one worker.
+
+    `source` is where the value came from: "computed" if this worker ran the setup,
+    "cache" if it was loaded from the persistent cache and "store" if it was read from the store.
+    """
+
+    fixture: str
+    worker: str
+    source: str = "store"
+    lock_wait: float | None = None
+    compute: float = 0.0
+    write: float = 0.0
+    read: float = 0.0
+    teardown: float = 0.0
+    bytes: int | None = None
+
+    @contextmanager
+    def timed(self, phase: Phase) -> Iterator[None]:
+        """Add the time spent in the block to `phase`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            setattr(self, phase, (getattr(self, phase) or 0.0) + time.perf_counter() - start)
+
+    @contextmanager
+    def timed_lock(self, lock) -> Iterator[None]:
+        """Hold a lock, adding how long it took to get it to the lock wait."""
+        start = time.perf_counter()
+        with lock:
+            self.lock_wait = (self.lock_wait or 0.0) + time.perf_counter() - start
+            yield
+
+    @asynccontextmanager
+    async def timed_alock(self, lock) -> AsyncIterator[None]:
+        """Hold an async lock, adding how long it took to get it to the lock wait."""
+        start = time.perf_counter()
+        async with lock:
+            self.lock_wait = (self.lock_wait or 0.0) + time.perf_counter() - start
+            yield
+
+
+metrics_key = pytest.StashKey[list[SetupMetrics]]()
+
+
+def start_setup(config: pytest.Config, fixture: str) -> SetupMetrics:
+    """Start recording the metrics of a setup of a fixture in this process."""
+    workerinput = getattr(config, "workerinput", None)
+    metrics = SetupMetrics(fixture=fixture, worker=workerinput["workerid"] if workerinput else "master")
+    config.stash.setdefault(metrics_key, []).append(metrics)
+    return metrics
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(setups: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Aggregate the metrics of all setups per fixture."""
+    by_fixture: dict[str, list[dict[str, Any]]] = {}
+    for setup in setups:
+        by_fixture.setdefault(setup["fixture"], []).append(setup)
+
+    summary = {}
+    for fixture, fixture_setups in sorted(by_fixture.items()):
+        producers = [s for s in fixture_setups if s["source"] != "store"]
+        lock_waits = [s["lock_wait"] for s in fixture_setups if s["lock_wait"] is not None]
+        sizes = [s["bytes"] for s in producers if s["bytes"] is not None]
+        summary[fixture] = {
+            "workers": len(fixture_setups),
+            "source": producers[0]["source"] if producers else "store",
+            "computed_by": [s["worker"] for s in producers],
+            "compute": sum(s["compute"] for s in fixture_setups),
+            "write": sum(s["write"] for s in fixture_setups),
+            "read": sum(s["read"] for s in fixture_setups),
+            "teardown": sum(s["teardown"] for s in fixture_setups),
+            "lock_wait_p50": _percentile(lock_waits, 50) if lock_waits else None,
+            "lock_wait_p95": _percentile(lock_waits, 95) if lock_waits else None,
+            "lock_wait_max": max(lock_waits) if lock_waits else None,
+            "bytes": sizes[0] if sizes else None,
+            # Every worker that did not produce the value read it from the store
+            "bytes_read": sizes[0] * (len(fixture_setups) - len(producers)) if sizes else None,
+        }
+    return summary
+
+
+def _seconds(value: float | None) -> str:
+    return "-" if value is None else f"{value:.3f}s"
+
+
+def write_report(terminalreporter, setups: list[dict[str, Any]], json_path: str | None):
+    """Print the summary of the setups as a table, and write both as JSON if `json_path` is set."""
+    summary = summarize(setups)
+    terminalreporter.section("shared session scope fixtures")
+    columns = [
+        "fixture",
+        "computed by",
+        "compute",
+        "lock p50",
+        "lock p95",
+        "lock max",
+        "read",
+        "write",
+        "teardown",
+        "bytes",
+    ]
+    rows = [columns]
+    for fixture, s in summary.items():
+        computed_by = ",".join(s["computed_by"]) if s["source"] == "computed" else s["source"]
+        rows.append(
+            [
+                fixture,
+                computed_by,
+                _seconds(s["compute"]),
+                _seconds(s["lock_wait_p50"]),
+                _seconds(s["lock_wait_p95"]),
+                _seconds(s["lock_wait_max"]),
+                _seconds(s["read"]),
+                _seconds(s["write"]),
+                _seconds(s["teardown"]),
+                "-" if s["bytes"] is None else str(s["bytes"]),
+            ]
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    for row in rows:
+        terminalreporter.write_line("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump({"fixtures": summary, "setups": setups}, f, indent=2)
+        terminalreporter.write_line(f"wrote shared fixture report to {json_path}")
+
+
+def setups_as_dicts(metrics: list[SetupMetrics]) -> list[dict[str, Any]]:
+    """Metrics as plain dicts that can be sent through execnet and dumped as JSON."""
+    return [asdict(m) for m in metrics]
@@ -0,0 +1,170 @@
+"""Minimal client for the Redis protocol (RESP2), used by `RedisStore`.
+
+Supports TCP (`redis://[:password@]host:port/db`) and Unix sockets (`unix:///path/to/socket?db=0`).
+Connections are pooled per process, so each worker keeps a few open connections instead of
+connecting for every request.
+"""
+
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+import os
+import socket
+import threading
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+_SEND_DIRECTLY = 64 * 1024
+
+
+class RespError(Exception):
+    """Error reply from the server."""
+
+
+def _encode(arguments: Sequence[Any]) -> list[bytes | memoryview]:
+    """Encode a command as RESP array of bulk strings, without copying bytes-like arguments."""
+    parts: list[bytes | memoryview] = [b"*%d\r\n" % len(arguments)]
+    for argument in arguments:
+        if isinstance(argument, str):
+            argument = argument.encode()
+        elif isinstance(argument, int):
+            argument = str(argument).encode()
+        else:
+            argument = memoryview(argument).cast("B")
+        parts += [b"$%d\r\n" % len(argument), argument, b"\r\n"]
+    return parts
+
+
+class RespConnection:
+    """A single connection to the server."""
+
+    def __init__(self, url: str, timeout: float | None):
+        """Connect to the server at `url`."""
+        parsed = urlparse(url)
+        options = parse_qs(parsed.query)
+        if parsed.scheme == "unix":
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(parsed.path)
+            db = options.get("db", ["0"])[0]
+        elif parsed.scheme in ("redis", "tcp"):
+            self._socket = socket.create_connection((parsed.hostname, parsed.port or 6379), timeout)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            db = parsed.path.lstrip("/") or options.get("db", ["0"])[0]
+        else:
+            msg = f"Unsupported scheme in {url!r}. Use redis:// or unix://."
+            raise ValueError(msg)
+        self._reader = self._socket.makefile("rb")
+        if parsed.password:
+            username = [unquote(parsed.username)] if parsed.username else []
+            self.execute("AUTH", *username, unquote(parsed.password))
+        if db != "0":
+            self.execute("SELECT", db)
+
+    def close(self):
+        """Close the connection."""
+        self._reader.close()
+        self._socket.close()
+
+    def pipeline(self, commands: Sequence[Sequence[Any]]) -> list[Any]:
+        """Send several commands in one round trip and return their replies.
+
+        Error replies are returned as `RespError` instead of raised, so the other replies are still read.
+        """
+        self._send([part for command in commands for part in _encode(command)])
+        return [self._read_reply() for _ in commands]
+
+    def execute(self, *arguments: Any) -> Any:
+        """Send a command and return its reply.
+
+        Raises:
+            RespError: If the server replies with an error.
+        """
+        (reply,) = self.pipeline([arguments])
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def _send(self, parts: list[bytes | memoryview]):
+        # Small parts are sent together, large values as they are instead of being copied into the buffer
+        buffer = bytearray()
+        for part in parts:
+            if len(part) < _SEND_DIRECTLY:
+                buffer += part
+                continue
+            if buffer:
+                self._socket.sendall(buffer)
+                buffer = bytearray()
+            self._socket.sendall(part)
+        if buffer:
+            self._socket.sendall(buffer)
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by the server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            return RespError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length == -1:
+                return None
+            data = self._reader.read(length)
+            self._reader.read(2)
+            return data
+        if kind == b"*":
+            length = int(rest)
+            if length == -1:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from the server: {line!r}")
+
+
+class RespPool:
+    """Pool of connections to one server, shared by the threads of a process."""
+
+    def __init__(self, url: str, timeout: float | None = None, max_idle: int = 4):
+        """Create a pool of connections to `url`, keeping at most `max_idle` idle connections open."""
+        self.url = url
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle: list[RespConnection] = []
+        self._mutex = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[RespConnection]:
+        """Borrow a connection. Connections that fail are closed instead of returned to the pool."""
+        with self._mutex:
+            connection = self._idle.pop() if self._idle else None
+        if connection is None:
+            connection = RespConnection(self.url, self.timeout)
+        try:
+            yield connection
+        except BaseException:
+            # A reply may be left unread, so the connection can not be reused
+            connection.close()
+            raise
+        with self._mutex:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+
+_pools: dict[tuple[int, str], RespPool] = {}
+_pools_mutex = threading.Lock()
+
+
+def get_pool(url: str, timeout: float | None = None) -> RespPool:
+    """Get the connection pool of this process for `url`."""
+    # Connections must not be shared with forked processes
+    key = (os.getpid(), url)
+    with _pools_mutex:
+        if key not in _pools:
+            _pools[key] = RespPool(url, timeout)
+        return _pools[key]
@@ -0,0 +1,86 @@
+"""xdist scheduling that groups tests by the shared fixtures they use.
+
+Only imported by the controller when running with `--shared-scope-dist`, so xdist is
+imported lazily.
+"""
+
+from collections import OrderedDict, defaultdict
+import math
+
+import pytest
+from xdist.remote import Producer
+from xdist.scheduler import LoadScopeScheduling
+
+from pytest_shared_session_scope._broker import INDEX_KEY, get_broker
+
+
+class SharedFixtureScheduling(LoadScopeScheduling):
+    """Distribute tests so that each shared fixture is set up in parallel and its tests run close in time.
+
+    Tests are grouped by the shared fixtures they use, and each group is split into work units for
+    a share of the workers proportional to its share of the tests. The workqueue starts with the
+    first unit of every group, so different workers set up different fixtures at the same time
+    instead of all waiting for the lock of the same one. The remaining units follow group by group,
+    so the tests of a fixture finish close together and the last worker can clean up early. Tests
+    without shared fixtures come last and even out the load at the end.
+    """
+
+    def __init__(self, config: pytest.Config, log: Producer | None = None):
+        super().__init__(config, log)
+        if log is None:
+            self.log = Producer("sharedfixturesched")
+        else:
+            self.log = log.sharedfixturesched
+        self._unit_of: dict[str, str] = {}
+
+    def _split_scope(self, nodeid: str) -> str:
+        return self._unit_of.get(nodeid, nodeid)
+
+    def schedule(self) -> None:
+        """Build the workqueue from the index of tests by shared fixture and start distributing it."""
+        assert self.collection_is_completed
+        if self.collection is None:
+            if not self._check_nodes_have_same_collection():
+                self.log("**Different tests collected, aborting run**")
+                return
+            self.collection = list(next(iter(self.registered_collections.values())))
+            if not self.collection:
+                return
+            self.workqueue = self._build_workqueue(self.collection)
+        super().schedule()
+
+    def _build_workqueue(self, collection: list[str]) -> "OrderedDict[str, dict[str, bool]]":
+        # Written by every worker after collection, before they report the collection to the controller
+        index: dict[str, list[str]] = get_broker(self.config).get(INDEX_KEY) or {}
+        fixtures_of: defaultdict[str, list[str]] = defaultdict(list)
+        for key, nodeids in sorted(index.items()):
+            for nodeid in nodeids:
+                fixtures_of[nodeid].append(key)
+
+        groups: dict[str, list[str]] = {}
+        without_fixtures = []
+        for nodeid in collection:
+            if nodeid in fixtures_of:
+                groups.setdefault(",".join(fixtures_of[nodeid]), []).append(nodeid)
+            else:
+                without_fixtures.append(nodeid)
+
+        # Each group gets a share of the workers proportional to its share of the tests
+        n_workers = max(len(self.nodes), 1)
+        n_with_fixtures = sum(len(nodeids) for nodeids in groups.values())
+        units: list[list[tuple[str, list[str]]]] = []
+        for group, nodeids in sorted(groups.items(), key=lambda item: -len(item[1])):
+            n_chunks = min(len(nodeids), max(1, round(n_workers * len(nodeids) / n_with_fixtures)))
+            size = math.ceil(len(nodeids) / n_chunks)
+            chunks = [nodeids[i : i + size] for i in range(0, len(nodeids), size)]
+            units.append([(f"{group}@{i}", chunk) for i, chunk in enumerate(chunks)])
+
+        ordered = [group_units[0] for group_units in units]
+        ordered += [unit for group_units in units for unit in group_units[1:]]
+        ordered += [(nodeid, [nodeid]) for nodeid in without_fixtures]
+
+        workqueue: OrderedDict[str, dict[str, bool]] = OrderedDict()
+        for name, nodeids in ordered:
+            workqueue[name] = dict.fromkeys(nodeids, False)
+            self._unit_of.update(dict.fromkeys(nodeids, name))
+        return workqueue
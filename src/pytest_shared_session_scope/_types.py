@@ -1,3 +1,144 @@
+from collections import Counter
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import hashlib
+import re
+from typing import Any
+
 import pytest
 
-tests_started = pytest.StashKey[list[str]]()
+# Names of all fixtures created with `shared_session_scope_fixture`
+shared_fixture_names: set[str] = set()
+
+# Names of the shared fixtures created with `prewarm=True`
+prewarm_fixture_names: set[str] = set()
+
+# Shared fixture name -> whether all tests using it have finished in all workers, if it is not parametrized
+tests_finished_checks: dict[str, Callable[[pytest.FixtureRequest], bool]] = {}
+
+# Shared fixture name -> names of the arguments of the fixture function, some of which may be shared fixtures
+fixture_arguments: dict[str, tuple[str, ...]] = {}
+
+# Shared fixture name -> version of its current value in this process
+fixture_versions = pytest.StashKey[dict[str, str]]()
+
+# Shared fixture name -> instance id of its current value in this process, see `instance_param`
+fixture_params = pytest.StashKey[dict[str, str | None]]()
+
+# Shared fixture key -> nodeids of the collected tests using it, directly or through other fixtures
+tests_by_fixture = pytest.StashKey[dict[str, frozenset[str]]]()
+
+# Shared fixture key -> number of tests using it that have been started in this process
+tests_started = pytest.StashKey[Counter[str]]()
+
+# Shared fixture key -> number of the started tests that have been added to the shared count of finished tests
+tests_counted = pytest.StashKey[Counter[str]]()
+
+
+def count_finished_tests(config: pytest.Config, key: str) -> int:
+    """Number of tests using a shared fixture that were started in this process since the last call.
+
+    A fixture can be set up more than once in a process, and each of its tests must only be counted once.
+    """
+    started = config.stash.get(tests_started, Counter())[key]
+    counted = config.stash.setdefault(tests_counted, Counter())
+    amount = started - counted[key]
+    counted[key] = started
+    return amount
+
+
+@dataclass
+class EarlyCleanup:
+    """A shared fixture created with `early_cleanup=True` that is set up in this process."""
+
+    # Number of collected tests using the fixture
+    total: int
+    # Adds tests of this process that finished to the shared count, and returns the count of all processes
+    report: Callable[[int], int]
+    # Tears down the fixture in this process
+    finish: Callable[[], None]
+
+
+# Shared fixture key -> fixtures to tear down as soon as all tests using them have finished
+early_cleanups = pytest.StashKey[dict[str, EarlyCleanup]]()
+
+
+def _stable_pickle(value: Any) -> bytes:
+    """Pickle a value to the same bytes in every process.
+
+    The order of the members of sets depends on the hash seed of the process, so sets are pickled
+    as their members sorted by their own pickles, also when they are nested in other objects.
+    """
+    import io
+    import pickle
+
+    class Pickler(pickle.Pickler):
+        def persistent_id(self, obj: Any) -> Any:
+            # Called for every object, unlike `reducer_override` which is skipped for builtin types
+            if isinstance(obj, (set, frozenset)):
+                return (type(obj).__qualname__, sorted(_stable_pickle(member) for member in obj))
+            return None
+
+    buffer = io.BytesIO()
+    Pickler(buffer, protocol=5).dump(value)
+    return buffer.getvalue()
+
+
+def param_id(value: Any) -> str:
+    """Id of a fixture parameter that is the same in all workers and safe to use in file names.
+
+    Parameters are identified by their pickle, with the members of sets sorted, so parameters
+    that are not equal, or are of different types like a tuple and a list, get different ids.
+
+    Raises:
+        TypeError: If the parameter can not be pickled.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        readable = re.sub(r"[^\w.-]", "_", str(value))[:32]
+        return f"{readable}-{hashlib.sha1(repr(value).encode()).hexdigest()[:8]}"
+    try:
+        serialized = _stable_pickle(value)
+    except Exception as e:
+        msg = (
+            f"The parameter {value!r} of a shared fixture can not be told apart from other parameters "
+            "in other workers, as it can not be pickled."
+        )
+        raise TypeError(msg) from e
+    return f"{type(value).__name__}-{hashlib.sha1(serialized).hexdigest()[:8]}"
+
+
+def instance_param(param: str | None, upstream: dict[str, str | None]) -> str | None:
+    """Id of an instance of a shared fixture, from its parameter id and the instance ids of its dependencies.
+
+    A fixture depending on a parametrized shared fixture has one instance per parameter of that fixture,
+    even when it is not parametrized itself.
+    """
+    parts = [] if param is None else [param]
+    parts.extend(f"{name}={upstream[name]}" for name in sorted(upstream) if upstream[name] is not None)
+    return ",".join(parts) or None
+
+
+def fixture_key(name: str, param: str | None) -> str:
+    """Key of a shared fixture, with one key per parameter for parametrized fixtures."""
+    return name if param is None else f"{name}[{param}]"
+
+
+def shared_dependencies(name: str) -> list[str]:
+    """Names of the shared fixtures that a shared fixture requests directly."""
+    return [argument for argument in fixture_arguments.get(name, ()) if argument in shared_fixture_names]
+
+
+def dependency_order(names: Iterable[str]) -> list[str]:
+    """Sort shared fixtures by their depth in the dependency graph, then by name.
+
+    Fixtures without shared dependencies come first, and every fixture comes after the ones it depends on.
+    """
+    depths: dict[str, int] = {}
+
+    def depth(name: str, seen: frozenset[str]) -> int:
+        if name not in depths:
+            upstream = [d for d in shared_dependencies(name) if d not in seen]  # pytest reports cycles itself
+            depths[name] = 1 + max((depth(d, seen | {name}) for d in upstream), default=-1)
+        return depths[name]
+
+    return sorted(names, key=lambda name: (depth(name, frozenset()), name))
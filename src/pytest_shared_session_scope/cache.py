@@ -0,0 +1,164 @@
+"""Persistent cache for shared fixture values across test runs."""
+
+from collections.abc import Callable, Iterable, Mapping
+import functools
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Any
+
+import pytest
+
+from pytest_shared_session_scope.types import StoreValueNotExists
+
+CACHE_DIR_INI = "shared_scope_cache_dir"
+CACHE_CLEAR_OPTION = "shared_scope_cache_clear"
+
+_ENTRY_SUFFIX = ".entry"
+
+
+def get_cache_dir(config: pytest.Config) -> Path | None:
+    """Directory holding the persistent cache, or None if it is not available."""
+    configured = config.getini(CACHE_DIR_INI)
+    if configured:
+        return config.rootpath / configured
+    cache = getattr(config, "cache", None)
+    if cache is None:  # cacheprovider plugin is disabled
+        return None
+    return cache.mkdir("shared_session_scope")
+
+
+def clear_cache(config: pytest.Config):
+    """Remove all entries of the persistent cache."""
+    cache_dir = get_cache_dir(config)
+    if cache_dir is not None and cache_dir.exists():
+        shutil.rmtree(cache_dir)
+
+
+@functools.cache
+def _source(func: Callable) -> str:
+    # Reading and tokenizing the source file is expensive, and every setup of a fixture needs it
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return ""
+
+
+class PersistentCache:
+    """Opt-in cache that keeps the serialized value of a shared fixture between test runs.
+
+    On a warm run the worker that would otherwise compute the value loads it from the
+    cache instead and publishes it to the store, so no worker runs the setup.
+
+    The cache key is built from the source code of the fixture, the values of the
+    fixture arguments listed in `inputs`, `version` and the versions of the shared fixtures
+    it depends on. Bump `version` to invalidate entries when something the key does not
+    cover changes (for example an external file). Entries of the fixtures depending on it
+    are invalidated with it.
+
+    Entries live in the directory configured with the `shared_scope_cache_dir` ini option,
+    defaulting to a folder in the pytest cache directory. The least recently used entries
+    are evicted when there are more than `max_entries` or they take up more than `max_bytes`.
+    Run with `--shared-scope-cache-clear` to remove all entries.
+    """
+
+    def __init__(
+        self,
+        version: str = "",
+        inputs: Iterable[str] = (),
+        max_entries: int | None = 128,
+        max_bytes: int | None = None,
+        dumps: Callable[[Any], str | bytes] = json.dumps,
+        loads: Callable[[bytes], Any] = json.loads,
+    ):
+        """Create a persistent cache.
+
+        Args:
+            version: User supplied version that is part of the cache key.
+            inputs: Names of arguments of the fixture whose values are part of the cache key.
+            max_entries: Maximum number of entries in the cache directory.
+            max_bytes: Maximum total size in bytes of the entries in the cache directory.
+            dumps: Function converting the serialized value to str or bytes for the cache file.
+            loads: Function converting the bytes from the cache file back to the serialized value.
+        """
+        self.version = version
+        self.inputs = tuple(inputs)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.dumps = dumps
+        self.loads = loads
+
+    def key(
+        self,
+        func: Callable,
+        identifier: str,
+        arguments: Mapping[str, Any],
+        upstream: Mapping[str, str] | None = None,
+    ) -> str:
+        """Cache key for a fixture function called with `arguments`.
+
+        Args:
+            func: The fixture function.
+            identifier: Identifier of the fixture in the store.
+            arguments: Values of the arguments of the fixture function.
+            upstream: Versions of the shared fixtures the fixture depends on.
+        """
+        source = _source(func)
+        inputs = {name: arguments[name] for name in self.inputs}
+        parts = [identifier, source, self.version, json.dumps(inputs, sort_keys=True, default=repr)]
+        if upstream:
+            parts.append(json.dumps(dict(upstream), sort_keys=True))
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def get(self, key: str, config: pytest.Config) -> Any:
+        """Read a value from the cache.
+
+        Raises:
+            StoreValueNotExists: If there is no entry for the key.
+        """
+        cache_dir = get_cache_dir(config)
+        if cache_dir is None:
+            raise StoreValueNotExists()
+        path = cache_dir / f"{key}{_ENTRY_SUFFIX}"
+        try:
+            content = path.read_bytes()
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            raise StoreValueNotExists()
+        return self.loads(content)
+
+    def set(self, key: str, data: Any, config: pytest.Config):
+        """Write a value to the cache and evict old entries."""
+        cache_dir = get_cache_dir(config)
+        if cache_dir is None:
+            return
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        content = self.dumps(data)
+        if isinstance(content, str):
+            content = content.encode()
+        path = cache_dir / f"{key}{_ENTRY_SUFFIX}"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+        self._evict(cache_dir)
+
+    def _evict(self, cache_dir: Path):
+        entries = []
+        for path in cache_dir.glob(f"*{_ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # Evicted by another worker
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(reverse=True)  # Most recently used first
+
+        total_bytes = 0
+        for count, (_, size, path) in enumerate(entries, start=1):
+            total_bytes += size
+            too_many = self.max_entries is not None and count > self.max_entries
+            too_big = self.max_bytes is not None and total_bytes > self.max_bytes
+            if too_many or too_big:
+                path.unlink(missing_ok=True)
@@ -1,20 +1,52 @@
 """Shared Session Scope Fixtures."""
 
+from dataclasses import dataclass
 import functools
 import typing
-from contextlib import suppress
+from contextlib import AbstractAsyncContextManager, AbstractContextManager, asynccontextmanager, suppress
 import inspect
-from collections.abc import Callable
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable, Coroutine, Generator
 import json
-from typing import Any, Iterable, TypeVar
-from typing_extensions import Generator
+import time
+import traceback
+from typing import Any, Iterable, Literal, TypeVar
 
 import pytest
 
-from pytest_shared_session_scope._types import tests_started
-from pytest_shared_session_scope.store import FileStore, JsonStore
-from pytest_shared_session_scope.types import CleanupToken, SetupToken, Store, StoreValueNotExists
-from xdist import is_xdist_worker
+from pytest_shared_session_scope._metrics import SetupMetrics, start_setup
+from pytest_shared_session_scope.cache import PersistentCache
+from pytest_shared_session_scope._types import (
+    EarlyCleanup,
+    count_finished_tests,
+    early_cleanups,
+    fixture_arguments,
+    fixture_key,
+    fixture_params,
+    fixture_versions,
+    instance_param,
+    param_id,
+    prewarm_fixture_names,
+    shared_dependencies,
+    shared_fixture_names,
+    tests_by_fixture,
+    tests_finished_checks,
+    tests_started,
+)
+from pytest_shared_session_scope.store import FileStore, JsonStore, PickleStore
+from pytest_shared_session_scope.types import (
+    AsyncStore,
+    CleanupToken,
+    SetupToken,
+    SharedFixtureSetupError,
+    Store,
+    StoreValueNotExists,
+    SupportsDelete,
+    SupportsIncrement,
+    SupportsRelease,
+    SupportsSize,
+    SupportsStream,
+    SupportsWait,
+)
 
 _T = TypeVar("_T")
 
@@ -23,16 +55,18 @@ def _identity(v: _T) -> _T:
     return v
 
 
+_EXHAUSTED_TOO_EARLY = (
+    "This generator should not have been exhausted. "
+    "Remember that pytest-shared-session-scope fixtures that yields "
+    "MUST yield exactly twice."
+)
+
+
 def _send_first(generator: Generator, value: Any):
     try:
         return generator.send(value)
     except StopIteration as e:
-        msg = (
-            "This generator should not have been exhausted. "
-            "Remember that pytest-shared-session-scope fixtures that yields "
-            "MUST yield exactly twice."
-        )
-        raise ValueError(msg) from e
+        raise ValueError(_EXHAUSTED_TOO_EARLY) from e
 
 
 def _send_last(generator: Generator[Any, CleanupToken | None, Any], token: CleanupToken | None):
@@ -42,18 +76,637 @@ def _send_last(generator: Generator[Any, CleanupToken | None, Any], token: Clean
         raise AssertionError(msg)
 
 
-def _get_tests_for_fixture(fixture, request: pytest.FixtureRequest) -> list[str]:
-    return list(
-        {
-            item.nodeid
-            for item in request.session.items
-            if fixture.__name__ in item.fixturenames  # type: ignore
-        }
-    )
+async def _asend_first(generator: AsyncGenerator, value: Any):
+    try:
+        return await generator.asend(value)
+    except StopAsyncIteration as e:
+        raise ValueError(_EXHAUSTED_TOO_EARLY) from e
+
+
+async def _asend_last(generator: AsyncGenerator[Any, CleanupToken | None], token: CleanupToken | None):
+    with suppress(StopAsyncIteration):
+        await generator.asend(token)
+        msg = "This generator should have been exhausted"
+        raise AssertionError(msg)
+
+
+def _as_generator(func: Callable, cleanup: Callable[[Any], Any] | None) -> Callable[..., Generator]:
+    """Turn a fixture that returns into one that yields twice, so both kinds are shared the same way."""
+
+    @functools.wraps(func)
+    def generator(*args, **kwargs):
+        data = yield
+        if data is SetupToken.FIRST:
+            data = func(*args, **kwargs)
+        token = yield data
+        if token is CleanupToken.LAST and cleanup is not None:
+            cleanup(data)
+
+    return generator
+
+
+def _as_async_generator(
+    func: Callable, cleanup: Callable[[Any], Any] | None
+) -> Callable[..., AsyncGenerator]:
+    """Turn an async fixture that returns into one that yields twice. `cleanup` may be async."""
+
+    @functools.wraps(func)
+    async def generator(*args, **kwargs):
+        data = yield
+        if data is SetupToken.FIRST:
+            data = await func(*args, **kwargs)
+        token = yield data
+        if token is CleanupToken.LAST and cleanup is not None:
+            result = cleanup(data)
+            if inspect.isawaitable(result):
+                await result
+
+    return generator
+
+
+async def _run_in_thread(setup: Callable[[Callable[[Any], Any]], _T], generator: AsyncGenerator) -> _T:
+    """Run the setup of an async fixture in a thread, so lock waits and store I/O do not block the event loop.
+
+    `setup` is called with a function sending a value to the fixture. The fixture code runs in
+    this task, not in the thread, as an async generator must stay in the task it was started in.
+    """
+    import asyncio
+    from concurrent.futures import Future
+
+    loop = asyncio.get_running_loop()
+    sends: asyncio.Queue[tuple[Any, Future]] = asyncio.Queue()
+    waiting = True
+
+    def send_first(value: Any) -> Any:
+        result: Future = Future()
+
+        def put():
+            if waiting:
+                sends.put_nowait((value, result))
+            else:  # This task was cancelled and will not run the fixture anymore
+                result.cancel()
+
+        loop.call_soon_threadsafe(put)
+        return result.result()
+
+    thread = asyncio.ensure_future(asyncio.to_thread(setup, send_first))
+    try:
+        while True:
+            send = asyncio.ensure_future(sends.get())
+            try:
+                await asyncio.wait([thread, send], return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                send.cancel()
+            if thread.done():
+                return thread.result()
+            value, result = send.result()
+            try:
+                result.set_result(await _asend_first(generator, value))
+            except BaseException as e:
+                result.set_exception(e)
+                if not isinstance(e, Exception):
+                    raise
+    finally:
+        waiting = False
+        while not sends.empty():
+            sends.get_nowait()[1].cancel()
+
+
+class _BlockingIO:
+    """Store operations of the setup of a fixture, done in the calling thread.
+
+    Its coroutines never suspend, so a setup using them is run to completion by `_run_blocking`.
+    """
+
+    async def read(self, store: Store, identifier: str, fixture_values: dict[str, Any]) -> Any:
+        return store.read(identifier, fixture_values)
+
+    async def write(self, store: Store, identifier: str, data: Any, fixture_values: dict[str, Any]):
+        store.write(identifier, data, fixture_values)
+
+    def lock(
+        self, store: Store, identifier: str, fixture_values: dict[str, Any]
+    ) -> AbstractAsyncContextManager:
+        return _held(store.lock(identifier, fixture_values))
+
+    async def call(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Call a function doing I/O that has no async variant, like the store extensions."""
+        return func(*args)
+
+    async def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+class _LoopIO(_BlockingIO):
+    """Store operations of the setup of an async fixture, awaited on the event loop.
+
+    Used when the stores implement `AsyncStore`. The functions without an async variant run in a thread.
+    """
+
+    async def read(self, store: Store, identifier: str, fixture_values: dict[str, Any]) -> Any:
+        return await typing.cast(AsyncStore, store).aread(identifier, fixture_values)
+
+    async def write(self, store: Store, identifier: str, data: Any, fixture_values: dict[str, Any]):
+        await typing.cast(AsyncStore, store).awrite(identifier, data, fixture_values)
+
+    def lock(
+        self, store: Store, identifier: str, fixture_values: dict[str, Any]
+    ) -> AbstractAsyncContextManager:
+        return typing.cast(AsyncStore, store).alock(identifier, fixture_values)
+
+    async def call(self, func: Callable[..., _T], *args: Any) -> _T:
+        import asyncio
+
+        return await asyncio.to_thread(func, *args)
+
+    async def sleep(self, seconds: float):
+        import asyncio
+
+        await asyncio.sleep(seconds)
+
+
+@asynccontextmanager
+async def _held(lock: AbstractContextManager) -> AsyncIterator[None]:
+    with lock:
+        yield
+
+
+def _run_blocking(coroutine: Coroutine[Any, Any, _T]) -> _T:
+    """Run a coroutine that never suspends, like a setup using `_BlockingIO`, and return its result."""
+    try:
+        coroutine.send(None)
+    except StopIteration as e:
+        return e.value
+    coroutine.close()
+    msg = "The setup was suspended, but it does not run in an event loop"
+    raise RuntimeError(msg)
+
+
+@functools.cache
+def _is_stream_store(store_type: type) -> bool:
+    # Checking a runtime protocol is slow, and every decorated fixture needs to know
+    return issubclass(store_type, SupportsStream)
+
+
+def _is_xdist_worker(request: pytest.FixtureRequest) -> bool:
+    # pytest-xdist is not a dependency, so this does not use `xdist.is_xdist_worker`
+    return hasattr(request.config, "workerinput")
+
+
+def _get_param_id(request: pytest.FixtureRequest) -> str | None:
+    if not hasattr(request, "param"):
+        return None
+    return param_id(request.param)  # type: ignore
+
+
+def _get_instance_param(request: pytest.FixtureRequest, fixture_name: str) -> str | None:
+    # pytest sets up the shared fixtures this one depends on first, so their instances are known
+    params = request.config.stash.setdefault(fixture_params, {})
+    upstream = {name: params.get(name) for name in shared_dependencies(fixture_name)}
+    params[fixture_name] = instance_param(_get_param_id(request), upstream)
+    return params[fixture_name]
+
+
+def _get_tests_for_fixture(key: str, request: pytest.FixtureRequest) -> frozenset[str]:
+    return request.config.stash.get(tests_by_fixture, {}).get(key, frozenset())
+
+
+def _read_counter(metadata_storage: Store[str], identifier: str, fixture_values: dict[str, Any]) -> int:
+    try:
+        return json.loads(metadata_storage.read(identifier, fixture_values))
+    except StoreValueNotExists:
+        return 0
+
+
+def _increment(
+    metadata_storage: Store[str], identifier: str, amount: int, fixture_values: dict[str, Any]
+) -> int:
+    """Add to a counter shared by all workers and return the new value.
+
+    Uses the atomic counters of the store if it has them, and otherwise the lock of the store.
+    """
+    if isinstance(metadata_storage, SupportsIncrement):
+        return metadata_storage.increment(identifier, amount, fixture_values)
+    if amount == 0:
+        # Nothing to add, and counters are written atomically, so reading it without the lock is enough
+        return _read_counter(metadata_storage, identifier, fixture_values)
+    with metadata_storage.lock(identifier, fixture_values):
+        value = _read_counter(metadata_storage, identifier, fixture_values) + amount
+        metadata_storage.write(identifier, json.dumps(value), fixture_values)
+    return value
+
+
+def _register_early_cleanup(call: "_FixtureCall", total: int, report: Callable[[int], int]):
+    """Let the plugin tear the fixture down in this process as soon as all tests using it have finished."""
+    # pytest has no public API to tear down a single fixture
+    fixturedef = call.request._fixturedef  # type: ignore[attr-defined]
+    early = EarlyCleanup(total, report, functools.partial(fixturedef.finish, call.request))
+    call.request.config.stash.setdefault(early_cleanups, {})[call.key] = early
+
+
+def _release(
+    metadata_storage: Store[str],
+    call: "_FixtureCall",
+    finished_in_worker: int,
+    report: Callable[[int], int],
+    total: int,
+) -> bool:
+    """Release the value of a fixture in this worker, and tell whether it is the last one to let go of it.
+
+    Every worker counts the values it set up and released. The last worker is the one releasing the last
+    value, once all tests using the fixture have finished. This may be a worker that only prewarmed the
+    fixture, or with early cleanup one that still runs other tests. The counts are updated and compared
+    in one call if the store supports it, and otherwise under a lock, so exactly one worker sees the last
+    release.
+
+    Args:
+        metadata_storage: Store of the counters.
+        call: The setup of the fixture in this worker.
+        finished_in_worker: Number of tests using the fixture this worker ran that were not reported yet.
+        report: Adds tests to the shared count of finished tests and returns the count of all workers.
+        total: Number of collected tests using the fixture.
+    """
+    if isinstance(metadata_storage, SupportsRelease):
+        return metadata_storage.release(call.store_identifier, finished_in_worker, total, call.fixture_values)
+    with metadata_storage.lock(call.store_identifier + "_release", call.fixture_values):
+        released = _increment(metadata_storage, call.store_identifier + "_released", 1, call.fixture_values)
+        if report(finished_in_worker) < total:
+            # A worker that did not set up the fixture yet still runs tests using it, and releases it later
+            return False
+        setups = _increment(metadata_storage, call.store_identifier + "_setups", 0, call.fixture_values)
+    return released >= setups
+
+
+def _check_version(marker: str, version: str):
+    """Check that a published marker is for the expected version of a value.
+
+    Raises:
+        StoreValueNotExists: If the published value has another version.
+    """
+    published = json.loads(marker)
+    if not isinstance(published, dict) or published.get("version") != version:
+        raise StoreValueNotExists()
+
+
+def _marker(version: str, upstream: dict[str, str]) -> str:
+    return json.dumps({"version": version, "upstream": upstream})
+
+
+async def _read_published(
+    io: _BlockingIO,
+    store: Store,
+    metadata_storage: Store[str],
+    identifier: str,
+    version: str,
+    fixture_values: dict[str, Any],
+) -> Any:
+    """Read a value without taking the lock.
+
+    This is only safe once the value has been completely written, which is what the
+    published marker in the metadata storage signals. The marker holds the version of
+    the value, so a value computed from other versions of its upstream fixtures is not used.
+
+    Raises:
+        StoreValueNotExists: If the value has not been published yet, or with another version.
+    """
+    _check_version(await io.read(metadata_storage, identifier + "_published", fixture_values), version)
+    return await io.read(store, identifier, fixture_values)
+
+
+async def _publish(
+    io: _BlockingIO, store: Store, metadata_storage: Store[str], call: "_FixtureCall", data: Any
+):
+    """Write a value and then mark it as published so other workers can read it without locking."""
+    await io.write(store, call.store_identifier, data, call.fixture_values)
+    await _mark_published(io, metadata_storage, call)
+
+
+async def _mark_published(io: _BlockingIO, metadata_storage: Store[str], call: "_FixtureCall"):
+    marker = _marker(call.version, call.upstream)
+    await io.write(metadata_storage, call.store_identifier + "_published", marker, call.fixture_values)
+
+
+def _write_stream(store: SupportsStream, call: "_FixtureCall", records: Iterable[Any]) -> Any:
+    """Write the records of a streamed value and return the value read back lazily from the store.
+
+    Streams are marked as published before this is called, outside of the lock, so other workers
+    read the records while they are written.
+    """
+    with call.metrics.timed("write"):
+        store.write_stream(call.store_identifier, records, call.fixture_values)
+    call.metrics.bytes = _stored_size(store, call.store_identifier, call.fixture_values)  # type: ignore[arg-type]
+    return store.read(call.store_identifier, call.fixture_values)  # type: ignore[attr-defined]
+
+
+async def _check_setup_error(
+    io: _BlockingIO, metadata_storage: Store[str], call: "_FixtureCall", retries: int, backoff: float
+):
+    """Raise the error of a worker that failed to set up the value, or wait before retrying the setup.
+
+    Called with the lock held, so the other workers wait for the retry too. The wait doubles
+    with every failed attempt.
+
+    Raises:
+        SharedFixtureSetupError: If the setup failed more than `retries` times.
+    """
+    try:
+        record = json.loads(
+            await io.read(metadata_storage, call.store_identifier + "_error", call.fixture_values)
+        )
+    except StoreValueNotExists:
+        return
+    if record["version"] != call.version:
+        return
+    if record["attempts"] > retries:
+        raise SharedFixtureSetupError(call.key, record["worker"], record["traceback"]) from None
+    await io.sleep(max(0.0, record["failed_at"] + backoff * 2 ** (record["attempts"] - 1) - time.time()))
+
+
+async def _record_setup_error(
+    io: _BlockingIO, metadata_storage: Store[str], call: "_FixtureCall", error: Exception
+):
+    """Record an error raised by the setup, so other workers fail with it instead of setting it up again."""
+    identifier = call.store_identifier + "_error"
+    try:
+        record = json.loads(await io.read(metadata_storage, identifier, call.fixture_values))
+        attempts = record["attempts"] if record["version"] == call.version else 0
+    except StoreValueNotExists:
+        attempts = 0
+    record = {
+        "version": call.version,
+        "worker": call.request.config.workerinput["workerid"],  # type: ignore[attr-defined]
+        # The errors the setup happened to run during are only noise
+        "traceback": "".join(traceback.format_exception(error, chain=False)),
+        "failed_at": time.time(),
+        "attempts": attempts + 1,
+    }
+    await io.write(metadata_storage, identifier, json.dumps(record), call.fixture_values)
+
+
+def _delete_stored(store: Store, identifier: str, fixture_values: dict[str, Any]):
+    """Delete a stored value after the last worker is done with it, if the store needs that."""
+    if isinstance(store, SupportsDelete):
+        store.delete(identifier, fixture_values)
+
+
+def _retire(metadata_storage: Store[str], call: "_FixtureCall"):
+    """Mark a value as cleaned up before the last cleanup runs.
+
+    A worker setting the fixture up later, like one that prewarms it after all tests using it have finished,
+    then computes a new value instead of reading the one being cleaned up.
+    """
+    marker = json.dumps({"retired": True})
+    metadata_storage.write(call.store_identifier + "_published", marker, call.fixture_values)
+
+
+def _all_tests_finished(
+    metadata_storage: Store[str], identifier: str, fixture_name: str, request: pytest.FixtureRequest
+) -> bool:
+    """Whether all tests using a shared fixture that is not parametrized have finished in all workers."""
+    total = len(_get_tests_for_fixture(fixture_name, request))
+    fixture_values = {
+        name: request if name == "request" else request.getfixturevalue(name)
+        for name in metadata_storage.fixtures
+    }
+    return total > 0 and _increment(metadata_storage, identifier, 0, fixture_values) >= total
+
+
+async def _read_published_or_wait(
+    io: _BlockingIO, store: Store, metadata_storage: Store[str], call: "_FixtureCall"
+) -> Any:
+    """Read the published value, first waiting for a worker computing it if the store supports that.
+
+    Raises:
+        StoreValueNotExists: If the value is not published and the store can not wait for it,
+            or no worker was computing it.
+    """
+    try:
+        with call.metrics.timed("read"):
+            return await _read_published(
+                io, store, metadata_storage, call.store_identifier, call.version, call.fixture_values
+            )
+    except StoreValueNotExists:
+        if not isinstance(store, SupportsWait):
+            raise
+    with call.metrics.timed("lock_wait"):
+        await io.call(store.wait_for, call.store_identifier, call.fixture_values)
+    with call.metrics.timed("read"):
+        return await _read_published(
+            io, store, metadata_storage, call.store_identifier, call.version, call.fixture_values
+        )
+
+
+def _stored_size(store: Store, identifier: str, fixture_values: dict[str, Any]) -> int | None:
+    """Size in bytes of a stored value, if the store can tell."""
+    if isinstance(store, SupportsSize):
+        return store.size(identifier, fixture_values)
+    return None
+
+
+def _load_from_cache(cache: PersistentCache | None, key: str, request: pytest.FixtureRequest) -> Any:
+    """Load a serialized value from the persistent cache.
 
+    Raises:
+        StoreValueNotExists: If caching is not enabled or there is no entry.
+    """
+    if cache is None:
+        raise StoreValueNotExists()
+    return cache.get(key, request.config)
+
+
+def _save_to_cache(cache: PersistentCache | None, key: str, serialized: Any, request: pytest.FixtureRequest):
+    if cache is not None:
+        cache.set(key, serialized, request.config)
+
+
+# Versions fixtures without a persistent cache by their code and the versions of their upstream fixtures
+_NO_CACHE = PersistentCache()
+
+
+@dataclass
+class _FixtureCall:
+    """A single setup of a shared fixture."""
+
+    fixture_values: dict[str, Any]
+    kwargs: dict[str, Any]
+    request: pytest.FixtureRequest
+    key: str
+    store_identifier: str
+    # Versions of the shared fixtures this fixture depends on
+    upstream: dict[str, str]
+    # Version of the value, which is also its key in the persistent cache
+    version: str
+    metrics: SetupMetrics
+
+    @property
+    def metadata_identifier(self) -> str:
+        return self.store_identifier + "_metadata"
+
+
+@dataclass
+class _FixtureOptions:
+    """How a shared fixture shares its value, the same for all its setups."""
+
+    store: Store
+    metadata_storage: Store[str]
+    serialize: Callable
+    deserialize: Callable
+    cache: PersistentCache | None = None
+    # The value of streaming stores is written record by record as it is produced
+    streaming: bool = False
+    setup_retries: int = 0
+    retry_backoff: float = 0.0
+    early_cleanup: bool = False
+    # Pools give the last cleanup of an instance to its last holder instead of counting setups
+    count_setups: bool = True
+
+
+def _setup_local(options: _FixtureOptions, call: _FixtureCall, send_first: Callable[[Any], Any]) -> Any:
+    """Set up a shared fixture when not running with xdist, loading the value from the cache if possible.
+
+    Returns:
+        The value to parse and hand to the tests.
+    """
+    metrics = call.metrics
+    try:
+        with metrics.timed("read"):
+            data = options.deserialize(_load_from_cache(options.cache, call.version, call.request))
+        metrics.source = "cache"
+        send_first(data)
+    except StoreValueNotExists:
+        with metrics.timed("compute"):
+            data = send_first(SetupToken.FIRST)
+        metrics.source = "computed"
+        if options.streaming:
+            # Written to the store anyway, as the records may only be iterated once
+            data = options.deserialize(_write_stream(options.store, call, options.serialize(data)))  # type: ignore[arg-type]
+        with metrics.timed("write"):
+            _save_to_cache(options.cache, call.version, options.serialize(data), call.request)
+    if options.early_cleanup:
+        total = len(_get_tests_for_fixture(call.key, call.request))
+        _register_early_cleanup(call, total, lambda _: call.request.config.stash[tests_started][call.key])
+    return data
 
-def _add_fixture_to_signature(func, fixture_names: Iterable[str]):
-    signature = inspect.signature(func)
+
+def _setup_shared(options: _FixtureOptions, call: _FixtureCall, send_first: Callable[[Any], Any]) -> Any:
+    """Set up a shared fixture in an xdist worker, using the sync methods of the stores.
+
+    Returns:
+        The value to parse and hand to the tests.
+    """
+
+    async def send(value: Any) -> Any:
+        return send_first(value)
+
+    return _run_blocking(_asetup_shared(options, call, _BlockingIO(), send))
+
+
+async def _asetup_shared(
+    options: _FixtureOptions, call: _FixtureCall, io: _BlockingIO, send_first: Callable[[Any], Awaitable[Any]]
+) -> Any:
+    """Set up a shared fixture in an xdist worker.
+
+    The published value is read without taking the lock. Otherwise the first worker to get the lock
+    loads the value from the cache or computes it, and publishes it for the other workers.
+    Sync and async fixtures share this, and only differ in how `io` reaches the stores.
+
+    Returns:
+        The value to parse and hand to the tests.
+    """
+    store, metadata_storage, metrics = options.store, options.metadata_storage, call.metrics
+    store_identifier, fixture_values = call.store_identifier, call.fixture_values
+    records = None
+    try:
+        # Fast path: the value was published already, no need to take the lock
+        serialized = await _read_published_or_wait(io, store, metadata_storage, call)
+        with metrics.timed("read"):
+            data = options.deserialize(serialized)
+        await send_first(data)
+    except StoreValueNotExists:
+        async with metrics.timed_alock(io.lock(store, store_identifier, fixture_values)):
+            try:
+                with metrics.timed("read"):
+                    serialized = await _read_published(
+                        io, store, metadata_storage, store_identifier, call.version, fixture_values
+                    )
+                    data = options.deserialize(serialized)
+                await send_first(data)
+            except StoreValueNotExists:
+                try:
+                    with metrics.timed("read"):
+                        serialized = await io.call(
+                            _load_from_cache, options.cache, call.version, call.request
+                        )
+                        data = options.deserialize(serialized)
+                    metrics.source = "cache"
+                    await send_first(data)
+                except StoreValueNotExists:
+                    await _check_setup_error(
+                        io, metadata_storage, call, options.setup_retries, options.retry_backoff
+                    )
+                    try:
+                        with metrics.timed("compute"):
+                            data = await send_first(SetupToken.FIRST)
+                    except Exception as e:
+                        await _record_setup_error(io, metadata_storage, call, e)
+                        raise
+                    metrics.source = "computed"
+                    with metrics.timed("write"):
+                        serialized = options.serialize(data)
+                        await io.call(_save_to_cache, options.cache, call.version, serialized, call.request)
+                if options.streaming:
+                    # Published before the records are written, so other workers read them meanwhile
+                    with metrics.timed("write"):
+                        await _mark_published(io, metadata_storage, call)
+                    records = serialized
+                else:
+                    with metrics.timed("write"):
+                        await _publish(io, store, metadata_storage, call, serialized)
+                    metrics.bytes = await io.call(_stored_size, store, store_identifier, fixture_values)
+        if records is not None:
+            data = options.deserialize(await io.call(_write_stream, store, call, records))
+
+    if options.count_setups:
+        # Counted for all fixtures, as workers that only prewarmed a fixture hold a value too
+        await io.call(_increment, metadata_storage, store_identifier + "_setups", 1, fixture_values)
+    if options.early_cleanup:
+        _register_early_cleanup(
+            call,
+            len(_get_tests_for_fixture(call.key, call.request)),
+            lambda amount: _increment(metadata_storage, call.metadata_identifier, amount, fixture_values),
+        )
+    return data
+
+
+def _teardown(options: _FixtureOptions, call: _FixtureCall, local: bool) -> bool:
+    """Count the tests this worker ran with a fixture, and tell whether it is the last one using it.
+
+    Every worker collects the same tests, so the total is known locally and only the counters of
+    finished tests and released values have to be shared. Updating them is O(1) regardless of
+    how many tests use the fixture.
+    """
+    if local:
+        # Every test ran in this process
+        call.request.config.stash.get(early_cleanups, {}).pop(call.key, None)
+        return True
+    finished_in_worker = count_finished_tests(call.request.config, call.key)
+    metadata_storage, fixture_values = options.metadata_storage, call.fixture_values
+    with call.metrics.timed("teardown"):
+        if options.early_cleanup:
+            early = call.request.config.stash[early_cleanups].pop(call.key)
+            return _release(metadata_storage, call, finished_in_worker, early.report, early.total)
+        return _release(
+            metadata_storage,
+            call,
+            finished_in_worker,
+            lambda amount: _increment(metadata_storage, call.metadata_identifier, amount, fixture_values),
+            len(_get_tests_for_fixture(call.key, call.request)),
+        )
+
+
+def _add_fixture_to_signature(
+    signature: inspect.Signature, fixture_names: Iterable[str]
+) -> inspect.Signature:
     parameters = []
     extra_params = []
     for p in signature.parameters.values():
@@ -63,7 +716,7 @@ def _add_fixture_to_signature(func, fixture_names: Iterable[str]):
             extra_params.append(p)
 
     for fixture in fixture_names:
-        if fixture not in inspect.signature(func).parameters.keys():
+        if fixture not in signature.parameters:
             extra_params.append(inspect.Parameter(fixture, inspect.Parameter.POSITIONAL_OR_KEYWORD))
     parameters.extend(extra_params)
     return signature.replace(parameters=parameters)
@@ -75,6 +728,12 @@ def shared_session_scope_fixture(
     serialize: Callable = _identity,
     deserialize: Callable = _identity,
     metadata_storage: Store[str] = FileStore(),
+    cache: PersistentCache | None = None,
+    cleanup: Callable[[Any], Any] | None = None,
+    prewarm: bool = False,
+    early_cleanup: bool = False,
+    setup_retries: int = 0,
+    retry_backoff: float = 0.0,
     **kwargs,
 ):
     """Create a session scope fixture that is shared among all workers.
@@ -107,108 +766,156 @@ def shared_session_scope_fixture(
         deserialize: Function to deserialize the data after reading it from the store.
         metadata_storage: Store to save metadata about the current test run.
             This is necessary to determine which worker should do the cleanup.
+        cache: Optional persistent cache to reuse the value across test runs.
+        cleanup: Function called with the value by the last worker to finish, for fixtures that return.
+        prewarm: Compute the fixture in one of the xdist workers before the tests run,
+            instead of when the first test using it runs.
+        early_cleanup: Tear the fixture down in each worker as soon as all tests using it have finished,
+            and clean up in the last of them, instead of at the end of the session.
+        setup_retries: How many times other workers set up the fixture again after it failed.
+            Once they are used up, workers raise `SharedFixtureSetupError` with the recorded
+            error instead of setting it up again.
+        retry_backoff: Seconds to wait before the first retry, doubled for every following one.
         **kwargs: Additional arguments to pass to the @pytest.fixture.
     """
 
     def _inner(func: Callable):
-        fixture_names = set(store.fixtures) | set(metadata_storage.fixtures) | {"request"}
+        fixture_name = kwargs.get("name", func.__name__)
+        shared_fixture_names.add(fixture_name)
+        if prewarm:
+            prewarm_fixture_names.add(fixture_name)
+        # The signature is analysed once here, the wrapper only does lookups on every setup
         original_signature = inspect.signature(func)
-        new_signature = _add_fixture_to_signature(func, fixture_names)
-        func.__signature__ = new_signature  # type: ignore
-
-        if inspect.isgeneratorfunction(func):
-
-            @pytest.fixture(scope="session", **kwargs)
-            @functools.wraps(func)
-            def wrapper_generator(*args, **kwargs):
-                fixture_values = {k: kwargs[k] for k in fixture_names}
-                new_kwargs = {k: v for k, v in kwargs.items() if k in original_signature.parameters.keys()}
-                request = typing.cast(pytest.FixtureRequest, fixture_values["request"])
-
-                if not is_xdist_worker(request):  # Not running with xdist, early return
-                    res = func(*args, **new_kwargs)
-                    next(res)
-                    data = _send_first(res, SetupToken.FIRST)
-                    yield parse(data)
-                    _send_last(res, CleanupToken.LAST)
-                    return
+        arguments = frozenset(original_signature.parameters)
+        fixture_arguments[fixture_name] = tuple(original_signature.parameters)
+        fixture_names = tuple(dict.fromkeys([*store.fixtures, *metadata_storage.fixtures, "request"]))
+        func.__signature__ = _add_fixture_to_signature(original_signature, fixture_names)  # type: ignore
+        qualified_name = f"{func.__module__}.{func.__qualname__}"
+        tests_finished_checks[fixture_name] = functools.partial(
+            _all_tests_finished, metadata_storage, qualified_name + "_metadata", fixture_name
+        )
 
-                tests_using_fixture = _get_tests_for_fixture(func, request)
+        is_async = inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func)
+        if inspect.iscoroutinefunction(func):
+            func = _as_async_generator(func, cleanup)
+        elif not is_async and not inspect.isgeneratorfunction(func):
+            func = _as_generator(func, cleanup)
+        elif cleanup is not None:
+            msg = (
+                "`cleanup` is only supported for fixtures that return. Clean up after the last yield instead."
+            )
+            raise TypeError(msg)
+        options = _FixtureOptions(
+            store=store,
+            metadata_storage=metadata_storage,
+            serialize=serialize,
+            deserialize=deserialize,
+            cache=cache,
+            streaming=_is_stream_store(type(store)),
+            setup_retries=setup_retries,
+            retry_backoff=retry_backoff,
+            early_cleanup=early_cleanup,
+        )
+        if options.streaming and cache is not None:
+            msg = "`cache` is not supported for streaming stores."
+            raise TypeError(msg)
+        # Async fixtures await the async methods of the stores if both have them
+        loop_io = (
+            _LoopIO()
+            if is_async and isinstance(store, AsyncStore) and isinstance(metadata_storage, AsyncStore)
+            else None
+        )
 
-                store_identifier = f"{func.__module__}.{func.__qualname__}"
-                metadata_identifier = store_identifier + "_metadata"
+        def prepare(kwargs: dict[str, Any]) -> _FixtureCall:
+            fixture_values = {k: kwargs[k] for k in fixture_names}
+            new_kwargs = {k: v for k, v in kwargs.items() if k in arguments}
+            request = typing.cast(pytest.FixtureRequest, fixture_values["request"])
 
-                store_lock = store.lock(store_identifier, fixture_values)
-                metadata_lock = metadata_storage.lock(metadata_identifier, fixture_values)
+            # Parametrized fixtures get separate values, locks and cleanup per parameter,
+            # and so do the fixtures depending on them
+            param = _get_instance_param(request, fixture_name)
+            store_identifier = fixture_key(qualified_name, param)
 
-                # TODO: I feel like the lock scope is broader than it needs to be
-                with store_lock:
-                    res = func(*args, **new_kwargs)
-                    next(res)
-                    try:
-                        data = deserialize(store.read(store_identifier, fixture_values))
-                        _send_first(res, data)
-                    except StoreValueNotExists:
-                        data = _send_first(res, SetupToken.FIRST)
-                        store.write(store_identifier, serialize(data), fixture_values)
-                        with metadata_lock:
-                            metadata_storage.write(
-                                metadata_identifier,
-                                json.dumps(tests_using_fixture),
-                                fixture_values,
-                            )
-
-                yield parse(data)
-
-                # We want to release the lock before calling the cleanup function
-                # so we use a flag here
-                is_last = False
-
-                metadata_lock_after = metadata_storage.lock(metadata_identifier, fixture_values)
-
-                with metadata_lock_after:
-                    tests_run_in_worker = request.config.stash[tests_started]
-                    tests_missing: set[str] = set(
-                        json.loads(metadata_storage.read(metadata_identifier, fixture_values))
-                    )
-                    tests_missing -= set(tests_run_in_worker)
-                    is_last = not tests_missing
-                    if not is_last:
-                        metadata_storage.write(
-                            metadata_identifier,
-                            json.dumps(list(tests_missing)),
-                            fixture_values,
-                        )
+            # pytest sets up the shared fixtures this one depends on first, so their versions are known.
+            # A new upstream version gives a new version here, invalidating the stored and cached values.
+            versions = request.config.stash.setdefault(fixture_versions, {})
+            upstream = {
+                name: versions[name] for name in shared_dependencies(fixture_name) if name in versions
+            }
+            version = (cache or _NO_CACHE).key(func, store_identifier, new_kwargs, upstream)
+            versions[fixture_name] = version
 
-                if is_last:
-                    _send_last(res, CleanupToken.LAST)
-                else:
-                    _send_last(res, None)
+            key = fixture_key(fixture_name, param)
+            return _FixtureCall(
+                fixture_values=fixture_values,
+                kwargs=new_kwargs,
+                request=request,
+                key=key,
+                store_identifier=store_identifier,
+                upstream=upstream,
+                version=version,
+                metrics=start_setup(request.config, key),
+            )
 
-            return wrapper_generator
-        else:
+        @functools.wraps(func)
+        def wrapper_generator(*args, **kwargs):
+            call = prepare(kwargs)
+            local = not _is_xdist_worker(call.request)
+            # Only used for fixtures that are, or were turned into, generator functions
+            res = typing.cast(Generator[Any, Any, None], func(*args, **call.kwargs))
+            next(res)
+            setup = _setup_local if local else _setup_shared
+            data = setup(options, call, functools.partial(_send_first, res))
+            with call.metrics.timed("read"):
+                value = parse(data)
+            yield value
 
-            @pytest.fixture(scope="session", **kwargs)
-            @functools.wraps(func)
-            def wrapper_return(*args, **kwargs):
-                fixture_values = {k: kwargs[k] for k in fixture_names}
-                new_kwargs = {k: v for k, v in kwargs.items() if k in original_signature.parameters.keys()}
-                request = fixture_values["request"]
+            if not _teardown(options, call, local):
+                _send_last(res, None)
+            elif local:
+                _send_last(res, CleanupToken.LAST)
+            else:
+                _retire(metadata_storage, call)
+                try:
+                    _send_last(res, CleanupToken.LAST)
+                finally:
+                    _delete_stored(store, call.store_identifier, call.fixture_values)
 
-                if not is_xdist_worker(request):  # Not running with xdist, early return
-                    return parse(func(*args, **new_kwargs))
+        @functools.wraps(func)
+        async def wrapper_async_generator(*args, **kwargs):
+            # Same as wrapper_generator, but every wait for a lock or I/O happens off the event loop:
+            # awaited on it with the async methods of the stores, or in a thread with the sync ones
+            import asyncio
 
-                store_identifier = f"{func.__module__}.{func.__qualname__}"
-                store_lock = store.lock(store_identifier, fixture_values)
+            call = prepare(kwargs)
+            local = not _is_xdist_worker(call.request)
+            # Only used for fixtures that are, or were turned into, async generator functions
+            res = typing.cast(AsyncGenerator[Any, Any], func(*args, **call.kwargs))
+            await anext(res)
+            if not local and loop_io is not None:
+                data = await _asetup_shared(options, call, loop_io, functools.partial(_asend_first, res))
+            else:
+                setup = _setup_local if local else _setup_shared
+                data = await _run_in_thread(functools.partial(setup, options, call), res)
+            with call.metrics.timed("read"):
+                value = parse(data)
+            yield value
 
-                with store_lock:
-                    try:
-                        data = deserialize(store.read(store_identifier, fixture_values))
-                    except StoreValueNotExists:
-                        data = func(*args, **new_kwargs)
-                    return parse(data)
+            if not await asyncio.to_thread(_teardown, options, call, local):
+                await _asend_last(res, None)
+            elif local:
+                await _asend_last(res, CleanupToken.LAST)
+            else:
+                await asyncio.to_thread(_retire, metadata_storage, call)
+                try:
+                    await _asend_last(res, CleanupToken.LAST)
+                finally:
+                    await asyncio.to_thread(_delete_stored, store, call.store_identifier, call.fixture_values)
 
-            return wrapper_return
+        # Only the wrapper that is used is turned into a fixture
+        return pytest.fixture(scope="session", **kwargs)(
+            wrapper_async_generator if is_async else wrapper_generator
+        )
 
     return _inner
 
@@ -218,6 +925,12 @@ def shared_session_scope_json(
     serialize: Callable = _identity,
     deserialize: Callable = _identity,
     metadata_storage: Store[str] = FileStore(),
+    cache: PersistentCache | None = None,
+    cleanup: Callable[[Any], Any] | None = None,
+    prewarm: bool = False,
+    early_cleanup: bool = False,
+    setup_retries: int = 0,
+    retry_backoff: float = 0.0,
     **kwargs,
 ):
     """Create a session scope fixture that is shared among all workers.
@@ -250,8 +963,306 @@ def shared_session_scope_json(
         deserialize: Function to deserialize the data after reading it from the store.
         metadata_storage: Store to save metadata about the current test run.
             This is necessary to determine which worker should do the cleanup.
+        cache: Optional persistent cache to reuse the value across test runs.
+        cleanup: Function called with the value by the last worker to finish, for fixtures that return.
+        prewarm: Compute the fixture in one of the xdist workers before the tests run,
+            instead of when the first test using it runs.
+        early_cleanup: Tear the fixture down in each worker as soon as all tests using it have finished,
+            and clean up in the last of them, instead of at the end of the session.
+        setup_retries: How many times other workers set up the fixture again after it failed.
+            Once they are used up, workers raise `SharedFixtureSetupError` with the recorded
+            error instead of setting it up again.
+        retry_backoff: Seconds to wait before the first retry, doubled for every following one.
         **kwargs: Additional arguments to pass to the @pytest.fixture.
     """
     return shared_session_scope_fixture(
-        JsonStore(), parse, serialize, deserialize, metadata_storage, **kwargs
+        JsonStore(),
+        parse,
+        serialize,
+        deserialize,
+        metadata_storage,
+        cache,
+        cleanup,
+        prewarm,
+        early_cleanup,
+        setup_retries,
+        retry_backoff,
+        **kwargs,
     )
+
+
+def shared_session_scope_pickle(
+    parse: Callable = _identity,
+    serialize: Callable = _identity,
+    deserialize: Callable = _identity,
+    metadata_storage: Store[str] = FileStore(),
+    cache: PersistentCache | None = None,
+    compression: Literal["zlib", "lzma", "bz2"] | None = None,
+    compression_threshold: int = 1024 * 1024,
+    cleanup: Callable[[Any], Any] | None = None,
+    prewarm: bool = False,
+    early_cleanup: bool = False,
+    setup_retries: int = 0,
+    retry_backoff: float = 0.0,
+    **kwargs,
+):
+    """Create a session scope fixture that is shared among all workers using pickle.
+
+    Data is stored with pickle protocol 5, so it works for most objects. Large buffers
+    (like NumPy arrays) are written next to the pickle stream instead of being copied into it.
+
+    Example:
+        ```python
+        from pytest_shared_session_scope import shared_session_scope_pickle, CleanupToken, SetupToken
+
+
+        def expensive_calculation():
+            return {1, 2, 3}
+
+        @shared_session_scope_pickle()
+        def my_fixture():
+            data = yield
+            if data is SetupToken.FIRST:
+                data = expensive_calculation()
+            token: CleanupToken = yield data
+            if token is CleanupToken.LAST:
+                ... # Cleanup that should only happen once
+            ... # Do cleanup that should happend for all workers here
+
+        ```
+
+    Args:
+        parse: Function to parse the data before returning it to the test.
+        serialize: Function to serialize the data before saving it to the store.
+        deserialize: Function to deserialize the data after reading it from the store.
+        metadata_storage: Store to save metadata about the current test run.
+            This is necessary to determine which worker should do the cleanup.
+        cache: Optional persistent cache to reuse the value across test runs.
+        compression: Compression used for the pickle stream and buffers larger than `compression_threshold`.
+        compression_threshold: Size in bytes above which data is compressed.
+        cleanup: Function called with the value by the last worker to finish, for fixtures that return.
+        prewarm: Compute the fixture in one of the xdist workers before the tests run,
+            instead of when the first test using it runs.
+        early_cleanup: Tear the fixture down in each worker as soon as all tests using it have finished,
+            and clean up in the last of them, instead of at the end of the session.
+        setup_retries: How many times other workers set up the fixture again after it failed.
+            Once they are used up, workers raise `SharedFixtureSetupError` with the recorded
+            error instead of setting it up again.
+        retry_backoff: Seconds to wait before the first retry, doubled for every following one.
+        **kwargs: Additional arguments to pass to the @pytest.fixture.
+    """
+    return shared_session_scope_fixture(
+        PickleStore(compression, compression_threshold),
+        parse,
+        serialize,
+        deserialize,
+        metadata_storage,
+        cache,
+        cleanup,
+        prewarm,
+        early_cleanup,
+        setup_retries,
+        retry_backoff,
+        **kwargs,
+    )
+
+
+def _lease(
+    metadata_storage: Store[str],
+    identifier: str,
+    size: int,
+    strategy: Literal["round_robin", "least_loaded"],
+    fixture_values: dict[str, Any],
+) -> tuple[int, int]:
+    """Lease an instance of a pool and return its index and generation.
+
+    The generation of an instance changes when its last holder releases it, so a worker leasing it
+    afterwards builds a new instance instead of using the one that was cleaned up.
+    """
+    with metadata_storage.lock(identifier, fixture_values):
+        try:
+            leases = json.loads(metadata_storage.read(identifier, fixture_values))
+        except StoreValueNotExists:
+            leases = {"next": 0, "holders": [0] * size, "generations": [0] * size}
+        if strategy == "round_robin":
+            index = leases["next"] % size
+            leases["next"] += 1
+        else:
+            index = min(range(size), key=leases["holders"].__getitem__)
+        leases["holders"][index] += 1
+        metadata_storage.write(identifier, json.dumps(leases), fixture_values)
+    return index, leases["generations"][index]
+
+
+def _release_lease(
+    metadata_storage: Store[str], identifier: str, index: int, fixture_values: dict[str, Any]
+) -> bool:
+    """Release a leased instance of a pool, and tell whether this was its last holder."""
+    with metadata_storage.lock(identifier, fixture_values):
+        leases = json.loads(metadata_storage.read(identifier, fixture_values))
+        leases["holders"][index] -= 1
+        is_last = leases["holders"][index] == 0
+        if is_last:
+            leases["generations"][index] += 1
+        metadata_storage.write(identifier, json.dumps(leases), fixture_values)
+    return is_last
+
+
+def shared_session_scope_pool(
+    store: Store,
+    size: int,
+    strategy: Literal["round_robin", "least_loaded"] = "round_robin",
+    parse: Callable = _identity,
+    serialize: Callable = _identity,
+    deserialize: Callable = _identity,
+    metadata_storage: Store[str] = FileStore(),
+    cleanup: Callable[[Any], Any] | None = None,
+    **kwargs,
+):
+    """Create a session scope fixture with a pool of `size` instances shared among the workers.
+
+    For resources that can not be used by all workers at once, but are too expensive to set up
+    in every worker. Each worker leases one instance when it first needs the fixture, and holds it
+    until the fixture is torn down. The instance is set up by the first worker leasing it, so the
+    first workers build different instances in parallel, and workers leasing it later read it from
+    the store. The last holder of an instance to release it gets `CleanupToken.LAST`.
+
+    Example:
+        ```python
+        from pytest_shared_session_scope import shared_session_scope_pool, CleanupToken, SetupToken
+        from pytest_shared_session_scope.store import JsonStore
+
+        @shared_session_scope_pool(JsonStore(), size=2)
+        def database(pool_index: int):
+            data = yield
+            if data is SetupToken.FIRST:
+                data = start_database(f"db-{pool_index}")
+            token = yield data
+            if token is CleanupToken.LAST:
+                stop_database(data)
+        ```
+
+    Args:
+        store: Store to save the instances.
+        size: Number of instances in the pool.
+        strategy: How instances are handed out to workers. "round_robin" hands them out in turn,
+            "least_loaded" hands out the instance with the fewest holders.
+        parse: Function to parse the data before returning it to the test.
+        serialize: Function to serialize the data before saving it to the store.
+        deserialize: Function to deserialize the data after reading it from the store.
+        metadata_storage: Store to save the leases of the instances.
+        cleanup: Function called with the value by the last holder of an instance, for fixtures that return.
+        **kwargs: Additional arguments to pass to the @pytest.fixture.
+    """
+    if size < 1:
+        msg = f"The size of a pool must be at least 1, got {size}."
+        raise ValueError(msg)
+    if strategy not in ("round_robin", "least_loaded"):
+        msg = f"Unknown pool strategy {strategy!r}, expected 'round_robin' or 'least_loaded'."
+        raise ValueError(msg)
+
+    def _inner(func: Callable):
+        fixture_name = kwargs.get("name", func.__name__)
+        shared_fixture_names.add(fixture_name)
+        original_signature = inspect.signature(func)
+        # The index of the leased instance is passed by the wrapper, not requested from pytest
+        injects_index = "pool_index" in original_signature.parameters
+        signature = original_signature.replace(
+            parameters=[p for p in original_signature.parameters.values() if p.name != "pool_index"]
+        )
+        arguments = frozenset(signature.parameters)
+        fixture_arguments[fixture_name] = tuple(signature.parameters)
+        fixture_names = tuple(dict.fromkeys([*store.fixtures, *metadata_storage.fixtures, "request"]))
+        func.__signature__ = _add_fixture_to_signature(signature, fixture_names)  # type: ignore
+        qualified_name = f"{func.__module__}.{func.__qualname__}"
+
+        if inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func):
+            msg = "Async fixtures are not supported for pools."
+            raise TypeError(msg)
+        if not inspect.isgeneratorfunction(func):
+            func = _as_generator(func, cleanup)
+        elif cleanup is not None:
+            msg = (
+                "`cleanup` is only supported for fixtures that return. Clean up after the last yield instead."
+            )
+            raise TypeError(msg)
+        if _is_stream_store(type(store)):
+            msg = "Streaming stores are not supported for pools."
+            raise TypeError(msg)
+        # Instances are shared like fixtures without a persistent cache
+        options = _FixtureOptions(store, metadata_storage, serialize, deserialize, count_setups=False)
+
+        @functools.wraps(func)
+        def wrapper_generator(*args, **kwargs):
+            fixture_values = {k: kwargs[k] for k in fixture_names}
+            new_kwargs = {k: v for k, v in kwargs.items() if k in arguments}
+            request = typing.cast(pytest.FixtureRequest, fixture_values["request"])
+            param = _get_instance_param(request, fixture_name)
+            pool_identifier = fixture_key(qualified_name, param)
+            leases_identifier = pool_identifier + "_leases"
+            key = fixture_key(fixture_name, param)
+            metrics = start_setup(request.config, key)
+
+            if _is_xdist_worker(request):
+                index, generation = _lease(
+                    metadata_storage, leases_identifier, size, strategy, fixture_values
+                )
+            else:
+                index, generation = 0, 0
+            if injects_index:
+                new_kwargs["pool_index"] = index
+
+            # Each instance is shared like a separate fixture, with its own value, lock and version
+            store_identifier = f"{pool_identifier}_pool{index}_{generation}"
+            versions = request.config.stash.setdefault(fixture_versions, {})
+            upstream = {
+                name: versions[name] for name in shared_dependencies(fixture_name) if name in versions
+            }
+            version = _NO_CACHE.key(func, store_identifier, new_kwargs, upstream)
+            versions[fixture_name] = version
+            call = _FixtureCall(
+                fixture_values=fixture_values,
+                kwargs=new_kwargs,
+                request=request,
+                key=key,
+                store_identifier=store_identifier,
+                upstream=upstream,
+                version=version,
+                metrics=metrics,
+            )
+
+            # Async fixtures are rejected above, so this is a generator function by now
+            res = typing.cast(Generator[Any, Any, None], func(*args, **new_kwargs))
+            next(res)
+            if not _is_xdist_worker(request):  # Not running with xdist, early return
+                data = _setup_local(options, call, functools.partial(_send_first, res))
+                with metrics.timed("read"):
+                    value = parse(data)
+                yield value
+                _send_last(res, CleanupToken.LAST)
+                return
+
+            try:
+                data = _setup_shared(options, call, functools.partial(_send_first, res))
+            except BaseException:
+                # The fixture is not torn down when its setup fails, so give the lease back here
+                if _release_lease(metadata_storage, leases_identifier, index, fixture_values):
+                    _delete_stored(store, store_identifier, fixture_values)
+                raise
+            with metrics.timed("read"):
+                value = parse(data)
+            yield value
+
+            with metrics.timed("teardown"):
+                is_last = _release_lease(metadata_storage, leases_identifier, index, fixture_values)
+            if is_last:
+                try:
+                    _send_last(res, CleanupToken.LAST)
+                finally:
+                    _delete_stored(store, store_identifier, fixture_values)
+            else:
+                _send_last(res, None)
+
+        return pytest.fixture(scope="session", **kwargs)(wrapper_generator)
+
+    return _inner
@@ -3,10 +3,239 @@
 An pytest entrypoint points to this file
 """
 
+from collections import Counter, defaultdict
+
 import pytest
-from pytest_shared_session_scope._types import tests_started
+from pytest_shared_session_scope._metrics import (
+    REPORT_JSON_OPTION,
+    REPORT_OPTION,
+    WORKEROUTPUT_KEY,
+    metrics_key,
+    setups_as_dicts,
+    write_report,
+)
+from pytest_shared_session_scope._broker import CHANNEL_KEY, INDEX_KEY, broker_used, get_broker, get_client
+from pytest_shared_session_scope._types import (
+    count_finished_tests,
+    dependency_order,
+    early_cleanups,
+    fixture_key,
+    instance_param,
+    param_id,
+    prewarm_fixture_names,
+    shared_dependencies,
+    shared_fixture_names,
+    tests_by_fixture,
+    tests_finished_checks,
+    tests_started,
+)
+from pytest_shared_session_scope.cache import CACHE_CLEAR_OPTION, CACHE_DIR_INI, clear_cache
+
+PREWARM_OPTION = "shared_scope_prewarm"
+DIST_OPTION = "shared_scope_dist"
+
+
+def pytest_addoption(parser: pytest.Parser):
+    group = parser.getgroup("shared-session-scope")
+    group.addoption(
+        "--shared-scope-cache-clear",
+        action="store_true",
+        dest=CACHE_CLEAR_OPTION,
+        help="Remove all values in the persistent cache of shared session scoped fixtures before the run.",
+    )
+    group.addoption(
+        "--shared-scope-prewarm",
+        action="store_true",
+        dest=PREWARM_OPTION,
+        help="Compute all shared session scoped fixtures used by the collected tests before the tests run, "
+        "spread over the xdist workers.",
+    )
+    group.addoption(
+        "--shared-scope-dist",
+        action="store_true",
+        dest=DIST_OPTION,
+        help="Distribute tests over the xdist workers grouped by the shared fixtures they use.",
+    )
+    group.addoption(
+        "--shared-scope-report",
+        action="store_true",
+        dest=REPORT_OPTION,
+        help="Show where the time of the shared session scoped fixtures goes.",
+    )
+    group.addoption(
+        "--shared-scope-report-json",
+        default=None,
+        dest=REPORT_JSON_OPTION,
+        metavar="PATH",
+        help="Write the report of the shared session scoped fixtures as JSON to PATH.",
+    )
+    parser.addini(
+        CACHE_DIR_INI,
+        help="Directory (relative to rootdir) of the persistent cache of shared session scoped fixtures. "
+        "Defaults to a directory inside the pytest cache directory.",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionstart(session: pytest.Session):
+    # Only the controller clears, before any worker is started
+    is_worker = hasattr(session.config, "workerinput")
+    if session.config.getoption(CACHE_CLEAR_OPTION) and not is_worker:
+        clear_cache(session.config)
+
+
+def _shared_fixtures_used_by(item: pytest.Item) -> set[str]:
+    """Keys of the shared fixtures used by a test, with the instance the test uses them with."""
+    callspec = getattr(item, "callspec", None)
+    item_params = {} if callspec is None else callspec.params
+    # `fixturenames` is the full closure, so fixtures used through other fixtures are included
+    used = shared_fixture_names.intersection(getattr(item, "fixturenames", ()))
+    params: dict[str, str | None] = {}
+    keys = set()
+    # Dependencies come first, so the instances of the fixtures a fixture depends on are known
+    for name in dependency_order(used):
+        dependencies = [d for d in shared_dependencies(name) if d in used]
+        if any(d not in params for d in dependencies):
+            continue  # A fixture it depends on fails to set up
+        upstream = {d: params[d] for d in dependencies}
+        try:
+            param = param_id(item_params[name]) if name in item_params else None
+        except TypeError:
+            # The setup of the fixture fails with this error, reported for the test
+            continue
+        params[name] = instance_param(param, upstream)
+        keys.add(fixture_key(name, params[name]))
+    return keys
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_finish(session: pytest.Session):
+    """Build the index of which tests use which shared fixture once for the whole session."""
+    index: defaultdict[str, set[str]] = defaultdict(set)
+    for item in session.items:
+        for key in _shared_fixtures_used_by(item):
+            index[key].add(item.nodeid)
+    session.config.stash[tests_by_fixture] = {key: frozenset(nodeids) for key, nodeids in index.items()}
+
+    if session.config.getoption(DIST_OPTION) and hasattr(session.config, "workerinput"):
+        # Runs before xdist reports the collection, so the index is there when the controller schedules
+        payload = {key: sorted(nodeids) for key, nodeids in index.items()}
+        get_client(session.config).request("write", INDEX_KEY, payload)
 
 
 @pytest.hookimpl(tryfirst=True)
 def pytest_runtest_protocol(item, nextitem):
-    item.config.stash.setdefault(tests_started, []).append(item.nodeid)
+    item.config.stash.setdefault(tests_started, Counter()).update(_shared_fixtures_used_by(item))
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_teardown(item: pytest.Item, nextitem: pytest.Item | None):
+    """Tear down shared fixtures with early cleanup once all tests using them have finished in all workers.
+
+    Runs after pytest tore down the fixtures of the test. The tests of this worker are added to the
+    shared count of finished tests, except for fixtures the next test uses, which can not be finished yet.
+    """
+    registered = item.config.stash.get(early_cleanups, {})
+    if not registered:
+        return
+    needed = _shared_fixtures_used_by(nextitem) if nextitem is not None else set()
+    for key, early in list(registered.items()):
+        if key in needed:
+            continue
+        if early.report(count_finished_tests(item.config, key)) >= early.total > 0:
+            early.finish()
+
+
+@pytest.hookimpl(optionalhook=True, tryfirst=True)
+def pytest_xdist_make_scheduler(config: pytest.Config, log):
+    """Use the scheduler grouping tests by shared fixture with `--shared-scope-dist`."""
+    if not config.getoption(DIST_OPTION):
+        return None
+    from pytest_shared_session_scope._scheduler import SharedFixtureScheduling
+
+    return SharedFixtureScheduling(config, log)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Give each xdist worker a channel to the broker in the controller, if the broker is used."""
+    if node.config.getoption(DIST_OPTION) or broker_used():
+        node.workerinput[CHANNEL_KEY] = get_broker(node.config).connect(node.gateway)
+
+
+def _prewarm_share(request: pytest.FixtureRequest, workerinput: dict) -> list[str]:
+    """Names of the fixtures this worker prewarms.
+
+    Each fixture is given to exactly one worker, so independent fixtures are computed in parallel.
+    Fixtures are handed out in dependency order, so the workers start with the independent ones
+    instead of waiting on each other for the fixtures they depend on.
+    Parametrized fixtures are skipped, as only the parameters of the first test could be requested.
+    So are fixtures whose tests have all finished in other workers before this one started,
+    as their value may already be cleaned up.
+    """
+    config = request.config
+    names = shared_fixture_names if config.getoption(PREWARM_OPTION) else prewarm_fixture_names
+    if not names:
+        return []
+    # Keys of fixtures that are not parametrized are just their names
+    used = dependency_order(names.intersection(config.stash.get(tests_by_fixture, {})))
+    worker_index = int(workerinput["workerid"].removeprefix("gw"))
+    share = used[worker_index :: workerinput["workercount"]]
+    finished = tests_finished_checks
+    return [name for name in share if name not in finished or not finished[name](request)]
+
+
+class _Prewarm:
+    """Prewarms shared fixtures. Only registered in xdist workers, as otherwise nothing runs in parallel."""
+
+    @pytest.fixture(scope="session", autouse=True)
+    def _shared_session_scope_prewarm(self, request: pytest.FixtureRequest):
+        """Compute the share of prewarmed fixtures of this worker while its first test is set up.
+
+        Being session scoped and autouse, this is set up before all other fixtures of the first test.
+        """
+        for name in _prewarm_share(request, request.config.workerinput):  # type: ignore[attr-defined]
+            try:
+                request.getfixturevalue(name)
+            except pytest.FixtureLookupError as e:
+                if e.argname != name:
+                    raise
+                # Fixtures are looked up for the first test, which can not see fixtures defined in the
+                # conftest of another directory. Those are computed by the first test using them instead.
+            except (Exception, pytest.skip.Exception, pytest.fail.Exception):
+                # pytest keeps the error, so the tests using the fixture fail with it instead of this one
+                pass
+
+
+def pytest_configure(config: pytest.Config):
+    if hasattr(config, "workerinput"):
+        config.pluginmanager.register(_Prewarm(), "shared-session-scope-prewarm")
+
+
+_collected_metrics_key = pytest.StashKey[list[dict]]()
+
+
+def _report_enabled(config: pytest.Config) -> bool:
+    return bool(config.getoption(REPORT_OPTION) or config.getoption(REPORT_JSON_OPTION))
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_sessionfinish(session: pytest.Session):
+    # Runs after the session fixtures are torn down and before xdist sends `workeroutput` to the controller
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None and _report_enabled(session.config):
+        workeroutput[WORKEROUTPUT_KEY] = setups_as_dicts(session.config.stash.get(metrics_key, []))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Collect the metrics of a worker in the controller."""
+    setups = getattr(node, "workeroutput", {}).get(WORKEROUTPUT_KEY, [])
+    node.config.stash.setdefault(_collected_metrics_key, []).extend(setups)
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config):
+    if hasattr(config, "workerinput") or not _report_enabled(config):
+        return
+    setups = config.stash.get(_collected_metrics_key, []) + setups_as_dicts(config.stash.get(metrics_key, []))
+    write_report(terminalreporter, setups, config.getoption(REPORT_JSON_OPTION))
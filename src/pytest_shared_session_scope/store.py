@@ -1,18 +1,63 @@
-"""Stores for sharing data between pytest sessions."""
+"""Stores for sharing data between pytest sessions.
 
-from contextlib import contextmanager
+Modules only some stores need (filelock, sqlite3, multiprocessing, asyncio, the compressors, ...) are
+imported when they are first used, so importing the plugin stays cheap.
+"""
+
+from collections.abc import Mapping
+from contextlib import asynccontextmanager, contextmanager, suppress
+import functools
+import importlib
 import json
+import hashlib
+import mmap
+import os
 from pathlib import Path
-from typing import Any
-from filelock import FileLock as _FileLock
+import pickle
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterable, Iterator, Literal
+import uuid
 from pytest import TempPathFactory
 
+from pytest_shared_session_scope._broker import get_client, use_broker
 from pytest_shared_session_scope.types import StoreValueNotExists
 
+if TYPE_CHECKING:
+    import sqlite3
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+
+@contextmanager
+def _flock(path: Path, operation: int) -> Iterator[None]:
+    """Hold a blocking lock on a file. The kernel wakes up waiting processes as soon as it is released.
+
+    Raises:
+        RuntimeError: If the platform has no `fcntl` module, like Windows.
+    """
+    if fcntl is None:
+        msg = "Locking a file with flock needs the fcntl module, which is not available on this platform."
+        raise RuntimeError(msg)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, operation)
+        yield
+    finally:
+        os.close(fd)  # Releases the lock
+
 
 class LocalFileStoreMixin:
     """Mixin for file based stores."""
 
+    _suffix = ".json"
+
     @property
     def fixtures(self) -> list[str]:
         """List of fixtures that the store needs."""
@@ -20,15 +65,104 @@ class LocalFileStoreMixin:
 
     def _get_path(self, identifier: str, tmp_path_factory: TempPathFactory) -> Path:
         root_tmp_dir = tmp_path_factory.getbasetemp().parent
-        return root_tmp_dir / f"{identifier}.json"
+        return root_tmp_dir / f"{identifier}{self._suffix}"
 
     @contextmanager
-    def lock(self, identifier: str, fixture_values: dict[str, Any]):
-        """Filelock to ensure atomicity."""
+    def _open_for_write(self, path: Path, mode: str = "w") -> Iterator[IO]:
+        """Open a temporary file that atomically replaces `path` when closed.
+
+        Readers never see a partially written file, so it is safe to read without a lock.
+        """
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            with tmp_path.open(mode) as f:
+                yield f
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _lock_path(self, identifier: str, fixture_values: dict[str, Any]) -> Path:
+        path = self._get_path(identifier, fixture_values["tmp_path_factory"])
+        return path.with_name(path.name + ".lock")
+
+    def _map(self, identifier: str, fixture_values: dict[str, Any]) -> memoryview:
+        """Memory map the file and return a read-only view of it.
+
+        Raises:
+            StoreValueNotExists: If the file does not exist.
+        """
         path = self._get_path(identifier, fixture_values["tmp_path_factory"])
-        with _FileLock(str(path) + ".lock"):
+        try:
+            with path.open("rb") as f:
+                if path.stat().st_size == 0:  # Empty files can not be mapped
+                    return memoryview(b"")
+                return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        except FileNotFoundError:
+            raise StoreValueNotExists()
+
+    @contextmanager
+    def lock(self, identifier: str, fixture_values: dict[str, Any]):
+        """Filelock to ensure atomicity.
+
+        Waits in the kernel instead of polling where `fcntl` is available.
+        """
+        if fcntl is None:
+            from filelock import FileLock
+
+            with FileLock(self._lock_path(identifier, fixture_values)):
+                yield
+            return
+        with _flock(self._lock_path(identifier, fixture_values), fcntl.LOCK_EX):
             yield
 
+    def wait_for(self, identifier: str, fixture_values: dict[str, Any]):
+        """Wait for the lock to be released, sharing the wait with all other waiting workers."""
+        if fcntl is None:
+            with self.lock(identifier, fixture_values):
+                return
+        with _flock(self._lock_path(identifier, fixture_values), fcntl.LOCK_SH):
+            return
+
+    def size(self, identifier: str, fixture_values: dict[str, Any]) -> int:
+        """Size of the file in bytes."""
+        return self._get_path(identifier, fixture_values["tmp_path_factory"]).stat().st_size
+
+    @asynccontextmanager
+    async def alock(self, identifier: str, fixture_values: dict[str, Any]):
+        """The lock of `lock`, waited for in a thread so the event loop is not blocked."""
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        # A FileLock belongs to the thread that acquired it, so it is released in the same one
+        lock = self.lock(identifier, fixture_values)
+        executor = ThreadPoolExecutor(max_workers=1)
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                await asyncio.shield(loop.run_in_executor(executor, lock.__enter__))
+            except asyncio.CancelledError:
+                # The thread still gets the lock, so queue the release right after it
+                executor.submit(lock.__exit__, None, None, None)
+                raise
+            try:
+                yield
+            finally:
+                await loop.run_in_executor(executor, lock.__exit__, None, None, None)
+        finally:
+            executor.shutdown(wait=False)
+
+    async def aread(self, identifier: str, fixture_values: dict[str, Any]) -> Any:
+        """Read data in a thread."""
+        import asyncio
+
+        return await asyncio.to_thread(self.read, identifier, fixture_values)  # type: ignore[attr-defined]
+
+    async def awrite(self, identifier: str, data: Any, fixture_values: dict[str, Any]):
+        """Write data in a thread."""
+        import asyncio
+
+        await asyncio.to_thread(self.write, identifier, data, fixture_values)  # type: ignore[attr-defined]
+
 
 class FileStore(LocalFileStoreMixin):
     """Store that reads and writes data (as strings) from a file."""
@@ -43,7 +177,8 @@ class FileStore(LocalFileStoreMixin):
 
     def write(self, identifier: str, data: str, fixture_values: dict[str, Any]):
         """Write data to a file."""
-        self._get_path(identifier, fixture_values["tmp_path_factory"]).write_text(data)
+        with self._open_for_write(self._get_path(identifier, fixture_values["tmp_path_factory"])) as f:
+            f.write(data)
 
 
 class JsonStore(FileStore):
@@ -56,3 +191,758 @@ class JsonStore(FileStore):
     def write(self, identifier: str, data: Any, fixture_values: dict[str, Any]):
         """Write data to a file as json using json.dumps."""
         super().write(identifier, json.dumps(data), fixture_values)
+
+
+class MmapStore(LocalFileStoreMixin):
+    """Store that writes bytes-like data to a file and reads it back as a memory map.
+
+    `write` accepts any contiguous object supporting the buffer protocol (bytes, `array.array`,
+    NumPy arrays, Arrow buffers, ...). `read` returns a read-only `memoryview` over an `mmap` of
+    the file, so the pages are shared between workers through the OS page cache instead of
+    being copied into the memory of every worker.
+    """
+
+    _suffix = ".bin"
+
+    def read(self, identifier: str, fixture_values: dict[str, Any]) -> memoryview:
+        """Memory map the file and return a read-only view of it."""
+        return self._map(identifier, fixture_values)
+
+    def write(self, identifier: str, data: Any, fixture_values: dict[str, Any]):
+        """Write the raw bytes of a buffer to a file."""
+        with self._open_for_write(self._get_path(identifier, fixture_values["tmp_path_factory"]), "wb") as f:
+            f.write(data)
+
+
+# Modules with `compress` and `decompress` functions, by their index in the segment header
+_CODECS = [None, "zlib", "lzma", "bz2"]
+
+
+class PickleStore(MmapStore):
+    """Store that reads and writes any picklable data using pickle protocol 5.
+
+    Large buffers that support out-of-band pickling (`bytearray`, `pickle.PickleBuffer`, NumPy arrays,
+    Arrow buffers, ...) are written as separate segments after the pickle stream instead of being
+    copied into it. Uncompressed segments are read back as read-only views of a memory map of the file.
+
+    Segments larger than `compression_threshold` bytes are compressed with `compression` if it is set.
+
+    The file starts with a header of the number of segments followed by the codec and length of
+    each segment. The first segment is the pickle stream, the rest are the out-of-band buffers.
+    """
+
+    _suffix = ".pickle"
+    _header = struct.Struct("<I")
+    _segment_header = struct.Struct("<BQ")
+
+    def __init__(
+        self,
+        compression: Literal["zlib", "lzma", "bz2"] | None = None,
+        compression_threshold: int = 1024 * 1024,
+    ):
+        """Create a pickle store.
+
+        Args:
+            compression: Compression used for segments larger than `compression_threshold`.
+            compression_threshold: Size in bytes above which segments are compressed.
+        """
+        if compression is not None and compression not in _CODECS:
+            msg = f"Unknown compression {compression!r}. Use one of {_CODECS[1:]}."
+            raise ValueError(msg)
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+
+    def read(self, identifier: str, fixture_values: dict[str, Any]) -> Any:
+        """Read data from a file and unpickle it."""
+        view = super().read(identifier, fixture_values)
+        (n_segments,) = self._header.unpack_from(view)
+        offset = self._header.size + n_segments * self._segment_header.size
+        segments: list[bytes | memoryview] = []
+        for codec, length in self._segment_header.iter_unpack(view[self._header.size : offset]):
+            segment: bytes | memoryview = view[offset : offset + length]
+            if _CODECS[codec] is not None:
+                segment = importlib.import_module(_CODECS[codec]).decompress(segment)
+            segments.append(segment)
+            offset += length
+        return pickle.loads(segments[0], buffers=segments[1:])
+
+    def write(self, identifier: str, data: Any, fixture_values: dict[str, Any]):
+        """Pickle data and write it and its out-of-band buffers to a file."""
+        buffers: list[memoryview] = []
+
+        def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+            try:
+                buffers.append(buffer.raw())
+            except BufferError:  # Not contiguous, keep it in the pickle stream
+                return True
+            return False
+
+        stream = pickle.dumps(data, protocol=5, buffer_callback=buffer_callback)
+        segments = [self._compress(segment) for segment in [memoryview(stream), *buffers]]
+
+        with self._open_for_write(self._get_path(identifier, fixture_values["tmp_path_factory"]), "wb") as f:
+            f.write(self._header.pack(len(segments)))
+            for codec, segment in segments:
+                f.write(self._segment_header.pack(codec, segment.nbytes))
+            for _, segment in segments:
+                f.write(segment)
+
+    def _compress(self, segment: memoryview) -> tuple[int, memoryview]:
+        if self.compression is None or segment.nbytes <= self.compression_threshold:
+            return 0, segment
+        compressed = importlib.import_module(self.compression).compress(segment)
+        return _CODECS.index(self.compression), memoryview(compressed)
+
+
+class LazyMapping(Mapping[str, Any]):
+    """Read-only mapping that decodes a value the first time its key is accessed, and keeps it."""
+
+    def __init__(self, buffer: memoryview, index: dict[str, list[int]]):
+        """Map the keys of `index` to the json encoded values at their offset and length in `buffer`."""
+        self._buffer = buffer
+        self._index = index
+        self._decoded: dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        """Decode the value of `key`, unless it was decoded before."""
+        try:
+            return self._decoded[key]
+        except KeyError:
+            pass
+        offset, length = self._index[key]
+        value = self._decoded[key] = json.loads(self._buffer[offset : offset + length].tobytes())
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the keys without decoding any value."""
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        """Number of keys."""
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        """Show how many keys were decoded, without decoding the rest."""
+        return f"LazyMapping({len(self._decoded)} of {len(self)} keys decoded)"
+
+
+class LazyJsonStore(LocalFileStoreMixin):
+    """Store that writes a mapping with json encoded values and reads it back as a `LazyMapping`.
+
+    Each value is encoded separately, and the file starts with an index of the offset and length of every
+    value. Workers memory map the file and only decode the values of the keys their tests access, so
+    workers using few keys of a large mapping stay cheap. Keys have to be strings.
+
+    The file starts with the length of the json encoded index, followed by the index and the values.
+    """
+
+    _suffix = ".lazy.json"
+    _header = struct.Struct("<Q")
+
+    def read(self, identifier: str, fixture_values: dict[str, Any]) -> LazyMapping:
+        """Read the index, leaving the values to be decoded when they are accessed."""
+        buffer = self._map(identifier, fixture_values)
+        (index_length,) = self._header.unpack_from(buffer)
+        start = self._header.size
+        index = json.loads(buffer[start : start + index_length].tobytes())
+        return LazyMapping(buffer[start + index_length :], index)
+
+    def write(self, identifier: str, data: Mapping[str, Any], fixture_values: dict[str, Any]):
+        """Encode every value of the mapping separately and write them after their index."""
+        if not isinstance(data, Mapping):
+            msg = f"{type(self).__name__} can only store mappings, not {type(data).__name__}"
+            raise TypeError(msg)
+        values = []
+        index = {}
+        offset = 0
+        for key, value in data.items():
+            encoded = json.dumps(value).encode()
+            index[key] = [offset, len(encoded)]
+            values.append(encoded)
+            offset += len(encoded)
+        encoded_index = json.dumps(index).encode()
+        path = self._get_path(identifier, fixture_values["tmp_path_factory"])
+        with self._open_for_write(path, "wb") as f:
+            f.write(self._header.pack(len(encoded_index)))
+            f.write(encoded_index)
+            f.writelines(values)
+
+
+class RecordStream:
+    """Lazy iterable over the records of a stream. Every iteration reads the stream from the start."""
+
+    def __init__(self, store: "JsonLinesStore", identifier: str, fixture_values: dict[str, Any]):
+        """Stream of `identifier` in `store`."""
+        self.store = store
+        self.identifier = identifier
+        self.fixture_values = fixture_values
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the records, waiting for records that are still being written."""
+        return self.store.read_stream(self.identifier, self.fixture_values)
+
+
+class JsonLinesStore(LocalFileStoreMixin):
+    """Store that streams an iterable of json serializable records to a JSON Lines file.
+
+    Records are written one per line as the fixture produces them and flushed every `chunk_size` records,
+    so the value never has to be in memory at once. `read` returns a `RecordStream` that reads the records
+    lazily. Workers can start reading while the records are still being written: readers wait for more
+    lines until the line marking the end of the stream. If producing the records fails, a line with the
+    error is written instead and readers raise it.
+
+    Readers that see no new records for `timeout` seconds raise `TimeoutError`, in case the worker
+    writing the stream died.
+    """
+
+    _suffix = ".jsonl"
+    _end = b"#end\n"
+    _error = b"#error "
+
+    def __init__(self, chunk_size: int = 1000, poll_interval: float = 0.005, timeout: float | None = 600.0):
+        """Create a store flushing every `chunk_size` records, with readers polling every `poll_interval`."""
+        self.chunk_size = chunk_size
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def read(self, identifier: str, fixture_values: dict[str, Any]) -> RecordStream:
+        """Lazy iterable over the records."""
+        return RecordStream(self, identifier, fixture_values)
+
+    def write(self, identifier: str, data: Iterable[Any], fixture_values: dict[str, Any]):
+        """Write all records."""
+        self.write_stream(identifier, data, fixture_values)
+
+    def write_stream(self, identifier: str, records: Iterable[Any], fixture_values: dict[str, Any]):
+        """Write the records as they are produced, followed by the end of the stream."""
+        path = self._get_path(identifier, fixture_values["tmp_path_factory"])
+        # Written in place instead of atomically, so readers can follow it
+        with path.open("wb") as f:
+            try:
+                for i, record in enumerate(records, 1):
+                    f.write(json.dumps(record).encode() + b"\n")
+                    if i % self.chunk_size == 0:
+                        f.flush()
+            except BaseException as e:
+                f.write(self._error + json.dumps(repr(e)).encode() + b"\n")
+                raise
+            f.write(self._end)
+
+    def read_stream(self, identifier: str, fixture_values: dict[str, Any]) -> Iterator[Any]:
+        """Iterate over the records, waiting for more until the end of the stream."""
+        path = self._get_path(identifier, fixture_values["tmp_path_factory"])
+        self._poll(path.exists, identifier)
+        with path.open("rb") as f:
+            partial = b""
+            while True:
+                line = partial + f.readline()
+                if not line.endswith(b"\n"):
+                    # The rest of the line has not been written yet
+                    partial = line
+                    self._poll(lambda: f.peek(1) != b"", identifier)
+                    continue
+                partial = b""
+                if line == self._end:
+                    return
+                if line.startswith(self._error):
+                    error = json.loads(line[len(self._error) :])
+                    msg = f"Writing the stream {identifier!r} failed with {error}"
+                    raise RuntimeError(msg)
+                yield json.loads(line)
+
+    def _poll(self, ready: Callable[[], bool], identifier: str):
+        """Wait for `ready` to return true, while the stream is being written."""
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while not ready():
+            if deadline is not None and time.monotonic() > deadline:
+                msg = f"No new records in the stream {identifier!r} for {self.timeout} seconds"
+                raise TimeoutError(msg)
+            time.sleep(self.poll_interval)
+
+
+class BrokerStore:
+    """Store that keeps data, locks and counters in memory in the pytest-xdist controller.
+
+    Workers talk to the controller over execnet, so no files are used and it works
+    with remote and socket gateways (`--tx`) too. Data must be serializable by execnet:
+    builtin types like str, bytes, numbers, and lists, tuples and dicts of those.
+
+    The controller only gives the workers a channel to it when a `BrokerStore` is created there,
+    so it must be created in a conftest.py or plugin that the controller loads.
+    """
+
+    def __init__(self):
+        """Create a broker store."""
+        use_broker()
+
+    @property
+    def fixtures(self) -> list[str]:
+        """List of fixtures that the store needs."""
+        return ["pytestconfig"]
+
+    def read(self, identifier: str, fixture_values: dict[str, Any]) -> Any:
+        """Read data from the controller."""
+        found, data = get_client(fixture_values["pytestconfig"]).request("read", identifier)
+        if not found:
+            raise StoreValueNotExists()
+        return data
+
+    def write(self, identifier: str, data: Any, fixture_values: dict[str, Any]):
+        """Write data to the controller."""
+        get_client(fixture_values["pytestconfig"]).request("write", identifier, data)
+
+    @contextmanager
+    def lock(self, identifier: str, fixture_values: dict[str, Any]):
+        """Lock held by the controller. Waiting workers are woken up when it is released."""
+        client = get_client(fixture_values["pytestconfig"])
+        client.request("acquire", identifier)
+        try:
+            yield
+        finally:
+            client.send("release", identifier)
+
+    def increment(self, identifier: str, amount: int, fixture_values: dict[str, Any]) -> int:
+        """Atomically add to a counter in the controller and return the new value."""
+        _, value = get_client(fixture_values["pytestconfig"]).request("increment", identifier, amount)
+        return value
+
+    def release(self, identifier: str, finished: int, total: int, fixture_values: dict[str, Any]) -> bool:
+        """Count a released value and finished tests in one request, see `SupportsRelease`."""
+        client = get_client(fixture_values["pytestconfig"])
+        _, is_last = client.request("release_value", identifier, (finished, total))
+        return is_last
+
+    def wait_for(self, identifier: str, fixture_values: dict[str, Any]):
+        """Wait for the lock to be released. The controller answers as soon as it is."""
+        get_client(fixture_values["pytestconfig"]).request("wait", identifier)
+
+
+@functools.cache
+def _segment_type() -> type:
+    from multiprocessing import shared_memory
+
+    class _Segment(shared_memory.SharedMemory):
+        def __del__(self):
+            # Views of the segment handed out by `SharedMemoryStore.read` keep the memory mapped
+            with suppress(BufferError):
+                super().__del__()
+
+    return _Segment
+
+
+def _open_segment(name: str, create: bool = False, size: int = 0) -> Any:
+    # Only the last worker using the value may remove the segment, not whichever process exits first
+    if sys.version_info >= (3, 13):
+        return _segment_type()(name, create, size, track=False)
+    segment = _segment_type()(name, create, size)
+    if os.name == "posix":
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+
+class SharedMemoryStore(LocalFileStoreMixin):
+    """Store that keeps values in named shared memory segments, for workers on the same host.
+
+    `write` accepts str or any contiguous object supporting the buffer protocol (bytes, `array.array`,
+    NumPy arrays, ...). Buffers are read back as a read-only `memoryview` of the shared memory, so the
+    workers use the same memory without copying it or touching the disk. Strings are decoded into a copy.
+
+    Each value has a segment with a name derived from the base temp directory and the identifier,
+    starting with a header of the length and kind of the value. The last worker to finish deletes the
+    segments, and segments of runs that crashed stay around until the host restarts. Locks are file locks.
+    """
+
+    _suffix = ".shm"
+    _header = struct.Struct("<QB")
+    _kinds = (bytes, str)
+
+    def __init__(self):
+        """Create a shared memory store."""
+        # Keep the segments of this process open as long as views of them may be in use
+        self._segments: dict[str, Any] = {}
+
+    def _name(self, identifier: str, fixture_values: dict[str, Any]) -> str:
+        # Short enough for the 31 character limit of macOS, unique for each run and value
+        path = self._get_path(identifier, fixture_values["tmp_path_factory"])
+        return "pssc-" + hashlib.sha1(str(path).encode()).hexdigest()[:24]
+
+    def read(self, identifier: str, fixture_values: dict[str, Any]) -> memoryview | str:
+        """Attach to the segment and return a read-only view of the value, or a copy of a string."""
+        name = self._name(identifier, fixture_values)
+        try:
+            segment = _open_segment(name)
+        except FileNotFoundError:
+            raise StoreValueNotExists()
+        self._segments[name] = segment
+        length, kind = self._header.unpack_from(segment.buf)
+        view = segment.buf[self._header.size : self._header.size + length].toreadonly()
+        if self._kinds[kind] is str:
+            return str(view, "utf-8")
+        return view
+
+    def write(self, identifier: str, data: Any, fixture_values: dict[str, Any]):
+        """Copy the value into a new segment, replacing the old one."""
+        if isinstance(data, str):
+            kind, payload = self._kinds.index(str), memoryview(data.encode())
+        else:
+            kind, payload = self._kinds.index(bytes), memoryview(data).cast("B")
+        name = self._name(identifier, fixture_values)
+        self.delete(identifier, fixture_values)  # Readers that attached to it keep their views
+        segment = _open_segment(name, create=True, size=self._header.size + payload.nbytes)
+        self._header.pack_into(segment.buf, 0, payload.nbytes, kind)
+        segment.buf[self._header.size : self._header.size + payload.nbytes] = payload
+        self._segments[name] = segment
+
+    def size(self, identifier: str, fixture_values: dict[str, Any]) -> int:
+        """Size of the value in bytes."""
+        name = self._name(identifier, fixture_values)
+        try:
+            segment = self._segments.get(name) or _open_segment(name)
+        except FileNotFoundError:
+            raise StoreValueNotExists()
+        length, _ = self._header.unpack_from(segment.buf)
+        return length
+
+    def delete(self, identifier: str, fixture_values: dict[str, Any]):
+        """Remove the name of the segment. The memory is freed once no process has it mapped anymore."""
+        name = self._name(identifier, fixture_values)
+        from multiprocessing import shared_memory
+
+        with suppress(FileNotFoundError):
+            # Attaching registers the segment with the resource tracker, which unlink unregisters again
+            shared_memory.SharedMemory(name).unlink()
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shared_values (identifier TEXT PRIMARY KEY, value BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS shared_counters (identifier TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS shared_locks (identifier TEXT PRIMARY KEY, host TEXT, pid INTEGER, token TEXT);
+"""
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # Exists, but belongs to someone else
+        return True
+    return True
+
+
+class SqliteStore:
+    """Store that keeps values, counters and locks of all shared fixtures in one SQLite database.
+
+    The file stores use a data file and a lock file per fixture, and as many again for the metadata.
+    This store uses a single database in WAL mode next to the base temp directory, so readers run
+    concurrently with a writer and every update is a single transaction. Use it as both `store`
+    and `metadata_storage`. Values are str or bytes-like and read back as str or bytes.
+
+    Locks are rows that are inserted to acquire and deleted to release them, so a worker computing
+    a value does not block the database for others. Waiting workers poll for the row to go away, and
+    take over locks of processes on the same host that died.
+    """
+
+    def __init__(self, filename: str = "shared_session_scope.sqlite", timeout: float = 60):
+        """Create a SQLite store.
+
+        Args:
+            filename: Name of the database file in the root of the base temp directory.
+            timeout: Seconds to wait for another connection to finish writing before failing.
+        """
+        self.filename = filename
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def fixtures(self) -> list[str]:
+        """List of fixtures that the store needs."""
+        return ["tmp_path_factory"]
+
+    def _connect(self, fixture_values: dict[str, Any]) -> "sqlite3.Connection":
+        # Connections can not be shared between threads, so each thread has its own
+        path = fixture_values["tmp_path_factory"].getbasetemp().parent / self.filename
+        connections: dict[Path, "sqlite3.Connection"] = self._local.__dict__.setdefault("connections", {})
+        if path not in connections:
+            import sqlite3
+
+            connection = sqlite3.connect(path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SQLITE_SCHEMA)
+            connections[path] = connection
+        return connections[path]
+
+    def read(self, identifier: str, fixture_values: dict[str, Any]) -> str | bytes:
+        """Read a value."""
+        query = "SELECT value FROM shared_values WHERE identifier = ?"
+        row = self._connect(fixture_values).execute(query, (identifier,)).fetchone()
+        if row is None:
+            raise StoreValueNotExists()
+        return row[0]
+
+    def write(self, identifier: str, data: Any, fixture_values: dict[str, Any]):
+        """Write a value, replacing the old one in a single transaction."""
+        value = data if isinstance(data, str) else memoryview(data)
+        self._connect(fixture_values).execute(
+            "INSERT INTO shared_values VALUES (?, ?) "
+            "ON CONFLICT (identifier) DO UPDATE SET value = excluded.value",
+            (identifier, value),
+        )
+
+    def size(self, identifier: str, fixture_values: dict[str, Any]) -> int:
+        """Size of a value in bytes."""
+        query = "SELECT length(CAST(value AS BLOB)) FROM shared_values WHERE identifier = ?"
+        row = self._connect(fixture_values).execute(query, (identifier,)).fetchone()
+        if row is None:
+            raise StoreValueNotExists()
+        return row[0]
+
+    @contextmanager
+    def _transaction(self, fixture_values: dict[str, Any]) -> "Iterator[sqlite3.Connection]":
+        connection = self._connect(fixture_values)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    @staticmethod
+    def _add(connection: "sqlite3.Connection", identifier: str, amount: int) -> int:
+        connection.execute(
+            "INSERT INTO shared_counters VALUES (?, ?) "
+            "ON CONFLICT (identifier) DO UPDATE SET value = value + excluded.value",
+            (identifier, amount),
+        )
+        query = "SELECT value FROM shared_counters WHERE identifier = ?"
+        (value,) = connection.execute(query, (identifier,)).fetchone()
+        return value
+
+    def increment(self, identifier: str, amount: int, fixture_values: dict[str, Any]) -> int:
+        """Atomically add to a counter and return the new value."""
+        with self._transaction(fixture_values) as connection:
+            return self._add(connection, identifier, amount)
+
+    def release(self, identifier: str, finished: int, total: int, fixture_values: dict[str, Any]) -> bool:
+        """Count a released value and finished tests in one transaction, see `SupportsRelease`."""
+        with self._transaction(fixture_values) as connection:
+            released = self._add(connection, identifier + "_released", 1)
+            finished_tests = self._add(connection, identifier + "_metadata", finished)
+            setups = self._add(connection, identifier + "_setups", 0)
+        return finished_tests >= total and released >= setups
+
+    @contextmanager
+    def lock(self, identifier: str, fixture_values: dict[str, Any]):
+        """Lock held as a row in the database."""
+        connection = self._connect(fixture_values)
+        host, pid, token = socket.gethostname(), os.getpid(), uuid.uuid4().hex
+        delay = 0.001
+        while True:
+            cursor = connection.execute(
+                "INSERT INTO shared_locks VALUES (?, ?, ?, ?) ON CONFLICT (identifier) DO NOTHING",
+                (identifier, host, pid, token),
+            )
+            if cursor.rowcount == 1:
+                break
+            self._release_if_owner_died(connection, identifier, host)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        try:
+            yield
+        finally:
+            connection.execute(
+                "DELETE FROM shared_locks WHERE identifier = ? AND token = ?", (identifier, token)
+            )
+
+    def _release_if_owner_died(self, connection: "sqlite3.Connection", identifier: str, host: str):
+        query = "SELECT host, pid, token FROM shared_locks WHERE identifier = ?"
+        row = connection.execute(query, (identifier,)).fetchone()
+        if row is not None and row[0] == host and not _pid_alive(row[1]):
+            connection.execute(
+                "DELETE FROM shared_locks WHERE identifier = ? AND token = ?", (identifier, row[2])
+            )
+
+
+# Only release or extend a lock still held with our token, not one that expired and another worker took
+_RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+_EXTEND_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+# Count a released value and finished tests, and tell whether this was the last release
+_COUNT_RELEASE_SCRIPT = """
+local released = redis.call("INCRBY", KEYS[1], 1)
+local finished = redis.call("INCRBY", KEYS[2], ARGV[1])
+redis.call("PEXPIRE", KEYS[1], ARGV[3])
+redis.call("PEXPIRE", KEYS[2], ARGV[3])
+local setups = tonumber(redis.call("GET", KEYS[3]) or "0")
+if finished >= tonumber(ARGV[2]) and released >= setups then
+    return 1
+end
+return 0
+"""
+
+
+class RedisStore:
+    """Store that keeps values, locks and counters in a server speaking the Redis protocol.
+
+    The file stores only work when all workers run on the same host. This store works for
+    distributed runs too (`--tx ssh=...`), as long as all workers can reach the server.
+    Use it as both `store` and `metadata_storage`. Values are str or bytes-like and read back as str
+    or bytearray. They are stored as a list of chunks of at most `chunk_size` bytes, so large values are
+    sent and kept in pieces instead of as one huge string.
+
+    Keys start with `prefix` and the xdist test run id, so runs sharing a server do not see each
+    other's values, and expire after `ttl` seconds in case a run never finishes.
+
+    Locks are keys set with `SET NX` that expire after `lease` seconds. The lease is extended while
+    the lock is held, so the lock of a worker that died is free again after at most `lease` seconds.
+    Counters are incremented and their expiry refreshed in one pipelined round trip, and a worker
+    finishing a fixture updates and compares all its counters in one script.
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "pytest-shared-session-scope",
+        lease: float = 30,
+        ttl: float = 24 * 60 * 60,
+        chunk_size: int = 8 * 1024 * 1024,
+        timeout: float | None = None,
+    ):
+        """Create a Redis store.
+
+        Args:
+            url: Server to connect to, `redis://[:password@]host:port/db` or `unix:///path/to/socket?db=0`.
+            prefix: Prefix of all keys.
+            lease: Seconds after which the lock of a worker that stopped extending it expires.
+            ttl: Seconds after which values and counters expire.
+            chunk_size: Maximum size in bytes of each chunk of a value.
+            timeout: Seconds to wait for the server before failing, or None to wait forever.
+        """
+        self.url = url
+        self.prefix = prefix
+        self.lease = lease
+        self.ttl = ttl
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+
+    @property
+    def fixtures(self) -> list[str]:
+        """List of fixtures that the store needs."""
+        return ["pytestconfig"]
+
+    def _key(self, identifier: str, fixture_values: dict[str, Any]) -> str:
+        workerinput = getattr(fixture_values["pytestconfig"], "workerinput", {})
+        return f"{self.prefix}:{workerinput.get('testrunuid', '')}:{identifier}"
+
+    def _pipeline(self, commands: list[tuple]) -> list[Any]:
+        from pytest_shared_session_scope._resp import RespError, get_pool
+
+        with get_pool(self.url, self.timeout).connection() as connection:
+            replies = connection.pipeline(commands)
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def read(self, identifier: str, fixture_values: dict[str, Any]) -> str | bytearray:
+        """Read the chunks of a value one by one into a buffer of the size of the value.
+
+        Only one chunk is held in memory besides the buffer, instead of all of them and their concatenation.
+        """
+        from pytest_shared_session_scope._resp import get_pool
+
+        key = self._key(identifier, fixture_values)
+        header, length = self._pipeline([("LINDEX", key, 0), ("LLEN", key)])
+        if header is None:
+            raise StoreValueNotExists()
+        kind, size = header.split(b":")
+        buffer = bytearray(int(size))
+        offset = 0
+        with get_pool(self.url, self.timeout).connection() as connection:
+            for index in range(1, length):
+                chunk = connection.execute("LINDEX", key, index)
+                if chunk is None:
+                    break
+                buffer[offset : offset + len(chunk)] = chunk
+                offset += len(chunk)
+        if offset != len(buffer):  # Deleted while it was read
+            raise StoreValueNotExists()
+        return str(memoryview(buffer), "utf-8") if kind == b"str" else buffer
+
+    def write(self, identifier: str, data: Any, fixture_values: dict[str, Any]):
+        """Write the chunks of a value to a temporary key and rename it, so readers never see part of it."""
+        key = self._key(identifier, fixture_values)
+        kind = "str" if isinstance(data, str) else "bytes"
+        payload = memoryview(data.encode() if isinstance(data, str) else data).cast("B")
+        tmp_key = f"{key}:{uuid.uuid4().hex}"
+        commands: list[tuple] = [("RPUSH", tmp_key, f"{kind}:{payload.nbytes}")]
+        for start in range(0, payload.nbytes, self.chunk_size):
+            commands.append(("RPUSH", tmp_key, payload[start : start + self.chunk_size]))
+        commands += [("PEXPIRE", tmp_key, int(self.ttl * 1000)), ("RENAME", tmp_key, key)]
+        self._pipeline(commands)
+
+    def size(self, identifier: str, fixture_values: dict[str, Any]) -> int:
+        """Size of a value in bytes."""
+        (header,) = self._pipeline([("LINDEX", self._key(identifier, fixture_values), 0)])
+        if header is None:
+            raise StoreValueNotExists()
+        return int(header.split(b":")[1])
+
+    def delete(self, identifier: str, fixture_values: dict[str, Any]):
+        """Delete a value."""
+        self._pipeline([("DEL", self._key(identifier, fixture_values))])
+
+    def increment(self, identifier: str, amount: int, fixture_values: dict[str, Any]) -> int:
+        """Atomically add to a counter and return the new value."""
+        key = self._key(identifier, fixture_values)
+        value, _ = self._pipeline([("INCRBY", key, amount), ("PEXPIRE", key, int(self.ttl * 1000))])
+        return value
+
+    def release(self, identifier: str, finished: int, total: int, fixture_values: dict[str, Any]) -> bool:
+        """Count a released value and finished tests in one script, see `SupportsRelease`."""
+        keys = [
+            self._key(identifier + suffix, fixture_values) for suffix in ("_released", "_metadata", "_setups")
+        ]
+        (is_last,) = self._pipeline(
+            [("EVAL", _COUNT_RELEASE_SCRIPT, len(keys), *keys, finished, total, int(self.ttl * 1000))]
+        )
+        return bool(is_last)
+
+    @contextmanager
+    def lock(self, identifier: str, fixture_values: dict[str, Any]):
+        """Lock held as a key with an expiring lease that is extended while it is held."""
+        key = self._key(identifier, fixture_values) + ":lock"
+        token = uuid.uuid4().hex
+        lease_ms = int(self.lease * 1000)
+        delay = 0.001
+        while self._pipeline([("SET", key, token, "NX", "PX", lease_ms)]) == [None]:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+        stop = threading.Event()
+
+        def extend_lease():
+            while not stop.wait(self.lease / 3):
+                self._pipeline([("EVAL", _EXTEND_SCRIPT, 1, key, token, lease_ms)])
+
+        keeper = threading.Thread(target=extend_lease, daemon=True)
+        keeper.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            keeper.join()
+            self._pipeline([("EVAL", _RELEASE_SCRIPT, 1, key, token)])
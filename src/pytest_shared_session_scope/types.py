@@ -1,8 +1,8 @@
 """Common types used in the package."""
 
 from enum import Enum, auto
-from contextlib import AbstractContextManager
-from typing import Any, Generic, Protocol, TypeVar
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
+from typing import Any, Generic, Iterable, Iterator, Protocol, TypeVar, runtime_checkable
 
 
 class StoreValueNotExists(Exception):
@@ -11,6 +11,23 @@ class StoreValueNotExists(Exception):
     ...
 
 
+class SharedFixtureSetupError(Exception):
+    """Raised when the setup of a shared fixture failed in another worker.
+
+    Attributes:
+        fixture: Name of the fixture, with its parameter if it is parametrized.
+        worker: The xdist worker the setup failed in.
+        traceback: Formatted traceback of the error in that worker.
+    """
+
+    def __init__(self, fixture: str, worker: str, traceback: str):
+        """Create the error for the setup of `fixture` that failed in `worker` with `traceback`."""
+        super().__init__(f"Setup of shared fixture {fixture!r} failed in {worker}:\n{traceback}")
+        self.fixture = fixture
+        self.worker = worker
+        self.traceback = traceback
+
+
 _StoreType = TypeVar("_StoreType")
 
 
@@ -39,6 +56,124 @@ class Store(Protocol, Generic[_StoreType]):
         ...
 
 
+@runtime_checkable
+class AsyncStore(Protocol, Generic[_StoreType]):
+    """Async variant of the `Store` protocol used by async fixtures.
+
+    Async fixtures await these methods on the event loop when both their `store` and `metadata_storage`
+    implement it. Otherwise the sync methods are run in a thread so they do not block the event loop.
+    """
+
+    @property
+    def fixtures(self) -> list[str]:
+        """List of fixtures that the store needs."""
+        ...
+
+    async def aread(self, identifier: str, fixture_values: dict[str, Any]) -> _StoreType:
+        """Read a value from the storage.
+
+        Raises:
+            StoreValueNotExists: If the identifier is not found in the storage.
+        """
+        ...
+
+    async def awrite(self, identifier: str, data: _StoreType, fixture_values: dict[str, Any]):
+        """Write a value to the storage."""
+        ...
+
+    def alock(self, identifier: str, fixture_values: dict[str, Any]) -> AbstractAsyncContextManager:
+        """Lock to ensure atomicity, waiting without blocking the event loop."""
+        ...
+
+
+@runtime_checkable
+class SupportsIncrement(Protocol):
+    """Optional extension of the `Store` protocol for atomic counters.
+
+    If the `metadata_storage` implements it, it is used to count finished tests
+    instead of locking, reading and writing the counter.
+    """
+
+    def increment(self, identifier: str, amount: int, fixture_values: dict[str, Any]) -> int:
+        """Atomically add `amount` to the counter (starting at 0) and return the new value."""
+        ...
+
+
+@runtime_checkable
+class SupportsRelease(Protocol):
+    """Optional extension of the `Store` protocol for releasing a value in a single call.
+
+    If the `metadata_storage` implements it, a worker finishing a fixture updates the counters with it
+    instead of taking a lock around incrementing and reading them.
+    """
+
+    def release(self, identifier: str, finished: int, total: int, fixture_values: dict[str, Any]) -> bool:
+        """Atomically count a released value and finished tests, and tell whether this was the last release.
+
+        Adds 1 to the counter `{identifier}_released` and `finished` to `{identifier}_metadata`. It is the
+        last release if the latter reached `total` and the former the counter `{identifier}_setups`.
+        """
+        ...
+
+
+@runtime_checkable
+class SupportsSize(Protocol):
+    """Optional extension of the `Store` protocol for the size of stored values.
+
+    Used to report the bytes shared per fixture with `--shared-scope-report`.
+    """
+
+    def size(self, identifier: str, fixture_values: dict[str, Any]) -> int:
+        """Size in bytes of the stored value."""
+        ...
+
+
+@runtime_checkable
+class SupportsWait(Protocol):
+    """Optional extension of the `Store` protocol for waking up workers waiting on a value.
+
+    A worker that does not find a published value waits with `wait_for` for a worker that is
+    computing it to release the lock, and then reads the value without taking the lock itself.
+    Without it, waiting workers take the lock one after another, which for some stores means polling.
+    """
+
+    def wait_for(self, identifier: str, fixture_values: dict[str, Any]):
+        """Block until no worker holds the lock of the value, returning as soon as it is released."""
+        ...
+
+
+@runtime_checkable
+class SupportsStream(Protocol):
+    """Optional extension of the `Store` protocol for values too large to build in memory.
+
+    The value of the fixture is an iterable of records, written one by one as they are produced.
+    Other workers can start reading the records while they are still being written.
+    """
+
+    def write_stream(self, identifier: str, records: Iterable[Any], fixture_values: dict[str, Any]):
+        """Write the records as they are produced, marking the stream complete when they run out."""
+        ...
+
+    def read_stream(self, identifier: str, fixture_values: dict[str, Any]) -> Iterator[Any]:
+        """Iterate over the records, waiting for more until the stream is complete.
+
+        The stream may not have been created yet when this is called.
+        """
+        ...
+
+
+@runtime_checkable
+class SupportsDelete(Protocol):
+    """Optional extension of the `Store` protocol for stores holding resources that outlive the workers.
+
+    The last worker to finish using a fixture deletes its value after the cleanup of the fixture ran.
+    """
+
+    def delete(self, identifier: str, fixture_values: dict[str, Any]):
+        """Delete the stored value."""
+        ...
+
+
 class SetupToken(Enum):
     """Token that is send back to the fixture in first yield."""
 
@@ -1,7 +1,11 @@
 from pytest_shared_session_scope import shared_session_scope_json
 from datetime import datetime
+import tempfile
+
+import pytest
 
 from pytest_shared_session_scope.types import CleanupToken, SetupToken
+from tests.resp_server import RespServer
 
 
 pytest_plugins = ["pytester"]
@@ -37,3 +41,10 @@ def fixture_with_deserializor():
 @shared_session_scope_json()
 def fixture_with_return():
     return 1
+
+
+@pytest.fixture
+def resp_server():
+    # Unix socket paths are limited to about 100 characters, too short for most tmp_path
+    with tempfile.TemporaryDirectory() as directory, RespServer(f"{directory}/redis.sock") as server:
+        yield server
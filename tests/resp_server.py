@@ -0,0 +1,151 @@
+"""In-memory stand-in for a Redis server, implementing the commands `RedisStore` uses."""
+
+import socketserver
+import threading
+import time
+
+from pytest_shared_session_scope.store import _COUNT_RELEASE_SCRIPT, _EXTEND_SCRIPT, _RELEASE_SCRIPT
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_Server"
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            arguments = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                arguments.append(self.rfile.read(length + 2)[:-2])
+            with self.server.data.mutex:
+                self.server.data.commands.append(arguments[0].decode().upper())
+                reply = self.server.data.execute(arguments[0].decode().upper(), arguments[1:])
+            self.wfile.write(_encode(reply))
+
+
+def _encode(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, Exception):
+        return b"-ERR %s\r\n" % str(reply).encode()
+    if isinstance(reply, bool):
+        return b"+OK\r\n"
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, list):
+        return b"*%d\r\n" % len(reply) + b"".join(_encode(item) for item in reply)
+    return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+
+class _Data:
+    def __init__(self):
+        self.mutex = threading.Lock()
+        self.values: dict[bytes, bytes | list[bytes]] = {}
+        self.expires: dict[bytes, float] = {}
+        # Names of all commands received, in order
+        self.commands: list[str] = []
+
+    def _get(self, key: bytes):
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            self._delete(key)
+        return self.values.get(key)
+
+    def _delete(self, key: bytes) -> int:
+        self.expires.pop(key, None)
+        return int(self.values.pop(key, None) is not None)
+
+    def execute(self, command: str, arguments: list[bytes]):
+        if command in ("PING", "SELECT", "AUTH"):
+            return True
+        if command == "GET":
+            return self._get(arguments[0])
+        if command == "SET":
+            key, value, *options = arguments
+            options = [option.upper() for option in options]
+            if b"NX" in options and self._get(key) is not None:
+                return None
+            self.values[key] = value
+            self.expires.pop(key, None)
+            if b"PX" in options:
+                self.expires[key] = time.monotonic() + int(options[options.index(b"PX") + 1]) / 1000
+            return True
+        if command == "DEL":
+            return sum(self._delete(key) for key in arguments if self._get(key) is not None)
+        if command == "INCRBY":
+            value = int(self._get(arguments[0]) or 0) + int(arguments[1])
+            self.values[arguments[0]] = str(value).encode()
+            return value
+        if command == "PEXPIRE":
+            if self._get(arguments[0]) is None:
+                return 0
+            self.expires[arguments[0]] = time.monotonic() + int(arguments[1]) / 1000
+            return 1
+        if command == "RPUSH":
+            values = self._get(arguments[0]) or []
+            assert isinstance(values, list)
+            values.extend(arguments[1:])
+            self.values[arguments[0]] = values
+            return len(values)
+        if command == "RENAME":
+            source, destination = arguments
+            if self._get(source) is None:
+                return Exception("no such key")
+            self._delete(destination)
+            self.values[destination] = self.values.pop(source)
+            if source in self.expires:
+                self.expires[destination] = self.expires.pop(source)
+            return True
+        if command in ("LLEN", "LINDEX"):
+            values = self._get(arguments[0]) or []
+            assert isinstance(values, list)
+            if command == "LLEN":
+                return len(values)
+            index = int(arguments[1])
+            return values[index] if -len(values) <= index < len(values) else None
+        if command == "EVAL":
+            # Lua is not supported, only the scripts of the store
+            if arguments[0].decode() == _COUNT_RELEASE_SCRIPT:
+                _, _, released_key, finished_key, setups_key, finished, total, ttl = arguments
+                released = self.execute("INCRBY", [released_key, b"1"])
+                finished_tests = self.execute("INCRBY", [finished_key, finished])
+                self.execute("PEXPIRE", [released_key, ttl])
+                self.execute("PEXPIRE", [finished_key, ttl])
+                setups = int(self._get(setups_key) or 0)
+                return int(finished_tests >= int(total) and released >= setups)
+            script, _, key, token, *rest = arguments
+            if self._get(key) != token:
+                return 0
+            if script.decode() == _RELEASE_SCRIPT:
+                return self._delete(key)
+            if script.decode() == _EXTEND_SCRIPT:
+                return self.execute("PEXPIRE", [key, *rest])
+        return Exception(f"unknown command {command}")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    data: _Data
+
+
+class RespServer:
+    """Stand-in server listening on a Unix socket in a background thread."""
+
+    def __init__(self, path: str):
+        self.url = f"unix://{path}"
+        self._server = _Server(path, _Handler)
+        self._server.data = _Data()
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.01,), daemon=True)
+
+    @property
+    def data(self) -> _Data:
+        return self._server.data
+
+    def __enter__(self) -> "RespServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+from pytest import Pytester
+
+from pytest_shared_session_scope.cache import PersistentCache, get_cache_dir
+from pytest_shared_session_scope.types import StoreValueNotExists
+
+
+@pytest.fixture
+def config(pytester: Pytester) -> pytest.Config:
+    return pytester.parseconfigure("-o", "shared_scope_cache_dir=shared-cache")
+
+
+def _age(cache_dir, key: str, seconds: int):
+    path = cache_dir / f"{key}.entry"
+    stat = path.stat()
+    os.utime(path, (stat.st_atime - seconds, stat.st_mtime - seconds))
+
+
+def test_roundtrip(config: pytest.Config):
+    cache = PersistentCache()
+    with pytest.raises(StoreValueNotExists):
+        cache.get("key", config)
+    cache.set("key", {"a": [1, 2]}, config)
+    assert cache.get("key", config) == {"a": [1, 2]}
+
+
+def test_key_depends_on_version_and_inputs():
+    def fixture(a, b): ...
+
+    key = PersistentCache(version="1", inputs=["a"]).key(fixture, "id", {"a": 1, "b": 2})
+    assert key == PersistentCache(version="1", inputs=["a"]).key(fixture, "id", {"a": 1, "b": 3})
+    assert key != PersistentCache(version="1", inputs=["a"]).key(fixture, "id", {"a": 2, "b": 2})
+    assert key != PersistentCache(version="2", inputs=["a"]).key(fixture, "id", {"a": 1, "b": 2})
+    assert key != PersistentCache(version="1", inputs=["a"]).key(fixture, "other", {"a": 1, "b": 2})
+
+
+def test_key_depends_on_upstream_versions():
+    def fixture(a): ...
+
+    cache = PersistentCache()
+    key = cache.key(fixture, "id", {}, {"a": "1"})
+    assert key == cache.key(fixture, "id", {}, {"a": "1"})
+    assert key != cache.key(fixture, "id", {}, {"a": "2"})
+    # Keys of fixtures without shared dependencies stay the same
+    assert cache.key(fixture, "id", {}, {}) == cache.key(fixture, "id", {})
+
+
+def test_evicts_least_recently_used(config: pytest.Config):
+    cache = PersistentCache(max_entries=2)
+    cache_dir = get_cache_dir(config)
+    assert cache_dir is not None
+    cache.set("first", 1, config)
+    _age(cache_dir, "first", 20)
+    cache.set("second", 2, config)
+    _age(cache_dir, "second", 10)
+
+    cache.get("first", config)  # Now the most recently used
+    cache.set("third", 3, config)
+
+    assert cache.get("first", config) == 1
+    assert cache.get("third", config) == 3
+    with pytest.raises(StoreValueNotExists):
+        cache.get("second", config)
+
+
+def test_evicts_above_max_bytes(config: pytest.Config):
+    cache = PersistentCache(max_bytes=250)
+    cache.set("old", "x" * 100, config)
+    cache_dir = get_cache_dir(config)
+    assert cache_dir is not None
+    _age(cache_dir, "old", 10)
+    cache.set("new", "y" * 200, config)
+
+    assert cache.get("new", config) == "y" * 200
+    with pytest.raises(StoreValueNotExists):
+        cache.get("old", config)
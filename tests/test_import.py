@@ -0,0 +1,23 @@
+import json
+import subprocess
+import sys
+
+# Modules only some stores or async fixtures need, which importing the plugin must not load
+LAZY_MODULES = [
+    "asyncio",
+    "filelock",
+    "multiprocessing",
+    "sqlite3",
+    "xdist",
+    "pytest_shared_session_scope._resp",
+]
+
+
+def test_import_does_not_load_optional_modules():
+    script = (
+        "import json, sys\n"
+        "import pytest_shared_session_scope.plugin\n"
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    assert json.loads(output) == []
@@ -1,9 +1,13 @@
+from multiprocessing import shared_memory
 from pathlib import Path
 import re
+from types import SimpleNamespace
 import pytest
 from pytest import Pytester
 import json
 
+from pytest_shared_session_scope.store import SharedMemoryStore
+
 
 def _add_test_fixtures(conftest_path: Path, tmp_path: Path):
     """Copy the example to a temporary directory and return the path
@@ -22,7 +26,9 @@ import pytest
 from pathlib import Path
 
 @pytest.fixture(scope="session")
-def results_dir():
+def results_dir(tmp_path_factory):
+    # Creating the base temp directory empties it, so it has to be created first
+    tmp_path_factory.getbasetemp()
     p = Path("{result_dir}")
     p.parent.mkdir(exist_ok=True)
     p.mkdir(exist_ok=True)
@@ -54,8 +60,14 @@ def copy_example_from_markdown(markdown_path: Path, pytester: Pytester, test_id:
             break
         code_block += line + "\n"
     print(code_block)
-    test_dir_path = pytester.makepyfile(**{f"test_{test_id}": code_block})
-    _add_test_fixtures(test_dir_path.parent / "conftest.py", tmp_path)
+    # A block can be split over several files with `# content of <file>` lines
+    sections = re.split(r"^# content of (\S+)\n", code_block, flags=re.MULTILINE)
+    if len(sections) > 1:
+        for name, content in zip(sections[1::2], sections[2::2]):
+            (pytester.path / name).write_text(content)
+    else:
+        pytester.makepyfile(**{f"test_{test_id}": code_block})
+    _add_test_fixtures(pytester.path / "conftest.py", tmp_path)
 
 
 def copy_example_from_readme(pytester: Pytester, test_id: str, tmp_path: Path):
@@ -97,6 +109,142 @@ def test_with_return(pytester: Pytester, n: int, tmp_path: Path):
     pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=5)
 
 
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_report(pytester: Pytester, n: int, tmp_path: Path):
+    pytester.copy_example("with_return")
+    report_path = tmp_path / "report.json"
+    res = pytester.runpytest(
+        "-n", str(n), "--basetemp", str(tmp_path), "--shared-scope-report-json", str(report_path)
+    )
+    res.assert_outcomes(passed=5)
+    res.stdout.fnmatch_lines(["*shared session scope fixtures*", "fixture*computed by*", "my_fixture *"])
+
+    report = json.loads(report_path.read_text())
+    summary = report["fixtures"]["my_fixture"]
+    # One worker computes the value and every worker that used the fixture is reported
+    assert summary["source"] == "computed"
+    assert len(summary["computed_by"]) == 1
+    assert summary["workers"] == len(report["setups"]) == max(min(n, 5), 1)
+    if n:
+        assert summary["bytes"] == len("123")
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_return_cleanup(pytester: Pytester, n: int, tmp_path: Path):
+    copy_example(pytester, "with_return_cleanup", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=5)
+
+    events = [path.name.split("-")[0] for path in get_output_dir(tmp_path).iterdir()]
+    # Exactly one worker calculates the value and exactly one cleans up
+    assert sorted(events) == ["cleanup", "setup"]
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_async(pytester: Pytester, n: int, tmp_path: Path):
+    pytest.importorskip("anyio")
+    copy_example(pytester, "with_async", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=5)
+
+    events = [path.name.split("-")[0] for path in get_output_dir(tmp_path).iterdir()]
+    fixture_events = [event for event in events if not event.startswith("store")]
+    assert sorted(fixture_events) == ["returncleanup", "returnsetup", "yieldcleanup", "yieldsetup"]
+    # The async methods of the store are awaited on the event loop, not run in a thread
+    assert "storeoffloop" not in events
+    assert ("storeonloop" in events) == bool(n)
+
+
+@pytest.mark.parametrize(
+    "args, expected_prewarmed",
+    [
+        ([], ["a"]),
+        (["--shared-scope-prewarm"], ["a", "b"]),
+    ],
+)
+def test_with_prewarm(pytester: Pytester, tmp_path: Path, args: list[str], expected_prewarmed: list[str]):
+    copy_example(pytester, "with_prewarm", tmp_path)
+    # A single worker, so it is deterministic which worker computes what
+    pytester.runpytest("-n", "1", "--basetemp", str(tmp_path), *args).assert_outcomes(passed=8)
+
+    events = [path.name.split("-") for path in get_output_dir(tmp_path).iterdir()]
+    (start,) = [int(timestamp) for event, _, _, timestamp in events if event == "start"]
+    setups = {name: int(timestamp) for event, name, _, timestamp in events if event == "setup"}
+    assert sorted(setups) == ["a", "b", "c"]
+    # Prewarmed fixtures are computed before the first test starts, the others when it needs them.
+    # This excludes `c`, which the first test can not see as it is defined in the conftest of a subdirectory.
+    assert sorted(name for name, timestamp in setups.items() if timestamp < start) == expected_prewarmed
+
+
+def test_with_prewarm_cleanup(pytester: Pytester, tmp_path: Path):
+    copy_example(pytester, "with_prewarm", tmp_path)
+    res = pytester.runpytest("-n", "2", "--shared-scope-prewarm", "--basetemp", str(tmp_path))
+    res.assert_outcomes(passed=8)
+
+    events = [path.name.split("-")[:2] for path in get_output_dir(tmp_path).iterdir()]
+    # A worker that only prewarmed a fixture must not clean it up as well
+    assert sorted(name for event, name in events if event == "setup") == ["a", "b", "c"]
+    assert sorted(name for event, name in events if event == "cleanup") == ["a", "b", "c"]
+
+
+def test_with_prewarm_release(pytester: Pytester, tmp_path: Path):
+    copy_example(pytester, "with_prewarm_release", tmp_path)
+    pytester.runpytest("-n", "2", "--basetemp", str(tmp_path)).assert_outcomes(passed=2)
+
+    results = [json.loads(path.read_text()) for path in get_output_dir(tmp_path).iterdir()]
+    assert len(results) == 2
+    cleanups = [data for data in results if data["is_cleanup_token"]]
+    assert len(cleanups) == 1
+    # The last worker to let go of the value cleans up, even if it only prewarmed it
+    assert cleanups[0]["time"] == max(data["time"] for data in results)
+
+
+def test_with_prewarm_late(pytester: Pytester, tmp_path: Path):
+    copy_example(pytester, "with_prewarm_late", tmp_path)
+    result = pytester.runpytest("-n", "2", "--dist", "loadgroup", "--basetemp", str(tmp_path))
+    result.assert_outcomes(passed=2)
+
+    events = sorted(path.name.rsplit("-", 1)[0] for path in get_output_dir(tmp_path).iterdir())
+    # The late worker neither sets the fixtures up again nor cleans them up a second time
+    assert events == ["cleanup-a", "cleanup-b", "setup-a", "setup-b"]
+
+
+def test_with_dist(pytester: Pytester, tmp_path: Path):
+    copy_example(pytester, "with_dist", tmp_path)
+    res = pytester.runpytest("-n", "3", "--shared-scope-dist", "--basetemp", str(tmp_path))
+    res.assert_outcomes(passed=14)
+
+    events = [path.name.split("-")[:3] for path in get_output_dir(tmp_path).iterdir()]
+    setups = {name: worker for event, name, worker in events if event == "setup"}
+    # Each worker starts with a different fixture, so they are all set up in parallel
+    assert sorted(setups) == ["a", "b", "c"]
+    assert len(set(setups.values())) == 3
+
+    # Tests using a fixture are run by as few workers as possible
+    for fixture in "abc":
+        workers = {worker for event, name, worker in events if event == "test" and name[5] == fixture}
+        assert len(workers) == 1
+
+
+def test_cleanup_only_for_return():
+    from pytest_shared_session_scope import shared_session_scope_json
+
+    with pytest.raises(TypeError, match="only supported for fixtures that return"):
+
+        @shared_session_scope_json(cleanup=print)
+        def my_fixture():
+            yield
+            yield
+
+
+def test_pool_arguments():
+    from pytest_shared_session_scope import shared_session_scope_pool
+    from pytest_shared_session_scope.store import JsonStore
+
+    with pytest.raises(ValueError, match="at least 1"):
+        shared_session_scope_pool(JsonStore(), size=0)
+    with pytest.raises(ValueError, match="Unknown pool strategy"):
+        shared_session_scope_pool(JsonStore(), size=2, strategy="random")  # type: ignore[arg-type]
+
+
 @pytest.mark.parametrize("n", [0, 2, 3])
 def test_with_cleanup(pytester: Pytester, n: int, tmp_path):
     test_id = "with_cleanup"
@@ -121,12 +269,194 @@ def test_with_cleanup(pytester: Pytester, n: int, tmp_path):
     assert len(got_cleanup_token) == 1
 
 
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_indirect_use(pytester: Pytester, n: int, tmp_path):
+    copy_example(pytester, "with_indirect_use", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=5)
+
+    results = [json.loads(path.read_text()) for path in get_output_dir(tmp_path).iterdir()]
+    assert sum(data["is_setup_token"] for data in results) == 1
+    assert sum(data["is_cleanup_token"] for data in results) == 1
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_broker_store(pytester: Pytester, n: int, tmp_path):
+    copy_example(pytester, "with_broker_store", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=5)
+
+    results = [json.loads(path.read_text()) for path in get_output_dir(tmp_path).iterdir()]
+    assert sum(data["is_setup_token"] for data in results) == 1
+    assert sum(data["is_cleanup_token"] for data in results) == 1
+    # Everything is kept in the controller
+    assert not list(tmp_path.glob("*.json*"))
+
+
+def test_no_broker_channel_when_unused(pytester: Pytester):
+    pytester.makepyfile(
+        """
+        from pytest_shared_session_scope._broker import CHANNEL_KEY
+
+        def test_channel(request):
+            assert CHANNEL_KEY not in request.config.workerinput
+        """
+    )
+    # In a new process, as other tests in this one created a `BrokerStore`
+    pytester.runpytest_subprocess("-n", "2").assert_outcomes(passed=1)
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_sqlite_store(pytester: Pytester, n: int, tmp_path):
+    copy_example(pytester, "with_sqlite_store", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=5)
+
+    results = [json.loads(path.read_text()) for path in get_output_dir(tmp_path).iterdir()]
+    assert sum(data["is_setup_token"] for data in results) == 1
+    assert sum(data["is_cleanup_token"] for data in results) == 1
+    # Values, metadata and locks all live in one database
+    assert not list(tmp_path.glob("*.json*"))
+    assert len(list(tmp_path.glob("*.sqlite"))) == (1 if n else 0)
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_redis_store(pytester: Pytester, n: int, tmp_path, resp_server, monkeypatch: pytest.MonkeyPatch):
+    copy_example(pytester, "with_redis_store", tmp_path)
+    monkeypatch.setenv("REDIS_URL", resp_server.url)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=5)
+
+    results = [json.loads(path.read_text()) for path in get_output_dir(tmp_path).iterdir()]
+    assert sum(data["is_setup_token"] for data in results) == 1
+    assert sum(data["is_cleanup_token"] for data in results) == 1
+    # Nothing is written to the base temp directory, and the value was deleted by the last worker
+    assert not list(tmp_path.glob("*.json*"))
+    assert not [key for key in resp_server.data.values if key.endswith(b":conftest.my_fixture")]
+    assert bool(resp_server.data.values) == bool(n)
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_shared_memory_store(pytester: Pytester, n: int, tmp_path):
+    copy_example(pytester, "with_shared_memory_store", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=5)
+
+    results = [json.loads(path.read_text()) for path in get_output_dir(tmp_path).iterdir()]
+    assert sum(data["is_setup_token"] for data in results) == 1
+    assert sum(data["is_cleanup_token"] for data in results) == 1
+    # The last worker removed the segment
+    fixture_values = {"tmp_path_factory": SimpleNamespace(getbasetemp=lambda: tmp_path / "popen-gw0")}
+    name = SharedMemoryStore()._name("conftest.my_fixture", fixture_values)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name)
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_persistent_cache(pytester: Pytester, n: int, tmp_path: Path):
+    copy_example(pytester, "with_persistent_cache", tmp_path)
+
+    def setups_after_run(*args: str) -> int:
+        basetemp = tmp_path / f"run-{len(list(tmp_path.glob('run-*')))}"
+        pytester.runpytest("-n", str(n), "--basetemp", str(basetemp), *args).assert_outcomes(passed=3)
+        setups = list(get_output_dir(tmp_path).iterdir())
+        for path in setups:
+            path.unlink()
+        return len(setups)
+
+    assert setups_after_run() == 2
+    # Warm run: no worker computes the values
+    assert setups_after_run() == 0
+    assert setups_after_run("--shared-scope-cache-clear") == 2
+    assert setups_after_run() == 0
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_dependencies(pytester: Pytester, n: int, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    copy_example(pytester, "with_dependencies", tmp_path)
+
+    def setups_after_run() -> list[str]:
+        basetemp = tmp_path / f"run-{len(list(tmp_path.glob('run-*')))}"
+        pytester.runpytest("-n", str(n), "--basetemp", str(basetemp)).assert_outcomes(passed=3)
+        setups = list(get_output_dir(tmp_path).iterdir())
+        for path in setups:
+            path.unlink()
+        return sorted(path.name.split("-")[0] for path in setups)
+
+    assert setups_after_run() == ["database", "seeded"]
+    assert setups_after_run() == []
+    # A new version of the upstream fixture invalidates the cached value of the fixture depending on it
+    monkeypatch.setenv("UPSTREAM_VERSION", "2")
+    assert setups_after_run() == ["database", "seeded"]
+    assert setups_after_run() == []
+
+
+def test_lock_free_read(pytester: Pytester, tmp_path: Path):
+    copy_example(pytester, "with_lock_free_read", tmp_path)
+    pytester.runpytest("-n", "2", "--basetemp", str(tmp_path)).assert_outcomes(passed=2)
+
+    # Only the worker computing the value takes the lock
+    assert len([path for path in get_output_dir(tmp_path).iterdir() if path.name.startswith("lock-")]) == 1
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_params(pytester: Pytester, n: int, tmp_path: Path):
+    copy_example(pytester, "with_params", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=20)
+
+    results: dict[str, list[dict]] = {}
+    for path in get_output_dir(tmp_path).iterdir():
+        fixture, param, _ = path.name.split("-")
+        results.setdefault(f"{fixture}-{param}", []).append(json.loads(path.read_text()))
+
+    assert set(results) == {
+        "direct-1",
+        "direct-2",
+        "direct-3",
+        "indirect-a",
+        "indirect-b",
+        "dict-a",
+        "dict-b",
+        "collection-frozenset",
+        "collection-tuple",
+        "collection-list",
+    }
+    for param_results in results.values():
+        # Exactly one worker calculates and cleans up each parameter
+        assert sum(data["is_setup_token"] for data in param_results) == 1
+        assert sum(data["is_cleanup_token"] for data in param_results) == 1
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_upstream_params(pytester: Pytester, n: int, tmp_path: Path):
+    copy_example(pytester, "with_upstream_params", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=8)
+
+    results: dict[str, list[dict]] = {}
+    for path in get_output_dir(tmp_path).iterdir():
+        fixture, param, _ = path.name.split("-")
+        results.setdefault(f"{fixture}-{param}", []).append(json.loads(path.read_text()))
+
+    assert set(results) == {"seeded-a", "seeded-b"}
+    for param_results in results.values():
+        # Each parameter of the upstream fixture gets its own instance, calculated and cleaned up once
+        assert sum(data["is_setup_token"] for data in param_results) == 1
+        assert sum(data["is_cleanup_token"] for data in param_results) == 1
+
+
 @pytest.mark.parametrize("n", [0, 2, 3])
 def test_serialize(pytester: Pytester, n: int, tmp_path: Path):
     pytester.copy_example("test_serializer.py")
     pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=8)
 
 
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_mmap_store(pytester: Pytester, n: int, tmp_path: Path):
+    pytester.copy_example("test_mmap_store.py")
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=3)
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_pickle_store(pytester: Pytester, n: int, tmp_path: Path):
+    pytester.copy_example("test_pickle_store.py")
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=3)
+
+
 @pytest.mark.parametrize("n", [0, 2, 3])
 def test_use_fixture_in_fixture(pytester: Pytester, n: int, tmp_path: Path):
     pytester.copy_example("test_use_fixture_in_pytest_fixture.py")
@@ -138,3 +468,127 @@ def test_nice_err_msg(pytester: Pytester):
     result = pytester.runpytest("-n", str(2))
     result.assert_outcomes(errors=1)
     result.stdout.fnmatch_lines(["*ValueError*MUST yield exactly twice*"])
+
+
+@pytest.mark.parametrize("n", [2, 3])
+def test_cleanup_metadata_is_a_counter(pytester: Pytester, n: int, tmp_path: Path):
+    copy_example(pytester, "with_cleanup", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=5)
+
+    (metadata_path,) = tmp_path.glob("*my_fixture_metadata.json")
+    assert json.loads(metadata_path.read_text()) == 5
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_stream_store(pytester: Pytester, n: int, tmp_path):
+    copy_example(pytester, "with_stream_store", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=5)
+
+    results = [json.loads(path.read_text()) for path in get_output_dir(tmp_path).iterdir()]
+    assert sum(data["is_setup_token"] for data in results) == 1
+    assert sum(data["is_cleanup_token"] for data in results) == 1
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_early_cleanup(pytester: Pytester, n: int, tmp_path):
+    copy_example(pytester, "with_early_cleanup", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=10)
+
+    paths = list(get_output_dir(tmp_path).iterdir())
+    results = [json.loads(path.read_text()) for path in paths if not path.name.startswith("later")]
+    later = [json.loads(path.read_text()) for path in paths if path.name.startswith("later")]
+    assert sum(data["is_setup_token"] for data in results) == 1
+    cleanups = [data for data in results if data["is_cleanup_token"]]
+    assert len(cleanups) == 1
+    # The cleanup did not wait for the end of the session
+    assert cleanups[0]["time"] < max(data["time"] for data in later)
+
+
+@pytest.mark.parametrize("n", [2, 3])
+def test_with_setup_error(pytester: Pytester, n: int, tmp_path):
+    copy_example(pytester, "with_setup_error", tmp_path)
+    result = pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path), "-k", "failing")
+    result.assert_outcomes(errors=6)
+    # The other workers fail with the recorded error instead of setting up the fixture again
+    assert len(list(get_output_dir(tmp_path).glob("failing-*"))) == 1
+    result.stdout.fnmatch_lines(["*SharedFixtureSetupError: Setup of shared fixture 'failing' failed in gw*"])
+    result.stdout.fnmatch_lines(["*RuntimeError: broken fixture"])
+
+
+@pytest.mark.parametrize("n", [2, 3])
+def test_with_setup_error_retries(pytester: Pytester, n: int, tmp_path):
+    copy_example(pytester, "with_setup_error", tmp_path)
+    result = pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path), "-k", "flaky")
+    # Only the tests of the worker the first setup failed in error, the next worker retried it
+    outcomes = result.parseoutcomes()
+    assert outcomes["passed"] > 0
+    assert outcomes["passed"] + outcomes["errors"] == 6
+    assert len(list(get_output_dir(tmp_path).glob("flaky-*"))) == 2
+
+
+@pytest.mark.parametrize("n", [0, 2, 3])
+def test_with_pool(pytester: Pytester, n: int, tmp_path):
+    copy_example(pytester, "with_pool", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path), "-k", "test_pool").assert_outcomes(
+        passed=12
+    )
+
+    def events(prefix: str, fixture: str) -> list[dict]:
+        paths = get_output_dir(tmp_path).glob(f"{prefix}-*")
+        return [
+            data for data in (json.loads(path.read_text()) for path in paths) if data["fixture"] == fixture
+        ]
+
+    for fixture in ["round_robin", "least_loaded"]:
+        builds = events("build", fixture)
+        tests = events("test", fixture)
+        # Every worker uses one instance, and the first two workers build different ones
+        assert len({(data["worker"], data["index"]) for data in tests}) == len(
+            {data["worker"] for data in tests}
+        )
+        assert {data["index"] for data in tests} == ({0} if n == 0 else {0, 1})
+        assert sorted(data["index"] for data in builds) == sorted({data["index"] for data in tests})
+        # Each instance is cleaned up once, by its last holder
+        lasts = [data["index"] for data in events("release", fixture) if data["last"]]
+        assert sorted(lasts) == sorted(data["index"] for data in builds)
+    # Pools count holders of their leases, not the setups of the instances
+    assert not list(tmp_path.glob("*_setups.json"))
+
+
+@pytest.mark.parametrize("n", [2, 3])
+def test_with_pool_failed_setup(pytester: Pytester, n: int, tmp_path):
+    copy_example(pytester, "with_pool", tmp_path)
+    result = pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path), "-k", "test_fragile")
+    outcomes = result.parseoutcomes()
+    assert outcomes["passed"] > 0
+    assert outcomes["errors"] > 0
+
+    # Workers failing to set up the instance give their lease back, so its last holder still cleans it up
+    releases = [json.loads(path.read_text()) for path in get_output_dir(tmp_path).glob("release-*")]
+    assert [data["last"] for data in releases] == [True]
+
+
+def test_with_resetup(pytester: Pytester, tmp_path):
+    copy_example(pytester, "with_resetup", tmp_path)
+    result = pytester.runpytest("-n", "1", "--basetemp", str(tmp_path), "-v")
+    result.assert_outcomes(passed=4)
+    result.stdout.re_match_lines([r".*test_1\[a\].*", r".*test_2\[b\].*", r".*test_2\[a\].*"])
+
+    cleanups = [json.loads(path.read_text()) for path in get_output_dir(tmp_path).glob("a-*")]
+    assert len(cleanups) == 2
+    assert sum(data["is_cleanup_token"] for data in cleanups) == 1
+    # The shared count of finished tests is not increased twice by the worker setting "a" up twice
+    (counter,) = tmp_path.glob("conftest.my_fixture[[]a-*_metadata.json")
+    assert json.loads(counter.read_text()) == 2
+
+
+@pytest.mark.parametrize("n", [2, 3])
+def test_with_lazy_store(pytester: Pytester, n: int, tmp_path):
+    copy_example(pytester, "with_lazy_store", tmp_path)
+    pytester.runpytest("-n", str(n), "--basetemp", str(tmp_path)).assert_outcomes(passed=5)
+
+    results = [json.loads(path.read_text()) for path in get_output_dir(tmp_path).iterdir()]
+    assert sum(data["is_setup_token"] for data in results) == 1
+    assert sum(data["is_cleanup_token"] for data in results) == 1
+    # Workers that read the value get the lazy mapping
+    assert {data["type"] for data in results if not data["is_setup_token"]} <= {"LazyMapping"}
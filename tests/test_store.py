@@ -0,0 +1,564 @@
+import array
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pickle
+import socket
+import subprocess
+import sys
+import threading
+import time
+from types import SimpleNamespace
+import uuid
+
+import pytest
+
+from pytest_shared_session_scope import store as store_module
+from pytest_shared_session_scope.fixtures import _release, _run_in_thread
+from pytest_shared_session_scope.store import (
+    FileStore,
+    JsonLinesStore,
+    JsonStore,
+    LazyJsonStore,
+    MmapStore,
+    PickleStore,
+    RedisStore,
+    SharedMemoryStore,
+    SqliteStore,
+)
+from pytest_shared_session_scope.types import StoreValueNotExists, SupportsWait
+
+
+@pytest.fixture
+def fixture_values(tmp_path_factory):
+    return {"tmp_path_factory": tmp_path_factory}
+
+
+@pytest.fixture
+def identifier(request):
+    # Files are written next to the base temp directory, which is shared between runs without xdist
+    return f"{request.node.name}-{uuid.uuid4().hex}"
+
+
+def test_mmap_store_roundtrip(fixture_values, identifier):
+    store = MmapStore()
+    with pytest.raises(StoreValueNotExists):
+        store.read(identifier, fixture_values)
+
+    data = array.array("d", range(1000))
+    store.write(identifier, data, fixture_values)
+    view = store.read(identifier, fixture_values)
+
+    assert isinstance(view, memoryview)
+    assert view.readonly
+    assert view.tobytes() == data.tobytes()
+
+
+def test_mmap_store_empty(fixture_values, identifier):
+    store = MmapStore()
+    store.write(identifier, b"", fixture_values)
+    assert store.read(identifier, fixture_values) == b""
+
+
+@pytest.mark.parametrize("compression", [None, "zlib", "lzma", "bz2"])
+def test_pickle_store_roundtrip(fixture_values, identifier, compression):
+    store = PickleStore(compression=compression, compression_threshold=100)
+    with pytest.raises(StoreValueNotExists):
+        store.read(identifier, fixture_values)
+
+    data = {
+        "set": {1, 2, 3},
+        "buffer": pickle.PickleBuffer(bytearray(b"x" * 10_000)),
+        "small_buffer": pickle.PickleBuffer(bytearray(b"y")),
+        "numbers": array.array("d", range(1000)),
+    }
+    store.write(identifier, data, fixture_values)
+    read = store.read(identifier, fixture_values)
+
+    assert read["set"] == {1, 2, 3}
+    assert bytes(read["buffer"]) == b"x" * 10_000
+    assert bytes(read["small_buffer"]) == b"y"
+    assert read["numbers"] == data["numbers"]
+
+
+def test_pickle_store_buffers_out_of_band(fixture_values, identifier):
+    store = PickleStore()
+    payload = bytearray(b"x" * 1_000_000)
+    store.write(identifier, pickle.PickleBuffer(payload), fixture_values)
+
+    read = store.read(identifier, fixture_values)
+    # Out-of-band buffers are views into the memory mapped file, not copies
+    assert isinstance(read, memoryview)
+    assert read.readonly
+    assert read == payload
+
+
+def test_pickle_store_compresses_above_threshold(fixture_values, identifier):
+    data = "x" * 1_000_000
+    compressed, uncompressed = f"{identifier}_compressed", f"{identifier}_uncompressed"
+    PickleStore().write(uncompressed, data, fixture_values)
+    PickleStore(compression="zlib", compression_threshold=1000).write(compressed, data, fixture_values)
+
+    root = fixture_values["tmp_path_factory"].getbasetemp().parent
+    assert (root / f"{compressed}.pickle").stat().st_size < (
+        root / f"{uncompressed}.pickle"
+    ).stat().st_size / 100
+    assert PickleStore().read(compressed, fixture_values) == data
+
+
+def test_pickle_store_unknown_compression():
+    with pytest.raises(ValueError, match="Unknown compression"):
+        PickleStore(compression="zip")  # type: ignore
+
+
+def test_file_store_alock_does_not_block_event_loop(fixture_values, identifier):
+    store = JsonStore()
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    async def write_with_lock():
+        async with store.alock(identifier, fixture_values):
+            await store.awrite(identifier, 1, fixture_values)
+
+    async def main():
+        ticker = asyncio.create_task(tick())
+        # The async lock is the same lock as the sync one
+        with store.lock(identifier, fixture_values):
+            writer = asyncio.create_task(write_with_lock())
+            await asyncio.sleep(0.3)
+            assert not writer.done()
+        await writer
+        ticker.cancel()
+
+    asyncio.run(main())
+    assert ticks >= 10
+    assert asyncio.run(store.aread(identifier, fixture_values)) == 1
+
+
+def test_file_store_alock_released_when_cancelled(fixture_values, identifier):
+    store = JsonStore()
+
+    async def main():
+        with store.lock(identifier, fixture_values):
+            waiter = asyncio.create_task(store.alock(identifier, fixture_values).__aenter__())
+            await asyncio.sleep(0.1)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+        async def acquire():
+            async with store.alock(identifier, fixture_values):
+                pass
+
+        # The lock the thread got after the cancellation is released again
+        await asyncio.wait_for(acquire(), 5)
+
+    asyncio.run(main())
+
+
+def test_run_in_thread_does_not_block_event_loop(fixture_values, identifier):
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    async def fixture():
+        value = yield
+        # The fixture code runs in the task of the fixture, not in the thread
+        yield value, asyncio.current_task()
+
+    def setup(send_first):
+        with JsonStore().lock(identifier, fixture_values):
+            return send_first(1)
+
+    async def main():
+        ticker = asyncio.create_task(tick())
+        generator = fixture()
+        await anext(generator)
+        with JsonStore().lock(identifier, fixture_values):
+            setup_task = asyncio.create_task(_run_in_thread(setup, generator))
+            await asyncio.sleep(0.3)
+            assert not setup_task.done()
+        value, task = await setup_task
+        assert task is setup_task
+        ticker.cancel()
+        return value
+
+    assert asyncio.run(main()) == 1
+    assert ticks >= 10
+
+
+def test_file_store_wait_for_returns_when_lock_is_free(fixture_values, identifier):
+    store = FileStore()
+    assert isinstance(store, SupportsWait)
+    store.wait_for(identifier, fixture_values)
+
+
+def test_file_store_wait_for_wakes_all_waiters_on_release(fixture_values, identifier):
+    store = FileStore()
+    locked = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        with store.lock(identifier, fixture_values):
+            locked.set()
+            release.wait()
+            store.write(identifier, "value", fixture_values)
+
+    def wait_and_read(_):
+        store.wait_for(identifier, fixture_values)
+        return store.read(identifier, fixture_values)
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        holder = executor.submit(hold_lock)
+        assert locked.wait(5)
+        waiters = [executor.submit(wait_and_read, i) for i in range(4)]
+        time.sleep(0.05)
+        assert not any(waiter.done() for waiter in waiters)
+        release.set()
+        holder.result()
+        assert [waiter.result(timeout=5) for waiter in waiters] == ["value"] * 4
+
+
+def test_file_store_without_fcntl(fixture_values, identifier, monkeypatch):
+    monkeypatch.setattr(store_module, "fcntl", None)
+    store = FileStore()
+    # Falls back to filelock
+    with store.lock(identifier, fixture_values):
+        store.write(identifier, "value", fixture_values)
+    store.wait_for(identifier, fixture_values)
+    assert store.read(identifier, fixture_values) == "value"
+    with pytest.raises(RuntimeError, match="fcntl"):
+        with store_module._flock(store._lock_path(identifier, fixture_values), 0):
+            pass
+
+
+def test_file_store_wait_for_lock_held_by_other_process(fixture_values, identifier):
+    pytest.importorskip("fcntl")
+    store = FileStore()
+    lock_path = store._lock_path(identifier, fixture_values)
+    script = (
+        "import fcntl, os, sys, time\n"
+        f"fd = os.open({str(lock_path)!r}, os.O_RDWR | os.O_CREAT)\n"
+        "fcntl.flock(fd, fcntl.LOCK_EX)\n"
+        "print('locked', flush=True)\n"
+        "sys.stdin.readline()\n"
+    )
+    holder = subprocess.Popen(
+        [sys.executable, "-c", script], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        assert holder.stdout.readline() == "locked\n"
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            waiter = executor.submit(store.wait_for, identifier, fixture_values)
+            time.sleep(0.05)
+            assert not waiter.done()
+            holder.stdin.close()  # The holder exits, which releases the lock
+            waiter.result(timeout=5)
+    finally:
+        holder.kill()
+        holder.wait()
+
+
+def test_lazy_json_store_decodes_accessed_keys_only(fixture_values, identifier):
+    store = LazyJsonStore()
+    data = {"small": 1, "large": list(range(1000)), "nested": {"ä": [None, "ö"]}, "empty": ""}
+    store.write(identifier, data, fixture_values)
+
+    value = store.read(identifier, fixture_values)
+    assert list(value) == list(data)
+    assert len(value) == 4
+    assert value["small"] == 1
+    assert value["nested"] == {"ä": [None, "ö"]}
+    assert value._decoded.keys() == {"small", "nested"}
+    assert value["nested"] is value["nested"]
+    assert dict(value) == data
+    with pytest.raises(KeyError):
+        value["missing"]
+
+
+def test_lazy_json_store_only_stores_mappings(fixture_values, identifier):
+    with pytest.raises(TypeError, match="mappings"):
+        LazyJsonStore().write(identifier, [1, 2], fixture_values)
+
+
+def test_json_lines_store_roundtrip(fixture_values, identifier):
+    store = JsonLinesStore(chunk_size=3)
+    store.write(identifier, ({"id": i} for i in range(10)), fixture_values)
+    stream = store.read(identifier, fixture_values)
+    assert list(stream) == [{"id": i} for i in range(10)]
+    assert list(stream) == [{"id": i} for i in range(10)]
+
+
+def test_json_lines_store_reads_while_writing(fixture_values, identifier):
+    store = JsonLinesStore(chunk_size=1, poll_interval=0.001)
+    produced = threading.Semaphore(0)
+    consumed = threading.Semaphore(0)
+
+    def records():
+        for i in range(5):
+            yield i
+            # The next record is only produced once the reader got this one
+            produced.release()
+            assert consumed.acquire(timeout=5)
+
+    def read():
+        received = []
+        for record in store.read_stream(identifier, fixture_values):
+            received.append(record)
+            consumed.release()
+        return received
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        reader = executor.submit(read)
+        writer = executor.submit(store.write_stream, identifier, records(), fixture_values)
+        writer.result(timeout=5)
+        assert reader.result(timeout=5) == list(range(5))
+
+
+def test_json_lines_store_failed_stream(fixture_values, identifier):
+    store = JsonLinesStore()
+
+    def records():
+        yield 1
+        raise ValueError("broken")
+
+    with pytest.raises(ValueError, match="broken"):
+        store.write_stream(identifier, records(), fixture_values)
+    stream = store.read_stream(identifier, fixture_values)
+    assert next(stream) == 1
+    with pytest.raises(RuntimeError, match="broken"):
+        next(stream)
+
+
+def test_json_lines_store_timeout(fixture_values, identifier):
+    store = JsonLinesStore(poll_interval=0.001, timeout=0.05)
+    with pytest.raises(TimeoutError):
+        list(store.read_stream(identifier, fixture_values))
+
+
+@pytest.fixture
+def sqlite_store(identifier):
+    return SqliteStore(filename=f"{identifier}.sqlite")
+
+
+@pytest.mark.parametrize("data", ["text", b"bytes"])
+def test_sqlite_store_roundtrip(fixture_values, identifier, sqlite_store, data):
+    with pytest.raises(StoreValueNotExists):
+        sqlite_store.read(identifier, fixture_values)
+    sqlite_store.write(identifier, "old", fixture_values)
+    sqlite_store.write(identifier, data, fixture_values)
+
+    assert sqlite_store.read(identifier, fixture_values) == data
+    assert sqlite_store.size(identifier, fixture_values) == len(data)
+
+
+def test_sqlite_store_buffer(fixture_values, identifier, sqlite_store):
+    data = array.array("d", range(1000))
+    sqlite_store.write(identifier, data, fixture_values)
+    assert sqlite_store.read(identifier, fixture_values) == data.tobytes()
+
+
+def test_sqlite_store_increment(fixture_values, identifier, sqlite_store):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: sqlite_store.increment(identifier, 1, fixture_values), range(100)))
+    assert sqlite_store.increment(identifier, 0, fixture_values) == 100
+
+
+def test_sqlite_store_release(fixture_values, identifier, sqlite_store):
+    sqlite_store.increment(identifier + "_setups", 4, fixture_values)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        is_last = list(
+            executor.map(lambda _: sqlite_store.release(identifier, 2, 8, fixture_values), range(4))
+        )
+    assert is_last.count(True) == 1
+    assert sqlite_store.increment(identifier + "_metadata", 0, fixture_values) == 8
+
+
+def test_sqlite_store_lock(fixture_values, identifier, sqlite_store):
+    holders = 0
+    max_holders = 0
+    guard = threading.Lock()
+
+    def hold_lock(_):
+        nonlocal holders, max_holders
+        with sqlite_store.lock(identifier, fixture_values):
+            with guard:
+                holders += 1
+                max_holders = max(max_holders, holders)
+            time.sleep(0.01)
+            with guard:
+                holders -= 1
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(hold_lock, range(12)))
+    assert max_holders == 1
+
+
+def test_sqlite_store_takes_over_lock_of_dead_process(fixture_values, identifier, sqlite_store):
+    dead = subprocess.Popen([sys.executable, "-c", ""])
+    dead.wait()
+    connection = sqlite_store._connect(fixture_values)
+    connection.execute(
+        "INSERT INTO shared_locks VALUES (?, ?, ?, ?)", (identifier, socket.gethostname(), dead.pid, "dead")
+    )
+
+    with sqlite_store.lock(identifier, fixture_values):
+        pass
+
+
+def test_shared_memory_store_roundtrip(fixture_values, identifier):
+    store = SharedMemoryStore()
+    with pytest.raises(StoreValueNotExists):
+        store.read(identifier, fixture_values)
+
+    data = array.array("d", range(1000))
+    store.write(identifier, data, fixture_values)
+    view = SharedMemoryStore().read(identifier, fixture_values)
+    assert isinstance(view, memoryview)
+    assert view.readonly
+    assert view == data.tobytes()
+    assert store.size(identifier, fixture_values) == len(data.tobytes())
+
+    store.write(identifier, "text", fixture_values)
+    assert store.read(identifier, fixture_values) == "text"
+    # Views of the old value stay valid
+    assert view == data.tobytes()
+
+    store.delete(identifier, fixture_values)
+    with pytest.raises(StoreValueNotExists):
+        store.read(identifier, fixture_values)
+
+
+@pytest.fixture
+def redis_fixture_values():
+    return {"pytestconfig": SimpleNamespace(workerinput={"testrunuid": uuid.uuid4().hex})}
+
+
+@pytest.mark.parametrize("data", ["text", b"bytes", b"", b"x" * 1000])
+def test_redis_store_roundtrip(resp_server, redis_fixture_values, data):
+    store = RedisStore(resp_server.url, chunk_size=100)
+    with pytest.raises(StoreValueNotExists):
+        store.read("id", redis_fixture_values)
+    store.write("id", "old", redis_fixture_values)
+    store.write("id", data, redis_fixture_values)
+
+    assert store.read("id", redis_fixture_values) == data
+    assert store.size("id", redis_fixture_values) == len(data)
+    store.delete("id", redis_fixture_values)
+    with pytest.raises(StoreValueNotExists):
+        store.read("id", redis_fixture_values)
+
+
+def test_redis_store_chunks_large_values(resp_server, redis_fixture_values):
+    store = RedisStore(resp_server.url, chunk_size=100)
+    store.write("id", array.array("d", range(1000)), redis_fixture_values)
+
+    key = store._key("id", redis_fixture_values).encode()
+    chunks = resp_server.data.values[key]
+    assert len(chunks) == 1 + 80  # The header and 8000 bytes in chunks of 100
+    data = store.read("id", redis_fixture_values)
+    assert isinstance(data, bytearray)
+    assert data == array.array("d", range(1000)).tobytes()
+
+
+def test_redis_store_value_deleted_while_read(resp_server, redis_fixture_values, monkeypatch):
+    store = RedisStore(resp_server.url, chunk_size=100)
+    store.write("id", b"x" * 1000, redis_fixture_values)
+    key = store._key("id", redis_fixture_values).encode()
+    execute = resp_server.data.execute
+
+    def delete_after_first_chunk(command, arguments):
+        if command == "LINDEX" and arguments[1] == b"2":
+            execute("DEL", [key])
+        return execute(command, arguments)
+
+    monkeypatch.setattr(resp_server.data, "execute", delete_after_first_chunk)
+    with pytest.raises(StoreValueNotExists):
+        store.read("id", redis_fixture_values)
+
+
+def test_redis_store_runs_do_not_share_values(resp_server, redis_fixture_values):
+    store = RedisStore(resp_server.url)
+    store.write("id", "value", redis_fixture_values)
+    other_run = {"pytestconfig": SimpleNamespace(workerinput={"testrunuid": "other"})}
+    with pytest.raises(StoreValueNotExists):
+        store.read("id", other_run)
+
+
+def test_redis_store_increment(resp_server, redis_fixture_values):
+    store = RedisStore(resp_server.url)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: store.increment("id", 1, redis_fixture_values), range(100)))
+    assert store.increment("id", 0, redis_fixture_values) == 100
+
+
+def test_redis_store_release(resp_server, redis_fixture_values):
+    store = RedisStore(resp_server.url)
+    store.increment("id_setups", 4, redis_fixture_values)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        is_last = list(executor.map(lambda _: store.release("id", 2, 8, redis_fixture_values), range(4)))
+    assert is_last.count(True) == 1
+    assert store.increment("id_metadata", 0, redis_fixture_values) == 8
+
+
+def test_redis_store_teardown_is_one_command(resp_server, redis_fixture_values):
+    store = RedisStore(resp_server.url)
+    store.increment("id_setups", 2, redis_fixture_values)
+    call = SimpleNamespace(store_identifier="id", fixture_values=redis_fixture_values)
+    resp_server.data.commands.clear()
+
+    def report(amount: int) -> int:
+        raise AssertionError("The counters are updated by the store")
+
+    for expected in (False, True):
+        assert _release(store, call, 1, report, 2) is expected  # type: ignore[arg-type]
+    # No lock, and one script per teardown instead of pipelines for each counter
+    assert resp_server.data.commands == ["EVAL", "EVAL"]
+
+
+def test_redis_store_lock(resp_server, redis_fixture_values):
+    store = RedisStore(resp_server.url)
+    holders = 0
+    max_holders = 0
+    guard = threading.Lock()
+
+    def hold_lock(_):
+        nonlocal holders, max_holders
+        with store.lock("id", redis_fixture_values):
+            with guard:
+                holders += 1
+                max_holders = max(max_holders, holders)
+            time.sleep(0.01)
+            with guard:
+                holders -= 1
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(hold_lock, range(12)))
+    assert max_holders == 1
+
+
+def test_redis_store_lock_lease(resp_server, redis_fixture_values):
+    store = RedisStore(resp_server.url, lease=0.2)
+    key = (store._key("id", redis_fixture_values) + ":lock").encode()
+    with store.lock("id", redis_fixture_values):
+        time.sleep(0.5)
+        # The lease is extended while the lock is held
+        with resp_server.data.mutex:
+            assert resp_server.data._get(key) is not None
+    assert key not in resp_server.data.values
+
+
+def test_redis_store_lock_of_dead_worker_expires(resp_server, redis_fixture_values):
+    store = RedisStore(resp_server.url)
+    key = store._key("id", redis_fixture_values) + ":lock"
+    store._pipeline([("SET", key, "dead", "NX", "PX", 100)])
+    with store.lock("id", redis_fixture_values):
+        pass